@@ -1,14 +1,75 @@
 # src/__main__.py
 from pathlib import Path
+from multiprocessing import get_context
+import argparse
+import os
 import sys
 
 # Ajout du répertoire parent au PYTHONPATH
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from src.config import config
+from src.config import config, setup_logging
+
+def run_workers(workers: int):
+    """
+    Lance le dashboard sur plusieurs processus
+
+    Un processus producteur rafraîchit les données et publie les timeframes
+    en fichiers Arrow ; les workers uvicorn servent les sessions à partir de
+    ces instantanés projetés en mémoire.
+    """
+    import uvicorn
+    from src.data.hub import SNAPSHOT_DIR_ENV, run_publisher
+
+    snapshot_dir = config.DATA_DIR / "snapshots"
+    producer = get_context("spawn").Process(
+        target=run_publisher,
+        args=(snapshot_dir,),
+        name="snapshot-publisher",
+        daemon=True
+    )
+    producer.start()
+
+    # Hérité par les workers : leur hub lit les instantanés au lieu de la base
+    os.environ[SNAPSHOT_DIR_ENV] = str(snapshot_dir)
+    print(f"Lancement de l'application sur http://{config.HOST}:{config.PORT} ({workers} workers)")
+    try:
+        uvicorn.run(
+            "src.dashboard.app:app",
+            host=config.HOST,
+            port=config.PORT,
+            workers=workers
+        )
+    finally:
+        producer.terminate()
+        producer.join()
 
 def main():
+    parser = argparse.ArgumentParser(description="Dashboard Bitcoin temps réel")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.WORKERS,
+        help="Nombre de processus servant le dashboard"
+    )
+    parser.add_argument(
+        "--warmup",
+        action=argparse.BooleanOptionalAction,
+        default=config.WARMUP,
+        help="Précharger base, données et figures avant d'ouvrir le port"
+    )
+    args = parser.parse_args()
+    setup_logging()
+
+    from src.data.hub import WARMUP_ENV
+    # Lu à l'import de l'application, y compris par les workers
+    os.environ[WARMUP_ENV] = "1" if args.warmup else "0"
+
+    if args.workers > 1:
+        run_workers(args.workers)
+        return
+
     from src.dashboard.app import app
     print(f"Lancement de l'application sur http://{config.HOST}:{config.PORT}")
     app.run(
@@ -17,4 +78,4 @@ def main():
     )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,302 @@
+# src/alerts/engine.py
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import time
+import numpy as np
+import polars as pl
+import logging
+from ..analysis.rolling import RollingStatistics
+from ..analysis.statistics import WINDOWS
+from ..config import config, setup_logging
+from ..monitoring.metrics import metrics
+from ..monitoring.tracing import tracer
+from .rules import AlertRule, CompiledRules, load_rules
+from .sinks import SINK_FAILURES, Alert, AlertSink, create_sinks
+
+logger = logging.getLogger(__name__)
+
+ALERTS_TRIGGERED = metrics.counter(
+    "alerts_triggered_total",
+    "Règles d'alerte déclenchées (sent : notifiées, suppressed : même barre ou délai minimal non écoulé)",
+    labels=("result",)
+)
+ALERT_EVALUATE_SECONDS = metrics.histogram(
+    "alert_evaluate_seconds",
+    "Durée d'évaluation de toutes les règles d'alerte sur les dernières barres"
+)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class AlertEngine:
+    """
+    Moteur d'alertes vectorisé
+
+    Les règles sont compilées en groupes (timeframe, champ, opérateur) aux
+    seuils triés : à chaque passage, les deux dernières lignes de chaque
+    timeframe sont lues une fois, puis chaque groupe résout ses règles
+    déclenchées par recherche dichotomique. Le coût dépend du nombre de
+    groupes et d'alertes, pas du nombre de règles.
+
+    Une règle est notifiée au plus une fois par barre (déduplication entre
+    rafraîchissements, la dernière barre étant en cours de formation) et au
+    plus une fois par délai minimal (`cooldown`).
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[AlertRule] = (),
+        sinks: Optional[List[AlertSink]] = None,
+        cooldown: Optional[float] = None
+    ):
+        self.cooldown = config.ALERT_COOLDOWN if cooldown is None else cooldown
+        self.sinks = sinks if sinks is not None else []
+        self.path: Optional[Path] = None
+        self._mtime: Optional[float] = None
+        self.rules: List[AlertRule] = []
+        self._last_bar = np.empty(0, dtype=np.int64)
+        self._last_fired = np.empty(0, dtype=np.float64)
+        # Envois sérialisés : les alertes d'un passage partent après celles du précédent
+        self._dispatching = asyncio.Lock()
+        self.load(rules)
+
+    @classmethod
+    def from_file(cls, path: Path, sinks: Optional[List[AlertSink]] = None) -> "AlertEngine":
+        """Moteur des règles d'un fichier JSON, rechargé s'il est modifié"""
+        engine = cls(sinks=sinks)
+        engine.path = Path(path)
+        engine.reload()
+        return engine
+
+    def load(self, rules: Iterable[AlertRule]):
+        """
+        Remplace les règles et recompile les groupes
+
+        L'état de notification (dernière barre, dernier envoi) des règles
+        conservées, reconnues par leur id, est repris.
+        """
+        previous = {rule.id: i for i, rule in enumerate(self.rules)}
+        self.rules = list(rules)
+        self.compiled = CompiledRules(self.rules)
+
+        self._cooldowns = np.array([
+            self.cooldown if rule.cooldown is None else rule.cooldown for rule in self.rules
+        ], dtype=np.float64)
+        last_bar = np.full(len(self.rules), np.iinfo(np.int64).min, dtype=np.int64)
+        last_fired = np.full(len(self.rules), -np.inf)
+        for i, rule in enumerate(self.rules):
+            if rule.id in previous:
+                last_bar[i] = self._last_bar[previous[rule.id]]
+                last_fired[i] = self._last_fired[previous[rule.id]]
+        self._last_bar, self._last_fired = last_bar, last_fired
+
+    def reload(self) -> bool:
+        """Recharge le fichier de règles s'il a changé ; retourne True si rechargé"""
+        if self.path is None:
+            return False
+        try:
+            mtime = self.path.stat().st_mtime if self.path.exists() else None
+            if mtime == self._mtime:
+                return False
+            self._mtime = mtime
+            self.load(load_rules(self.path) if mtime is not None else [])
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement des règles d'alerte : {e}")
+            return False
+
+    def reset(self):
+        """Oublie les notifications passées (déduplication et délais)"""
+        self._last_bar[:] = np.iinfo(np.int64).min
+        self._last_fired[:] = -np.inf
+
+    @staticmethod
+    def _bar_rows(frame: pl.DataFrame, columns: List[str]) -> tuple[datetime, np.ndarray]:
+        """Horodatage de la dernière barre et valeurs des colonnes (lignes : avant-dernière, dernière)"""
+        tail = frame.tail(2)
+        values = np.full((2, len(columns)), np.nan)
+        present = [k for k, column in enumerate(columns) if column in tail.columns]
+        if present:
+            # Les valeurs nulles deviennent NaN
+            values[2 - len(tail):, present] = tail.select([columns[k] for k in present]).cast(pl.Float64).to_numpy()
+        return tail["timestamp"][-1], values
+
+    @staticmethod
+    def _market_rows(rolling: RollingStatistics, columns: List[str]) -> tuple[datetime, np.ndarray]:
+        """Grandeurs de marché (en %) à la minute précédente et à la dernière"""
+        end = rolling.last_timestamp
+        values = np.full((2, len(columns)), np.nan)
+        for row, at in enumerate((end - timedelta(minutes=1), end)):
+            for k, column in enumerate(columns):
+                name, label = column.split("_", 1)
+                value = getattr(rolling.trailing(WINDOWS[label], end=at), name)
+                if value is not None:
+                    values[row, k] = value * 100
+        return end, values
+
+    def evaluate(
+        self,
+        frames: Dict[str, pl.DataFrame],
+        rolling: Optional[RollingStatistics] = None,
+        now: Optional[datetime] = None
+    ) -> List[Alert]:
+        """
+        Évalue toutes les règles et retourne les alertes à notifier
+
+        Args:
+            frames: Timeframes avec indicateurs ({timeframe: DataFrame})
+            rolling: Statistiques glissantes minute (grandeurs de marché)
+            now: Heure du passage (UTC naïf), pour les délais entre notifications
+        """
+        if not self.rules:
+            return []
+        now = now or datetime.utcnow()
+        now_s = (now - _EPOCH).total_seconds()
+        compiled = self.compiled
+
+        with (
+            tracer.span("alerts.evaluate", rules=len(self.rules), groups=len(compiled)) as span,
+            ALERT_EVALUATE_SECONDS.time()
+        ):
+            # Valeurs des emplacements (timeframe, colonne) aux deux dernières
+            # barres ; un timeframe absent reste à NaN et ne déclenche rien
+            slots = np.full((2, len(compiled.slots) + 1), np.nan)
+            slots[:, compiled.zero_slot] = 0.0
+            bars = np.full(len(compiled.timeframes), np.iinfo(np.int64).min, dtype=np.int64)
+            bar_times = {}
+            slot_index = {slot: k for k, slot in enumerate(compiled.slots)}
+            for t, (timeframe, columns) in enumerate(compiled.columns().items()):
+                if timeframe is None:
+                    if rolling is None or not len(rolling):
+                        continue
+                    bar, values = self._market_rows(rolling, columns)
+                elif timeframe in frames and not frames[timeframe].is_empty():
+                    bar, values = self._bar_rows(frames[timeframe], columns)
+                else:
+                    continue
+                slots[:, [slot_index[timeframe, column] for column in columns]] = values
+                key = int((bar - _EPOCH) / timedelta(microseconds=1))
+                bars[compiled.timeframes.index(timeframe)] = key
+                bar_times[key] = bar
+
+            previous = slots[0, compiled.fields] - slots[0, compiled.others]
+            current = slots[1, compiled.fields] - slots[1, compiled.others]
+            rules, groups = compiled.match(previous, current)
+            if not len(rules):
+                return []
+
+            bar = bars[compiled.group_timeframes[groups]]
+            keep = (self._last_bar[rules] != bar) & (now_s - self._last_fired[rules] >= self._cooldowns[rules])
+            ALERTS_TRIGGERED.labels("suppressed").inc(int(len(keep) - keep.sum()))
+            rules, bar, value = rules[keep], bar[keep], current[groups[keep]]
+            self._last_bar[rules] = bar
+            self._last_fired[rules] = now_s
+            ALERTS_TRIGGERED.labels("sent").inc(len(rules))
+            span.set("alerts", len(rules))
+
+            return [
+                Alert(
+                    rule_id=self.rules[i].id,
+                    expression=self.rules[i].expression,
+                    timeframe=self.rules[i].timeframe,
+                    bar=bar_times[b],
+                    value=v,
+                    triggered_at=now
+                )
+                for i, b, v in zip(rules.tolist(), bar.tolist(), value.tolist())
+            ]
+
+    async def _send(self, sink: AlertSink, alerts: List[Alert]):
+        try:
+            await sink.send(alerts)
+        except Exception as e:
+            SINK_FAILURES.labels(sink.name).inc()
+            logger.error(f"Erreur lors de l'envoi des alertes ({sink.name}) : {e}")
+
+    def check(
+        self,
+        frames: Dict[str, pl.DataFrame],
+        rolling: Optional[RollingStatistics] = None
+    ) -> List[Alert]:
+        """Recharge les règles si besoin puis évalue ; retourne les alertes à notifier"""
+        try:
+            self.reload()
+            alerts = self.evaluate(frames, rolling)
+            if alerts:
+                logger.info(f"{len(alerts)} alertes déclenchées")
+            return alerts
+        except Exception as e:
+            logger.error(f"Erreur lors de l'évaluation des alertes : {e}")
+            return []
+
+    async def dispatch(self, alerts: List[Alert]):
+        """Notifie toutes les destinations en parallèle (après les envois précédents)"""
+        if not alerts:
+            return
+        async with self._dispatching:
+            await asyncio.gather(*(self._send(sink, alerts) for sink in self.sinks))
+
+    async def close(self):
+        # Envois en cours terminés avant la fermeture des destinations
+        async with self._dispatching:
+            pass
+        for sink in self.sinks:
+            await sink.close()
+
+
+def create_engine() -> AlertEngine:
+    """Moteur du processus producteur : règles de ALERTS_FILE, destinations configurées"""
+    return AlertEngine.from_file(config.ALERTS_FILE, sinks=create_sinks())
+
+
+# Script de test
+if __name__ == "__main__":
+    from ..analysis.indicators import TechnicalAnalysis
+    from ..benchmarks.generator import MarketDataGenerator
+    from ..data.processor import DataProcessor
+    from .rules import random_rules
+
+    setup_logging()
+
+    minutes = MarketDataGenerator(seed=7).frame(60 * 24 * 40)
+    rolling = RollingStatistics.from_frame(minutes)
+    frames = {
+        tf: TechnicalAnalysis.add_all_indicators(DataProcessor._aggregate(minutes, tf).tail(300))
+        for tf in ("1m", "5m", "1H", "1D")
+    }
+    rules = random_rules(10_000, frames)
+    engine = AlertEngine(rules, cooldown=0)
+    print(f"{len(rules)} règles, {len(engine.compiled)} groupes")
+
+    begin = time.perf_counter()
+    for _ in range(100):
+        engine.reset()
+        alerts = engine.evaluate(frames, rolling)
+    vectorized = (time.perf_counter() - begin) / 100
+    print(f"Vectorisé : {vectorized * 1000:.2f} ms par passage, {len(alerts)} alertes")
+
+    # Référence : chaque règle évaluée séparément sur les deux dernières barres
+    def naive(rule: AlertRule) -> bool:
+        if rule.timeframe is None:
+            previous, current = AlertEngine._market_rows(rolling, [rule.field])[1][:, 0]
+        else:
+            columns = [rule.field] + ([rule.other] if rule.other else [])
+            values = AlertEngine._bar_rows(frames[rule.timeframe], columns)[1]
+            previous, current = values[:, 0] - (values[:, 1] if rule.other else 0)
+        t = rule.threshold
+        return {
+            ">": current > t, ">=": current >= t, "<": current < t, "<=": current <= t,
+            "crosses_above": previous < t <= current,
+            "crosses_below": current <= t < previous,
+            "crosses": previous < t <= current or current <= t < previous
+        }[rule.op]
+
+    begin = time.perf_counter()
+    expected = {rule.id for rule in rules if naive(rule)}
+    print(f"Règle par règle : {(time.perf_counter() - begin) * 1000:.2f} ms par passage")
+    print(f"Résultats identiques : {expected == {alert.rule_id for alert in alerts}}")
+
+    # Même barre : aucune nouvelle notification
+    print(f"Second passage sur la même barre : {len(engine.evaluate(frames, rolling))} alertes")
@@ -0,0 +1,273 @@
+# src/alerts/rules.py
+from dataclasses import dataclass, field as dataclass_field
+from typing import Dict, List, Optional
+import json
+import re
+from pathlib import Path
+import numpy as np
+import polars as pl
+import logging
+from ..analysis.statistics import WINDOWS
+from ..data.processor import TIMEFRAME_MINUTES
+
+logger = logging.getLogger(__name__)
+
+# Colonnes des timeframes précalculés (OHLCV et indicateurs de TechnicalAnalysis)
+BAR_FIELDS = [
+    "open", "high", "low", "close", "volume", "trades",
+    "SMA_20", "SMA_50", "SMA_200",
+    "BB_middle", "BB_upper", "BB_lower",
+    "RSI", "MACD", "MACD_Signal", "MACD_Histogram"
+]
+
+# Grandeurs de marché sur fenêtres calendaires (en %), indépendantes du timeframe
+MARKET_FIELDS = [
+    f"{name}_{label}" for name in ("change", "volatility") for label in WINDOWS
+]
+
+# Comparaisons à la dernière barre et franchissements entre les deux dernières
+OPERATORS = (">", ">=", "<", "<=", "crosses_above", "crosses_below", "crosses")
+
+_FIELD_NAMES = {name.lower(): name for name in BAR_FIELDS + MARKET_FIELDS}
+
+_EXPRESSION = re.compile(
+    r"^\s*(?P<field>\w+)\s+"
+    r"(?P<op>>=|<=|>|<|crosses(?:[\s_]+(?:above|below))?)\s+"
+    r"(?P<operand>[-+]?\d+(?:\.\d+)?%?|\w+)"
+    r"(?:\s+on\s+(?P<timeframe>\w+))?\s*$",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class AlertRule:
+    """
+    Règle d'alerte, écrite sous la forme `<champ> <opérateur> <seuil|champ> [on <timeframe>]`
+
+    Exemples : "RSI crosses below 30 on 5m", "close > BB_upper on 1H",
+    "change_24h < -5%". Les grandeurs de marché (change_24h, volatility_7d...)
+    portent sur la série minute et ne prennent pas de timeframe ; les autres
+    champs sont évalués sur 1m par défaut.
+    """
+    id: str
+    expression: str
+    cooldown: Optional[float] = None   # secondes ; défaut du moteur si None
+    field: str = dataclass_field(init=False)
+    op: str = dataclass_field(init=False)
+    threshold: float = dataclass_field(init=False)
+    other: Optional[str] = dataclass_field(init=False)
+    timeframe: Optional[str] = dataclass_field(init=False)
+
+    def __post_init__(self):
+        match = _EXPRESSION.match(self.expression)
+        if match is None:
+            raise ValueError(f"Règle {self.id} : expression invalide « {self.expression} »")
+
+        self.field = self._field(match["field"])
+        self.op = re.sub(r"[\s_]+", "_", match["op"].lower())
+
+        operand = match["operand"]
+        if re.fullmatch(r"[-+]?\d+(?:\.\d+)?%?", operand):
+            if operand.endswith("%") and self.field not in MARKET_FIELDS:
+                raise ValueError(f"Règle {self.id} : seuil en % réservé à {', '.join(MARKET_FIELDS)}")
+            self.threshold = float(operand.rstrip("%"))
+            self.other = None
+        else:
+            # Comparaison de deux colonnes : seuil nul sur leur différence
+            self.other = self._field(operand)
+            self.threshold = 0.0
+            if self.field in MARKET_FIELDS or self.other in MARKET_FIELDS:
+                raise ValueError(f"Règle {self.id} : seules deux colonnes de barres peuvent être comparées")
+
+        if self.field in MARKET_FIELDS:
+            if match["timeframe"]:
+                raise ValueError(f"Règle {self.id} : {self.field} porte sur la série minute, sans timeframe")
+            self.timeframe = None
+        else:
+            self.timeframe = match["timeframe"] or "1m"
+            if self.timeframe not in TIMEFRAME_MINUTES:
+                raise ValueError(
+                    f"Règle {self.id} : timeframe inconnu {self.timeframe} ({', '.join(TIMEFRAME_MINUTES)})"
+                )
+
+    def _field(self, name: str) -> str:
+        try:
+            return _FIELD_NAMES[name.lower()]
+        except KeyError:
+            raise ValueError(f"Règle {self.id} : champ inconnu {name}") from None
+
+    @property
+    def group(self) -> tuple:
+        """Clé de regroupement : les règles d'un groupe ne diffèrent que par leur seuil"""
+        return self.timeframe, self.field, self.other, self.op
+
+
+class CompiledRules:
+    """
+    Règles compilées en groupes de même timeframe, champ, colonne comparée et opérateur
+
+    Les seuils de chaque groupe sont triés et placés bout à bout dans un
+    seul tableau : pour une valeur donnée, les règles déclenchées d'un
+    groupe forment un intervalle contigu de son segment. Les bornes de ces
+    intervalles sont obtenues par une recherche dichotomique menée sur
+    tous les groupes à la fois (log2 de la taille du plus grand groupe
+    itérations vectorisées), sans boucle Python par groupe ni parcours des
+    règles.
+
+    Les valeurs comparées sont lues dans des « emplacements » (timeframe,
+    colonne) ; un emplacement constant nul sert de colonne comparée aux
+    règles à seuil.
+    """
+
+    def __init__(self, rules: List[AlertRule]):
+        members: Dict[tuple, List[int]] = {}
+        for index, rule in enumerate(rules):
+            members.setdefault(rule.group, []).append(index)
+
+        self.slots: List[tuple] = []   # (timeframe, colonne)
+        slot_index: Dict[tuple, int] = {}
+
+        def slot(timeframe: Optional[str], column: str) -> int:
+            if (timeframe, column) not in slot_index:
+                slot_index[timeframe, column] = len(self.slots)
+                self.slots.append((timeframe, column))
+            return slot_index[timeframe, column]
+
+        self.timeframes: List[Optional[str]] = list(dict.fromkeys(key[0] for key in members))
+        thresholds, members_sorted, fields, others, ops, timeframes, sizes = [], [], [], [], [], [], []
+        for (timeframe, field, other, op), indices in members.items():
+            values = np.array([rules[i].threshold for i in indices], dtype=np.float64)
+            order = np.argsort(values, kind="stable")
+            thresholds.append(values[order])
+            members_sorted.append(np.array(indices, dtype=np.int64)[order])
+            fields.append(slot(timeframe, field))
+            others.append(-1 if other is None else slot(timeframe, other))
+            ops.append(OPERATORS.index(op))
+            timeframes.append(self.timeframes.index(timeframe))
+            sizes.append(len(indices))
+
+        # Emplacement constant nul (dernier) pour les règles à seuil
+        self.zero_slot = len(self.slots)
+        self.thresholds = np.concatenate(thresholds) if thresholds else np.empty(0)
+        self.rules = np.concatenate(members_sorted) if members_sorted else np.empty(0, dtype=np.int64)
+        self.ends = np.cumsum(np.array(sizes, dtype=np.int64))
+        self.starts = self.ends - np.array(sizes, dtype=np.int64)
+        self.fields = np.array(fields, dtype=np.int64)
+        self.others = np.where(np.array(others, dtype=np.int64) < 0, self.zero_slot, others).astype(np.int64)
+        self.ops = np.array(ops, dtype=np.int64)
+        self.group_timeframes = np.array(timeframes, dtype=np.int64)
+        self._depth = int(np.ceil(np.log2(max(sizes, default=0) + 1)))
+
+    def __len__(self) -> int:
+        """Nombre de groupes"""
+        return len(self.starts)
+
+    def columns(self) -> Dict[Optional[str], List[str]]:
+        """Colonnes lues par timeframe (None : grandeurs de marché)"""
+        columns: Dict[Optional[str], List[str]] = {}
+        for timeframe, column in self.slots:
+            columns.setdefault(timeframe, []).append(column)
+        return columns
+
+    def _search(self, values: np.ndarray, side: str) -> np.ndarray:
+        """searchsorted de chaque valeur dans le segment de son groupe, tous groupes à la fois"""
+        lo, hi = self.starts.copy(), self.ends.copy()
+        last = max(len(self.thresholds) - 1, 0)
+        for _ in range(self._depth):
+            active = lo < hi
+            mid = (lo + hi) // 2
+            t = self.thresholds[np.minimum(mid, last)]
+            right = active & ((t < values) if side == "left" else (t <= values))
+            lo = np.where(right, mid + 1, lo)
+            hi = np.where(active & ~right, mid, hi)
+        return lo
+
+    def match(self, previous: np.ndarray, current: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Règles déclenchées, à partir des valeurs de chaque groupe aux deux dernières barres
+
+        Returns:
+            (indices des règles, groupe de chaque règle) ; une valeur NaN
+            ne déclenche rien
+        """
+        s, e = self.starts, self.ends
+        lc, rc = self._search(current, "left"), self._search(current, "right")
+        lp, rp = self._search(previous, "left"), self._search(previous, "right")
+        op = self.ops
+        crossing = op >= OPERATORS.index("crosses_above")
+        up = (op != OPERATORS.index("crosses_below")) & crossing & (previous < current)
+        down = (op != OPERATORS.index("crosses_above")) & crossing & (previous > current)
+        conditions = [op == OPERATORS.index(name) for name in (">", ">=", "<", "<=")] + [up, down]
+        # >, >= : seuils < (<=) valeur ; <, <= : seuils > (>=) valeur ;
+        # hausse : previous < seuil <= current ; baisse : current <= seuil < previous
+        lo = np.select(conditions, [s, s, rc, lc, rp, lc], default=s)
+        hi = np.select(conditions, [lc, rc, e, e, rc, lp], default=s)
+        hi = np.where(np.isnan(current), lo, hi)
+
+        lengths = hi - lo
+        total = int(lengths.sum())
+        if total == 0:
+            return self.rules[:0], self.rules[:0]
+        groups = np.repeat(np.arange(len(lengths)), lengths)
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(total) - offsets[groups] + lo[groups]
+        return self.rules[positions], groups
+
+
+def load_rules(path: Path) -> List[AlertRule]:
+    """
+    Lit un fichier de règles JSON : [{"id": ..., "rule": ..., "cooldown": ...}]
+
+    Les règles invalides sont ignorées (journalisées) pour ne pas bloquer les autres.
+    """
+    rules = []
+    for entry in json.loads(Path(path).read_text()):
+        try:
+            rules.append(AlertRule(str(entry["id"]), entry["rule"], entry.get("cooldown")))
+        except (KeyError, ValueError) as e:
+            logger.error(f"Règle d'alerte ignorée : {e}")
+    logger.info(f"{len(rules)} règles d'alerte chargées depuis {path}")
+    return rules
+
+
+def random_rules(count: int, frames: Dict[str, pl.DataFrame], seed: int = 42) -> List[AlertRule]:
+    """
+    Règles aléatoires réalistes pour les benchmarks
+
+    Les seuils sont tirés dans la plage observée de chaque colonne ; un
+    dixième des règles compare deux colonnes de prix, un dixième porte sur
+    les grandeurs de marché.
+    """
+    rng = np.random.default_rng(seed)
+    timeframes = list(frames)
+    prices = ["close", "high", "low", "SMA_20", "SMA_50", "SMA_200", "BB_upper", "BB_lower"]
+    ranges = {
+        (tf, column): (
+            frames[tf].select(
+                pl.col(column).fill_nan(None).min().alias("low"),
+                pl.col(column).fill_nan(None).max().alias("high")
+            ).row(0)
+            if column in frames[tf].columns else (None, None)
+        )
+        for tf in timeframes for column in BAR_FIELDS
+    }
+    rules = []
+    for i in range(count):
+        op = OPERATORS[rng.integers(len(OPERATORS))]
+        draw = rng.random()
+        if draw < 0.1:
+            field = MARKET_FIELDS[rng.integers(len(MARKET_FIELDS))]
+            expression = f"{field} {op} {rng.uniform(-10, 10) if field.startswith('change') else rng.uniform(0, 150):.2f}%"
+        else:
+            timeframe = timeframes[rng.integers(len(timeframes))]
+            if draw < 0.2:
+                left, right = rng.choice(prices, 2, replace=False)
+                expression = f"{left} {op} {right} on {timeframe}"
+            else:
+                field = BAR_FIELDS[rng.integers(len(BAR_FIELDS))]
+                low, high = ranges[timeframe, field]
+                if low is None:
+                    low, high = 0.0, 1.0
+                expression = f"{field} {op} {rng.uniform(low, high):.6f} on {timeframe}"
+        rules.append(AlertRule(f"rule-{i}", expression))
+    return rules
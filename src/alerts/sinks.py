@@ -0,0 +1,175 @@
+# src/alerts/sinks.py
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import argparse
+import asyncio
+import json
+import aiohttp
+from aiohttp import web
+import logging
+from ..config import config, setup_logging
+from ..monitoring.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SINK_FAILURES = metrics.counter(
+    "alert_sink_failures_total",
+    "Envois de notifications d'alerte en échec par destination",
+    labels=("sink",)
+)
+
+# Alertes par requête du webhook
+WEBHOOK_BATCH = 500
+
+
+@dataclass
+class Alert:
+    """Notification d'une règle déclenchée"""
+    rule_id: str
+    expression: str
+    timeframe: Optional[str]
+    bar: datetime          # barre ayant déclenché la règle
+    value: float           # valeur comparée au seuil
+    triggered_at: datetime
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["bar"] = self.bar.isoformat()
+        data["triggered_at"] = self.triggered_at.isoformat()
+        return data
+
+
+class AlertSink(ABC):
+    """Destination des alertes : `send` reçoit toutes les alertes d'un passage"""
+
+    name = "sink"
+
+    @abstractmethod
+    async def send(self, alerts: List[Alert]):
+        ...
+
+    async def close(self):
+        pass
+
+
+class LogSink(AlertSink):
+    """Journalise chaque alerte"""
+
+    name = "log"
+
+    async def send(self, alerts: List[Alert]):
+        for alert in alerts:
+            logger.warning(f"Alerte {alert.rule_id} : {alert.expression} (valeur {alert.value:.6g}, barre {alert.bar})")
+
+
+class FileSink(AlertSink):
+    """Ajoute les alertes à un fichier JSON lines (historique local)"""
+
+    name = "file"
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or config.DATA_DIR / "alerts.jsonl")
+
+    def _write(self, alerts: List[Alert]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.writelines(json.dumps(alert.to_dict()) + "\n" for alert in alerts)
+
+    async def send(self, alerts: List[Alert]):
+        await asyncio.to_thread(self._write, alerts)
+
+
+class WebhookSink(AlertSink):
+    """Envoie les alertes en JSON ({"alerts": [...]}) par POST, par lots de WEBHOOK_BATCH"""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def send(self, alerts: List[Alert]):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+        for first in range(0, len(alerts), WEBHOOK_BATCH):
+            payload = {"alerts": [alert.to_dict() for alert in alerts[first:first + WEBHOOK_BATCH]]}
+            async with self.session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class WebhookReceiver:
+    """
+    Remplaçant local d'un service de notification (POST /alerts)
+
+    Conserve les alertes reçues ; sert aux essais du WebhookSink sans
+    service externe.
+    """
+
+    def __init__(self):
+        self.alerts: List[dict] = []
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    async def _receive(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        alerts = (await request.json())["alerts"]
+        self.alerts.extend(alerts)
+        for alert in alerts:
+            logger.info(f"Webhook : {alert['rule_id']} {alert['expression']} ({alert['value']:.6g})")
+        return web.json_response({"received": len(alerts)})
+
+    async def start(self, port: int) -> str:
+        app = web.Application()
+        app.router.add_post("/alerts", self._receive)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", port).start()
+        self.url = f"http://127.0.0.1:{port}/alerts"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def create_sinks() -> List[AlertSink]:
+    """Destinations configurées : journal, historique local et webhook si ALERT_WEBHOOK_URL"""
+    sinks = [LogSink(), FileSink()]
+    if config.ALERT_WEBHOOK_URL:
+        sinks.append(WebhookSink(config.ALERT_WEBHOOK_URL))
+    return sinks
+
+
+async def _serve(port: int):
+    receiver = WebhookReceiver()
+    url = await receiver.start(port)
+    print(f"Webhook local à l'écoute sur {url} (ALERT_WEBHOOK_URL={url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await receiver.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook local recevant les alertes")
+    parser.add_argument("--port", type=int, default=8099, help="Port d'écoute")
+    args = parser.parse_args()
+    setup_logging()
+    try:
+        asyncio.run(_serve(args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+# src/analysis/backtest.py
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from multiprocessing import get_context, shared_memory
+from typing import Any, Dict, List, Optional
+import os
+import time
+import numpy as np
+import polars as pl
+import logging
+from .sweep import IndicatorSweep
+
+logger = logging.getLogger(__name__)
+
+# Nombre de périodes par an selon le timeframe (annualisation du Sharpe)
+PERIODS_PER_YEAR = {
+    "1m": 525_600,
+    "5m": 105_120,
+    "1H": 8_760,
+    "6H": 1_460,
+    "1D": 365,
+    "1W": 52
+}
+
+STRATEGIES = ("sma_crossover", "rsi_threshold", "macd")
+
+# Indicateurs conservés par backtester (tableaux de la longueur de la série)
+INDICATOR_CACHE_SIZE = 96
+
+
+@dataclass
+class BacktestResult:
+    """Résultat d'un backtest"""
+    params: Dict[str, Any]
+    total_return: float
+    sharpe: float
+    max_drawdown: float
+    n_trades: int
+    equity: Optional[np.ndarray] = field(default=None, repr=False)
+
+
+@dataclass
+class GridSearchResult:
+    """Résultat d'une recherche sur grille de paramètres"""
+    strategy: str
+    results: pl.DataFrame
+    elapsed: float
+
+    @property
+    def backtests_per_second(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def best(self, metric: str = "sharpe") -> Dict[str, Any]:
+        """Retourne la ligne de meilleur score pour la métrique donnée"""
+        return self.results.sort(metric, descending=True, nulls_last=True).row(0, named=True)
+
+
+class Backtester:
+    """
+    Backtest vectorisé des signaux du dashboard
+
+    Positions, frais, slippage et courbe d'équité sont calculés par opérations
+    sur tableaux. Une position décidée à la clôture d'une bougie est appliquée
+    au rendement de la bougie suivante (pas de biais d'anticipation).
+    """
+
+    def __init__(
+        self,
+        close: np.ndarray,
+        fee_rate: float = 0.001,
+        slippage: float = 0.0005,
+        periods_per_year: int = PERIODS_PER_YEAR["1m"]
+    ):
+        self.close = np.asarray(close, dtype=np.float64)
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.periods_per_year = periods_per_year
+        self._returns = np.zeros_like(self.close)
+        if len(self.close) > 1:
+            self._returns[1:] = self.close[1:] / self.close[:-1] - 1
+        self._frame = pl.DataFrame({
+            "timestamp": np.arange(len(self.close)),
+            "close": self.close
+        })
+        # Indicateurs calculés, par (nom, période) : propres à l'instance pour
+        # être libérés avec elle (un lru_cache de méthode retiendrait l'instance)
+        self._indicators: Dict[tuple, np.ndarray] = {}
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame, timeframe: str = "1m", **kwargs) -> "Backtester":
+        """Crée un backtester à partir d'un DataFrame OHLCV"""
+        kwargs.setdefault("periods_per_year", PERIODS_PER_YEAR[timeframe])
+        return cls(df.sort("timestamp")["close"].cast(pl.Float64).to_numpy(), **kwargs)
+
+    # Indicateurs (mémoïsés par instance, partagés entre les combinaisons)
+
+    def _indicator(self, name: str, period: int, compute) -> np.ndarray:
+        key = (name, period)
+        if key not in self._indicators:
+            if len(self._indicators) >= INDICATOR_CACHE_SIZE:
+                # Éviction du plus ancien
+                del self._indicators[next(iter(self._indicators))]
+            self._indicators[key] = compute()
+        return self._indicators[key]
+
+    def _sma(self, period: int) -> np.ndarray:
+        return self._indicator("sma", period, lambda: IndicatorSweep.sma_grid(self._frame, [period])[0])
+
+    def _rsi(self, period: int) -> np.ndarray:
+        return self._indicator("rsi", period, lambda: IndicatorSweep.rsi_grid(self._frame, [period])[0])
+
+    def _ema(self, span: int) -> np.ndarray:
+        return self._indicator(
+            "ema", span, lambda: self._frame["close"].ewm_mean(span=span, min_periods=1).to_numpy()
+        )
+
+    # Signaux : position cible (1 = long, 0 = hors marché) à chaque bougie
+
+    @staticmethod
+    def _hold(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+        """Maintient la position entre un signal d'entrée et un signal de sortie"""
+        events = np.where(entries, 1.0, np.where(exits, 0.0, np.nan))
+        idx = np.where(np.isnan(events), 0, np.arange(len(events)))
+        np.maximum.accumulate(idx, out=idx)
+        positions = events[idx]
+        return np.nan_to_num(positions, nan=0.0)
+
+    def sma_crossover_positions(self, fast: int = 20, slow: int = 50) -> np.ndarray:
+        """Long lorsque la SMA rapide est au-dessus de la SMA lente"""
+        return (self._sma(fast) > self._sma(slow)).astype(np.float64)
+
+    def rsi_threshold_positions(
+        self,
+        period: int = 14,
+        lower: float = 30.0,
+        upper: float = 70.0
+    ) -> np.ndarray:
+        """Entrée en survente (RSI < lower), sortie en surachat (RSI > upper)"""
+        rsi = self._rsi(period)
+        return self._hold(rsi < lower, rsi > upper)
+
+    def macd_positions(
+        self,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9
+    ) -> np.ndarray:
+        """Long lorsque l'histogramme MACD est positif"""
+        macd = self._ema(fast_period) - self._ema(slow_period)
+        signal = pl.Series(macd).ewm_mean(span=signal_period, min_periods=1).to_numpy()
+        return (macd - signal > 0).astype(np.float64)
+
+    def positions(self, strategy: str, **params) -> np.ndarray:
+        """Calcule les positions pour une stratégie nommée"""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Stratégie inconnue : {strategy}")
+        return getattr(self, f"{strategy}_positions")(**params)
+
+    # Simulation
+
+    def run(
+        self,
+        positions: np.ndarray,
+        params: Optional[Dict[str, Any]] = None,
+        keep_equity: bool = True
+    ) -> BacktestResult:
+        """
+        Simule une série de positions
+
+        Args:
+            positions: Position cible à la clôture de chaque bougie
+            params: Paramètres de la stratégie (reportés dans le résultat)
+            keep_equity: Conserver la courbe d'équité dans le résultat
+        """
+        held = np.zeros_like(positions)
+        held[1:] = positions[:-1]
+
+        # Frais et slippage proportionnels au volume échangé
+        turnover = np.abs(np.diff(positions, prepend=0.0))
+        costs = turnover * (self.fee_rate + self.slippage)
+        strategy_returns = held * self._returns - costs
+
+        equity = np.cumprod(1 + strategy_returns)
+        drawdown = 1 - equity / np.maximum.accumulate(equity)
+
+        std = strategy_returns.std()
+        sharpe = (
+            float(strategy_returns.mean() / std * np.sqrt(self.periods_per_year))
+            if std > 0 else 0.0
+        )
+
+        return BacktestResult(
+            params=params or {},
+            total_return=float(equity[-1] - 1) if len(equity) else 0.0,
+            sharpe=sharpe,
+            max_drawdown=float(drawdown.max()) if len(drawdown) else 0.0,
+            n_trades=int(np.count_nonzero(turnover)),
+            equity=equity if keep_equity else None
+        )
+
+    def run_strategy(self, strategy: str, keep_equity: bool = True, **params) -> BacktestResult:
+        """Calcule les positions puis simule une stratégie nommée"""
+        return self.run(self.positions(strategy, **params), params, keep_equity)
+
+    # Recherche sur grille
+
+    def grid_search(
+        self,
+        strategy: str,
+        param_grid: Dict[str, List[Any]],
+        processes: Optional[int] = None,
+        chunk_size: int = 64
+    ) -> GridSearchResult:
+        """
+        Évalue toutes les combinaisons de paramètres sur un pool de processus
+
+        Les prix sont publiés une seule fois en mémoire partagée : les
+        workers y accèdent directement au lieu de recevoir une copie picklée
+        avec chaque tâche.
+
+        Args:
+            strategy: Nom de la stratégie (voir STRATEGIES)
+            param_grid: {paramètre: liste de valeurs}
+            processes: Nombre de processus (par défaut : nombre de cœurs)
+            chunk_size: Nombre de combinaisons par tâche
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Stratégie inconnue : {strategy}")
+
+        names = list(param_grid)
+        combos = [dict(zip(names, values)) for values in product(*param_grid.values())]
+        chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+
+        shm = shared_memory.SharedMemory(create=True, size=max(self.close.nbytes, 1))
+        try:
+            np.ndarray(self.close.shape, dtype=np.float64, buffer=shm.buf)[:] = self.close
+
+            start = time.perf_counter()
+            with ProcessPoolExecutor(
+                max_workers=processes or os.cpu_count(),
+                # spawn : un fork hériterait du pool de threads Polars
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    shm.name, len(self.close),
+                    self.fee_rate, self.slippage, self.periods_per_year
+                )
+            ) as pool:
+                rows = [
+                    row
+                    for chunk_rows in pool.map(_run_chunk, [strategy] * len(chunks), chunks)
+                    for row in chunk_rows
+                ]
+            elapsed = time.perf_counter() - start
+        finally:
+            shm.close()
+            shm.unlink()
+
+        result = GridSearchResult(strategy=strategy, results=pl.DataFrame(rows), elapsed=elapsed)
+        logger.info(
+            f"Grille {strategy}: {len(rows)} backtests en {elapsed:.2f}s "
+            f"({result.backtests_per_second:,.0f} backtests/s)"
+        )
+        return result
+
+
+# État des workers du pool (un Backtester adossé à la mémoire partagée)
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(
+    shm_name: str,
+    length: int,
+    fee_rate: float,
+    slippage: float,
+    periods_per_year: int
+):
+    """Attache le tableau de prix partagé dans le worker"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    close = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+    _worker_state["shm"] = shm  # Conserver la référence tant que le worker vit
+    _worker_state["backtester"] = Backtester(
+        close,
+        fee_rate=fee_rate,
+        slippage=slippage,
+        periods_per_year=periods_per_year
+    )
+
+
+def _run_chunk(strategy: str, combos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Exécute un lot de combinaisons dans un worker"""
+    backtester: Backtester = _worker_state["backtester"]
+    rows = []
+    for params in combos:
+        result = backtester.run_strategy(strategy, keep_equity=False, **params)
+        rows.append({
+            **params,
+            "total_return": result.total_return,
+            "sharpe": result.sharpe,
+            "max_drawdown": result.max_drawdown,
+            "n_trades": result.n_trades
+        })
+    return rows
+
+
+# Script de test
+if __name__ == "__main__":
+    n = 525_600
+    rng = np.random.default_rng(42)
+    close = 40_000 * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+
+    backtester = Backtester(close)
+    single = backtester.run_strategy("sma_crossover", fast=20, slow=50)
+    print(f"SMA 20/50 : rendement {single.total_return:+.2%}, Sharpe {single.sharpe:.2f}, "
+          f"{single.n_trades} trades")
+
+    search = backtester.grid_search(
+        "sma_crossover",
+        {"fast": list(range(5, 55, 5)), "slow": list(range(60, 260, 20))}
+    )
+    print(f"{len(search.results)} backtests : {search.backtests_per_second:,.1f} backtests/s")
+    print(f"Meilleure combinaison : {search.best()}")
@@ -0,0 +1,142 @@
+# src/analysis/profiles.py
+from dataclasses import dataclass
+from typing import Optional
+import math
+import numpy as np
+import polars as pl
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Part du volume couverte par la zone de valeur
+VALUE_AREA = 0.7
+
+
+@dataclass
+class VolumeProfile:
+    """
+    Profil de volume par niveau de prix (volume at price)
+
+    Le niveau `k` couvre les prix [k * tick, (k + 1) * tick[. Chaque niveau
+    porte son volume et la somme prix × volume de ce volume : deux profils
+    de même pas se fusionnent exactement en additionnant niveau par niveau,
+    et le VWAP de la plage couverte reste exact quel que soit le regroupement.
+    """
+    tick: float
+    bins: np.ndarray     # int64, niveaux triés
+    volume: np.ndarray   # volume par niveau
+    pv: np.ndarray       # somme prix × volume par niveau
+
+    @classmethod
+    def empty(cls, tick: float) -> "VolumeProfile":
+        return cls(tick, np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+
+    @classmethod
+    def aggregate(cls, tick: float, bins: np.ndarray, volume: np.ndarray, pv: np.ndarray) -> "VolumeProfile":
+        """Profil à partir de niveaux quelconques (éventuellement répétés, non triés)"""
+        bins = np.asarray(bins, dtype=np.int64)
+        if not len(bins):
+            return cls.empty(tick)
+        unique, inverse = np.unique(bins, return_inverse=True)
+        return cls(
+            tick,
+            unique,
+            np.bincount(inverse, weights=volume, minlength=len(unique)),
+            np.bincount(inverse, weights=pv, minlength=len(unique))
+        )
+
+    def __len__(self) -> int:
+        return len(self.bins)
+
+    @property
+    def prices(self) -> np.ndarray:
+        """Prix au milieu de chaque niveau"""
+        return (self.bins + 0.5) * self.tick
+
+    @property
+    def total_volume(self) -> float:
+        return float(self.volume.sum())
+
+    @property
+    def vwap(self) -> Optional[float]:
+        """Prix moyen pondéré par les volumes de la plage (None sans volume)"""
+        total = self.total_volume
+        return float(self.pv.sum() / total) if total > 0 else None
+
+    @property
+    def point_of_control(self) -> Optional[float]:
+        """Prix du niveau le plus échangé"""
+        if not len(self):
+            return None
+        return float(self.prices[np.argmax(self.volume)])
+
+    def value_area(self, fraction: float = VALUE_AREA) -> Optional[tuple[float, float]]:
+        """
+        Zone de valeur : plage de prix contiguë autour du point de contrôle
+        contenant `fraction` du volume
+
+        La zone est étendue depuis le point de contrôle du côté du niveau
+        voisin le plus échangé, jusqu'à couvrir la part demandée.
+
+        Returns:
+            (borne basse, borne haute) en prix, None sans volume
+        """
+        total = self.total_volume
+        if total <= 0:
+            return None
+        # Niveaux contigus (les niveaux sans volume comptent pour zéro)
+        dense = np.zeros(int(self.bins[-1] - self.bins[0]) + 1)
+        dense[self.bins - self.bins[0]] = self.volume
+        low = high = int(np.argmax(dense))
+        covered = dense[low]
+        while covered < fraction * total:
+            below = dense[low - 1] if low > 0 else -1.0
+            above = dense[high + 1] if high + 1 < len(dense) else -1.0
+            if above >= below:
+                high += 1
+                covered += above
+            else:
+                low -= 1
+                covered += below
+        first = int(self.bins[0])
+        return (first + low) * self.tick, (first + high + 1) * self.tick
+
+    def merge(self, other: "VolumeProfile") -> "VolumeProfile":
+        """Somme de deux profils de même pas"""
+        if not math.isclose(self.tick, other.tick):
+            raise ValueError(f"Pas de prix incompatibles : {self.tick} et {other.tick}")
+        return VolumeProfile.aggregate(
+            self.tick,
+            np.concatenate([self.bins, other.bins]),
+            np.concatenate([self.volume, other.volume]),
+            np.concatenate([self.pv, other.pv])
+        )
+
+    def rebin(self, rows: int) -> "VolumeProfile":
+        """
+        Profil regroupé en au plus `rows` niveaux (pas multiple du pas d'origine)
+
+        Sert à l'affichage : le pas est choisi d'après l'étendue des prix.
+        """
+        if len(self) < 2:
+            return self
+        first, last = int(self.bins[0]), int(self.bins[-1])
+        factor = max(1, math.ceil((last - first + 1) / rows))
+        # L'alignement des regroupements peut ajouter un niveau
+        while last // factor - first // factor + 1 > rows:
+            factor += 1
+        if factor == 1:
+            return self
+        return VolumeProfile.aggregate(self.tick * factor, self.bins // factor, self.volume, self.pv)
+
+    def to_frame(self) -> pl.DataFrame:
+        return pl.DataFrame({"bin": self.bins, "volume": self.volume, "pv": self.pv})
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame, tick: float) -> "VolumeProfile":
+        return cls(
+            tick,
+            df["bin"].cast(pl.Int64).to_numpy(),
+            df["volume"].cast(pl.Float64).to_numpy(),
+            df["pv"].cast(pl.Float64).to_numpy()
+        )
@@ -0,0 +1,259 @@
+# src/analysis/range_index.py
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import numpy as np
+import polars as pl
+import logging
+from .rolling import _epoch
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RangeExtremes:
+    """Plus haut, plus bas et drawdown maximal d'une fenêtre"""
+    start: datetime
+    end: datetime
+    bars: int
+    high: Optional[float]
+    low: Optional[float]
+    max_drawdown: Optional[float]
+
+
+class RangeExtremumIndex:
+    """
+    Arbre de segments sur les plus hauts / plus bas minute
+
+    Chaque nœud résume un intervalle par (plus haut, plus bas, drawdown
+    maximal). La fusion de deux intervalles consécutifs G puis D est
+    associative : le drawdown est le plus grand de ceux de G, de D, et de la
+    chute du plus haut de G au plus bas de D. Une fenêtre quelconque se
+    résout donc en O(log n) nœuds, sans parcourir les barres.
+
+    L'ordre du plus haut et du plus bas à l'intérieur d'une même bougie
+    n'étant pas connu, le drawdown ne compare que des bougies distinctes.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._n = 0
+        self._capacity = 1 << max(int(capacity - 1).bit_length(), 1)
+        self._ts = np.empty(self._capacity, dtype=np.int64)
+        self._alloc_tree()
+
+    def _alloc_tree(self):
+        size = 2 * self._capacity
+        self._max = np.full(size, -np.inf)
+        self._min = np.full(size, np.inf)
+        self._dd = np.zeros(size)
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame) -> "RangeExtremumIndex":
+        """Construit l'index à partir d'un DataFrame OHLCV minute"""
+        index = cls(capacity=max(len(df), 1024))
+        index.extend(df)
+        return index
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def last_timestamp(self) -> Optional[datetime]:
+        if self._n == 0:
+            return None
+        return datetime.fromtimestamp(int(self._ts[self._n - 1]), timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def _merge(max_l, min_l, dd_l, max_r, min_r, dd_r):
+        """Fusion vectorisée de nœuds gauche / droite"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cross = np.where(
+                np.isfinite(max_l) & np.isfinite(min_r),
+                1 - min_r / max_l,
+                0.0
+            )
+        return (
+            np.maximum(max_l, max_r),
+            np.minimum(min_l, min_r),
+            np.maximum(np.maximum(dd_l, dd_r), cross)
+        )
+
+    def _update_parents(self, first: int, last: int):
+        """Recalcule les ancêtres des feuilles [first, last) niveau par niveau"""
+        lo, hi = first + self._capacity, last + self._capacity
+        while lo > 1:
+            lo, hi = lo >> 1, ((hi - 1) >> 1) + 1
+            left = np.arange(lo, hi) * 2
+            right = left + 1
+            (
+                self._max[lo:hi],
+                self._min[lo:hi],
+                self._dd[lo:hi]
+            ) = self._merge(
+                self._max[left], self._min[left], self._dd[left],
+                self._max[right], self._min[right], self._dd[right]
+            )
+
+    def _grow(self, size: int):
+        """Double la capacité et reconstruit l'arbre"""
+        capacity = self._capacity
+        while capacity < size:
+            capacity *= 2
+        leaves_max = self._max[self._capacity:self._capacity + self._n].copy()
+        leaves_min = self._min[self._capacity:self._capacity + self._n].copy()
+        ts = self._ts[:self._n].copy()
+
+        self._capacity = capacity
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._ts[:self._n] = ts
+        self._alloc_tree()
+        self._max[capacity:capacity + self._n] = leaves_max
+        self._min[capacity:capacity + self._n] = leaves_min
+        if self._n:
+            self._update_parents(0, self._n)
+
+    def extend(self, df: pl.DataFrame) -> int:
+        """
+        Ajoute les nouvelles barres minute
+
+        Une barre au même timestamp que la dernière la remplace (révision de
+        la bougie en cours). Les barres antérieures sont ignorées.
+
+        Returns:
+            Nombre de barres ajoutées ou révisées
+        """
+        if df.is_empty():
+            return 0
+
+        df = df.sort("timestamp")
+        last = self.last_timestamp
+        if last is not None:
+            df = df.filter(pl.col("timestamp") >= last)
+            if df.is_empty():
+                return 0
+            if df["timestamp"][0] == last:
+                self._n -= 1  # La révision remplace la dernière barre
+
+        n, m = self._n, len(df)
+        if n + m > self._capacity:
+            self._grow(n + m)
+
+        leaf = self._capacity + n
+        self._ts[n:n + m] = df["timestamp"].dt.epoch("s").to_numpy()
+        self._max[leaf:leaf + m] = df["high"].cast(pl.Float64).to_numpy()
+        self._min[leaf:leaf + m] = df["low"].cast(pl.Float64).to_numpy()
+        self._dd[leaf:leaf + m] = 0.0
+        self._n = n + m
+        self._update_parents(n, n + m)
+
+        logger.debug(f"Index des extrêmes étendu : {m} barres ({self._n} au total)")
+        return m
+
+    def query_range(self, i: int, j: int) -> tuple[float, float, float]:
+        """
+        Résume les barres d'indices [i, j)
+
+        Returns:
+            (plus haut, plus bas, drawdown maximal)
+        """
+        left = (-np.inf, np.inf, 0.0)
+        right = (-np.inf, np.inf, 0.0)
+        lo, hi = i + self._capacity, j + self._capacity
+        node_max, node_min, node_dd = self._max, self._min, self._dd
+
+        while lo < hi:
+            if lo & 1:
+                left = self._merge_scalar(*left, node_max[lo], node_min[lo], node_dd[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right = self._merge_scalar(node_max[hi], node_min[hi], node_dd[hi], *right)
+            lo >>= 1
+            hi >>= 1
+
+        return self._merge_scalar(*left, *right)
+
+    @staticmethod
+    def _merge_scalar(max_l, min_l, dd_l, max_r, min_r, dd_r) -> tuple[float, float, float]:
+        cross = 1 - min_r / max_l if max_l != -np.inf and min_r != np.inf else 0.0
+        return (
+            max_l if max_l > max_r else max_r,
+            min_l if min_l < min_r else min_r,
+            max(dd_l, dd_r, cross)
+        )
+
+    def query(self, start: datetime, end: datetime) -> RangeExtremes:
+        """Plus haut, plus bas et drawdown maximal des barres de ]start, end]"""
+        ts = self._ts[:self._n]
+        i = int(np.searchsorted(ts, _epoch(start), side="right"))
+        j = max(i, int(np.searchsorted(ts, _epoch(end), side="right")))
+        if j == i:
+            return RangeExtremes(start, end, 0, None, None, None)
+
+        high, low, drawdown = self.query_range(i, j)
+        return RangeExtremes(
+            start=start,
+            end=end,
+            bars=j - i,
+            high=float(high),
+            low=float(low),
+            max_drawdown=float(drawdown)
+        )
+
+    def trailing(self, window: timedelta, end: Optional[datetime] = None) -> RangeExtremes:
+        """Extrêmes sur la fenêtre glissante se terminant à `end` (dernière barre par défaut)"""
+        end = end or self.last_timestamp or datetime.utcnow()
+        return self.query(end - window, end)
+
+
+# Script de test : comparaison avec un parcours complet
+if __name__ == "__main__":
+    import time
+
+    n = 525_600
+    rng = np.random.default_rng(42)
+    close = 40_000 * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+    start_date = datetime(2024, 1, 1)
+    df = pl.DataFrame({
+        "timestamp": pl.datetime_range(
+            start_date, start_date + timedelta(minutes=n - 1), "1m", eager=True
+        ),
+        "high": close * (1 + rng.random(n) * 1e-3),
+        "low": close * (1 - rng.random(n) * 1e-3)
+    })
+
+    begin = time.perf_counter()
+    index = RangeExtremumIndex.from_frame(df)
+    print(f"Construction ({n} barres) : {time.perf_counter() - begin:.3f}s")
+
+    queries = 1_000
+    windows = rng.integers(0, n, size=(queries, 2))
+    windows.sort(axis=1)
+    bounds = [
+        (start_date + timedelta(minutes=int(a)), start_date + timedelta(minutes=int(b)))
+        for a, b in windows
+    ]
+
+    begin = time.perf_counter()
+    indexed = [index.query(a, b) for a, b in bounds]
+    index_time = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    scanned = []
+    for a, b in bounds:
+        window = df.filter((pl.col("timestamp") > a) & (pl.col("timestamp") <= b))
+        peaks = window["high"].cum_max().shift(1)
+        scanned.append((
+            window["high"].max(),
+            window["low"].min(),
+            (1 - window["low"] / peaks).max()
+        ))
+    scan_time = time.perf_counter() - begin
+
+    errors = [
+        abs(r.high - s[0]) + abs(r.low - s[1]) + abs(r.max_drawdown - max(s[2] or 0.0, 0.0))
+        for r, s in zip(indexed, scanned) if r.bars
+    ]
+    print(f"Index : {index_time / queries * 1e6:.1f}µs/requête")
+    print(f"Parcours Polars : {scan_time / queries * 1e6:.1f}µs/requête")
+    print(f"Écart maximal : {max(errors):.2e}")
@@ -0,0 +1,256 @@
+# src/analysis/rolling.py
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import numpy as np
+import polars as pl
+import logging
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+def _epoch(value: datetime) -> int:
+    """Timestamp epoch en secondes (les datetimes naïfs sont en UTC, comme en base)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+@dataclass
+class WindowStatistics:
+    """Statistiques d'une fenêtre temporelle"""
+    start: datetime
+    end: datetime
+    bars: int
+    change: Optional[float]
+    volatility: Optional[float]
+    volume: float
+    vwap: Optional[float]
+
+
+class RollingStatistics:
+    """
+    Statistiques glissantes sur fenêtres calendaires
+
+    Les sommes préfixes des rendements logarithmiques, de leurs carrés, du
+    volume, du volume x prix et des prix logarithmiques sont maintenues sur la
+    série minute. Une fenêtre (24h, 7j, 30j...) se résout par deux recherches
+    dichotomiques sur les timestamps puis quelques différences de sommes :
+    le coût ne dépend pas de la taille de la fenêtre.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._n = 0
+        self._ts = np.empty(capacity, dtype=np.int64)        # secondes epoch
+        self._close = np.empty(capacity, dtype=np.float64)
+        self._log_price = np.empty(capacity, dtype=np.float64)
+        # Valeurs par barre conservées pour détecter les révisions
+        self._volume = np.empty(capacity, dtype=np.float64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        # Sommes préfixes : l'élément k couvre les barres [0, k)
+        self._cum_ret = np.zeros(capacity + 1, dtype=np.float64)
+        self._cum_ret2 = np.zeros(capacity + 1, dtype=np.float64)
+        self._cum_volume = np.zeros(capacity + 1, dtype=np.float64)
+        self._cum_pv = np.zeros(capacity + 1, dtype=np.float64)
+        self._cum_log_price = np.zeros(capacity + 1, dtype=np.float64)
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame) -> "RollingStatistics":
+        """Construit le moteur à partir d'un DataFrame OHLCV minute"""
+        engine = cls(capacity=max(len(df), 1024))
+        engine.extend(df)
+        return engine
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def last_timestamp(self) -> Optional[datetime]:
+        if self._n == 0:
+            return None
+        return datetime.fromtimestamp(int(self._ts[self._n - 1]), timezone.utc).replace(tzinfo=None)
+
+    def _reserve(self, size: int):
+        """Agrandit les tableaux (doublement de capacité)"""
+        capacity = len(self._ts)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("_ts", "_close", "_log_price", "_volume", "_price"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+        for name in ("_cum_ret", "_cum_ret2", "_cum_volume", "_cum_pv", "_cum_log_price"):
+            old = getattr(self, name)
+            new = np.zeros(capacity + 1, dtype=old.dtype)
+            new[:self._n + 1] = old[:self._n + 1]
+            setattr(self, name, new)
+
+    def extend(self, df: pl.DataFrame) -> int:
+        """
+        Ajoute les nouvelles barres minute et applique les révisions
+
+        Les barres déjà connues sont comparées à celles de `df` : à partir
+        de la première barre révisée, insérée ou retirée, la série et ses
+        sommes préfixes sont recalculées (reconstruction du suffixe). Les
+        barres antérieures au début de `df` sont conservées telles quelles.
+
+        Returns:
+            Nombre de barres ajoutées ou recalculées
+        """
+        if df.is_empty():
+            return 0
+
+        df = df.sort("timestamp")
+        ts = df["timestamp"].dt.epoch("s").to_numpy()
+        close = df["close"].cast(pl.Float64).to_numpy()
+        volume = df["volume"].cast(pl.Float64).fill_null(0).to_numpy()
+        if "high" in df.columns and "low" in df.columns:
+            price = (
+                df["high"].cast(pl.Float64).to_numpy()
+                + df["low"].cast(pl.Float64).to_numpy()
+                + close
+            ) / 3
+        else:
+            price = close
+
+        n = self._n
+        start = int(np.searchsorted(self._ts[:n], ts[0], side="left"))
+        # Barres de df déjà couvertes par la série (jusqu'à sa dernière barre)
+        known = int(np.searchsorted(ts, self._ts[n - 1], side="right")) if n else 0
+        overlap = min(n - start, known)
+        same = (
+            (self._ts[start:start + overlap] == ts[:overlap])
+            & (self._close[start:start + overlap] == close[:overlap])
+            & (self._volume[start:start + overlap] == volume[:overlap])
+            & (self._price[start:start + overlap] == price[:overlap])
+        )
+        k = overlap if same.all() else int(np.argmin(same))
+        if k == overlap == known:
+            # Aucune révision : seules les barres postérieures sont ajoutées
+            start, k = n, known
+        else:
+            # Suffixe reconstruit : barres de df depuis la première différence,
+            # puis barres connues postérieures à la fin de df
+            tail = slice(int(np.searchsorted(self._ts[:n], ts[-1], side="right")), n)
+            ts = np.concatenate([ts[k:], self._ts[tail]])
+            close = np.concatenate([close[k:], self._close[tail]])
+            volume = np.concatenate([volume[k:], self._volume[tail]])
+            price = np.concatenate([price[k:], self._price[tail]])
+            start, k = start + k, 0
+        ts, close, volume, price = ts[k:], close[k:], volume[k:], price[k:]
+        if len(ts) == 0:
+            return 0
+        log_price = np.log(close)
+
+        m = len(ts)
+        self._reserve(start + m)
+        self._ts[start:start + m] = ts
+        self._close[start:start + m] = close
+        self._log_price[start:start + m] = log_price
+        self._volume[start:start + m] = volume
+        self._price[start:start + m] = price
+
+        # Rendement de la barre k : log(close_k / close_{k-1}), nul pour la première
+        previous = self._log_price[start - 1] if start > 0 else log_price[0]
+        returns = np.diff(log_price, prepend=previous)
+
+        self._cum_ret[start + 1:start + m + 1] = self._cum_ret[start] + np.cumsum(returns)
+        self._cum_ret2[start + 1:start + m + 1] = self._cum_ret2[start] + np.cumsum(returns * returns)
+        self._cum_volume[start + 1:start + m + 1] = self._cum_volume[start] + np.cumsum(volume)
+        self._cum_pv[start + 1:start + m + 1] = self._cum_pv[start] + np.cumsum(price * volume)
+        self._cum_log_price[start + 1:start + m + 1] = self._cum_log_price[start] + np.cumsum(log_price)
+        self._n = start + m
+
+        logger.debug(f"Statistiques glissantes étendues : {m} barres depuis l'indice {start} ({self._n} au total)")
+        return m
+
+    def _bounds(self, start: datetime, end: datetime) -> tuple[int, int]:
+        """Indices [i, j) des barres dont le timestamp est dans ]start, end]"""
+        ts = self._ts[:self._n]
+        i = int(np.searchsorted(ts, _epoch(start), side="right"))
+        j = int(np.searchsorted(ts, _epoch(end), side="right"))
+        return i, max(i, j)
+
+    def query(self, start: datetime, end: datetime) -> WindowStatistics:
+        """
+        Statistiques des barres de l'intervalle ]start, end]
+
+        La variation est mesurée depuis la dernière clôture connue à `start` ;
+        la volatilité réalisée est annualisée selon la durée de la
+        fenêtre, indépendamment du timeframe affiché.
+        """
+        i, j = self._bounds(start, end)
+        bars = j - i
+
+        if bars == 0:
+            return WindowStatistics(start, end, 0, None, None, 0.0, None)
+
+        # Les rendements de la fenêtre sont ceux des barres ]base, j)
+        base = max(i - 1, 0)
+        change = float(np.expm1(self._cum_ret[j] - self._cum_ret[base + 1]))
+        realized_var = self._cum_ret2[j] - self._cum_ret2[base + 1]
+        duration = (end - start).total_seconds()
+        volatility = (
+            float(np.sqrt(realized_var * SECONDS_PER_YEAR / duration))
+            if duration > 0 and j - base > 1 else None
+        )
+
+        volume = float(self._cum_volume[j] - self._cum_volume[i])
+        vwap = float((self._cum_pv[j] - self._cum_pv[i]) / volume) if volume > 0 else None
+
+        return WindowStatistics(
+            start=start,
+            end=end,
+            bars=bars,
+            change=change,
+            volatility=volatility,
+            volume=volume,
+            vwap=vwap
+        )
+
+    def trailing(self, window: timedelta, end: Optional[datetime] = None) -> WindowStatistics:
+        """Statistiques sur la fenêtre glissante se terminant à `end` (dernière barre par défaut)"""
+        end = end or self.last_timestamp or datetime.utcnow()
+        return self.query(end - window, end)
+
+    def geometric_mean_price(self, start: datetime, end: datetime) -> Optional[float]:
+        """Moyenne géométrique des clôtures entre deux dates"""
+        i, j = self._bounds(start, end)
+        if j == i:
+            return None
+        return float(np.exp((self._cum_log_price[j] - self._cum_log_price[i]) / (j - i)))
+
+
+# Script de test
+if __name__ == "__main__":
+    import time
+
+    n = 525_600
+    rng = np.random.default_rng(42)
+    close = 40_000 * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+    df = pl.DataFrame({
+        "timestamp": pl.datetime_range(
+            datetime(2024, 1, 1), datetime(2024, 1, 1) + timedelta(minutes=n - 1), "1m", eager=True
+        ),
+        "close": close,
+        "volume": rng.random(n)
+    })
+
+    start = time.perf_counter()
+    engine = RollingStatistics.from_frame(df)
+    print(f"Construction ({n} barres) : {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        engine.trailing(timedelta(days=30))
+    print(f"Requête 30j : {(time.perf_counter() - start) / 10_000 * 1e6:.1f}µs")
+
+    for label, window in [("24h", timedelta(hours=24)), ("7j", timedelta(days=7)), ("30j", timedelta(days=30))]:
+        stats = engine.trailing(window)
+        print(f"{label}: variation {stats.change:+.2%}, volatilité {stats.volatility:.1%}, "
+              f"volume {stats.volume:,.0f}, VWAP {stats.vwap:,.2f}")
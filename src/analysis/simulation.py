@@ -0,0 +1,223 @@
+# src/analysis/simulation.py
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import get_context, shared_memory
+from typing import Callable, Dict, List, Optional, Sequence
+import os
+import time
+import numpy as np
+import polars as pl
+import logging
+from .sketches import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+MODELS = ("gbm", "bootstrap")
+
+# Précision des sketches agrégés (sur les rendements logarithmiques cumulés)
+RELATIVE_ACCURACY = 0.005
+
+
+@dataclass
+class SimulationResult:
+    """Distributions agrégées d'une simulation Monte Carlo"""
+    model: str
+    start_price: float
+    n_paths: int
+    checkpoints: List[int]
+    sketches: List[QuantileSketch]  # Un sketch de log-rendements par checkpoint
+    elapsed: float
+
+    @property
+    def paths_per_second(self) -> float:
+        return self.n_paths / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def price_quantiles(self, quantiles: Sequence[float] = (0.01, 0.05, 0.5, 0.95, 0.99)) -> pl.DataFrame:
+        """Quantiles de prix à chaque checkpoint (format long)"""
+        rows = []
+        for step, sketch in zip(self.checkpoints, self.sketches):
+            for q, value in zip(quantiles, sketch.quantiles(quantiles)):
+                rows.append({"step": step, "quantile": q, "price": self.start_price * np.exp(value)})
+        return pl.DataFrame(rows)
+
+    def value_at_risk(self, level: float = 0.95) -> float:
+        """VaR à l'horizon final, en fraction positive du prix initial"""
+        return -float(np.expm1(self.sketches[-1].quantile(1 - level)))
+
+    def expected_shortfall(self, level: float = 0.95) -> float:
+        """Perte moyenne au-delà de la VaR à l'horizon final"""
+        return -float(np.expm1(self.sketches[-1].tail_mean(1 - level)))
+
+
+class MonteCarloSimulator:
+    """
+    Simulation de trajectoires de prix à partir de l'historique BTC
+
+    Deux modèles : mouvement brownien géométrique calibré sur les rendements
+    historiques, ou ré-échantillonnage (bootstrap) de ces rendements. Les
+    trajectoires sont générées par blocs vectorisés de taille bornée, réparties
+    sur un pool de processus, et seuls des sketches de quantiles remontent
+    vers le processus principal : aucune trajectoire n'est conservée.
+    """
+
+    def __init__(self, log_returns: np.ndarray, start_price: float):
+        log_returns = np.asarray(log_returns, dtype=np.float64)
+        self.log_returns = log_returns[np.isfinite(log_returns)]
+        if len(self.log_returns) < 2:
+            raise ValueError("Historique insuffisant pour calibrer la simulation")
+        self.start_price = float(start_price)
+        self.mu = float(self.log_returns.mean())
+        self.sigma = float(self.log_returns.std(ddof=1))
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame) -> "MonteCarloSimulator":
+        """Calibre le simulateur sur un DataFrame OHLCV (un pas = une bougie)"""
+        close = df.sort("timestamp")["close"].cast(pl.Float64).to_numpy()
+        return cls(np.diff(np.log(close)), start_price=close[-1])
+
+    def simulate(
+        self,
+        n_paths: int = 100_000,
+        n_steps: int = 1440,
+        model: str = "gbm",
+        n_checkpoints: int = 24,
+        chunk_size: int = 2048,
+        processes: Optional[int] = None,
+        seed: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> SimulationResult:
+        """
+        Simule `n_paths` trajectoires de `n_steps` pas
+
+        Args:
+            model: "gbm" ou "bootstrap"
+            n_checkpoints: Nombre de pas (régulièrement espacés) où les
+                distributions sont agrégées ; le dernier est l'horizon
+            chunk_size: Trajectoires par bloc (mémoire ~ chunk_size x n_steps x 4 octets)
+            processes: Nombre de processus (1 : exécution dans le processus courant)
+            seed: Graine ; le résultat ne dépend pas du nombre de processus
+            on_progress: Rappel (trajectoires terminées, total) à chaque bloc
+        """
+        if model not in MODELS:
+            raise ValueError(f"Modèle inconnu : {model}")
+
+        checkpoints = np.unique(
+            np.linspace(n_steps / n_checkpoints, n_steps, n_checkpoints).round().astype(int)
+        ).tolist()
+        sizes = [min(chunk_size, n_paths - k) for k in range(0, n_paths, chunk_size)]
+        # Une graine indépendante par bloc : reproductible quel que soit le pool
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        sketches = [QuantileSketch(RELATIVE_ACCURACY) for _ in checkpoints]
+        done = 0
+
+        def collect(payload: List[bytes], size: int):
+            nonlocal done
+            for sketch, data in zip(sketches, payload):
+                sketch.merge(QuantileSketch.from_bytes(data))
+            done += size
+            if on_progress:
+                on_progress(done, n_paths)
+
+        start = time.perf_counter()
+        if processes == 1:
+            _worker_state.update(returns=self.log_returns)
+            for size, child in zip(sizes, seeds):
+                collect(_simulate_chunk(model, size, n_steps, checkpoints, child, self.mu, self.sigma), size)
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=self.log_returns.nbytes)
+            try:
+                np.ndarray(self.log_returns.shape, dtype=np.float64, buffer=shm.buf)[:] = self.log_returns
+                with ProcessPoolExecutor(
+                    max_workers=processes or os.cpu_count(),
+                    mp_context=get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(shm.name, len(self.log_returns))
+                ) as pool:
+                    futures = {
+                        pool.submit(
+                            _simulate_chunk, model, size, n_steps, checkpoints,
+                            child, self.mu, self.sigma
+                        ): size
+                        for size, child in zip(sizes, seeds)
+                    }
+                    # Agrégation au fil de l'eau, dans l'ordre de complétion
+                    for future in as_completed(futures):
+                        collect(future.result(), futures[future])
+            finally:
+                shm.close()
+                shm.unlink()
+        elapsed = time.perf_counter() - start
+
+        logger.info(
+            f"Simulation {model}: {n_paths} trajectoires x {n_steps} pas en {elapsed:.1f}s"
+        )
+        return SimulationResult(
+            model=model,
+            start_price=self.start_price,
+            n_paths=n_paths,
+            checkpoints=checkpoints,
+            sketches=sketches,
+            elapsed=elapsed
+        )
+
+
+# État des workers du pool (rendements historiques en mémoire partagée)
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(shm_name: str, length: int):
+    """Attache les rendements historiques partagés dans le worker"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_state["shm"] = shm  # Conserver la référence tant que le worker vit
+    _worker_state["returns"] = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+
+
+def _simulate_chunk(
+    model: str,
+    size: int,
+    n_steps: int,
+    checkpoints: List[int],
+    seed: np.random.SeedSequence,
+    mu: float,
+    sigma: float
+) -> List[bytes]:
+    """Simule un bloc de trajectoires et retourne un sketch sérialisé par checkpoint"""
+    rng = np.random.default_rng(seed)
+
+    if model == "gbm":
+        # Correction d'Itô incluse dans mu (moyenne des log-rendements)
+        increments = rng.standard_normal((size, n_steps), dtype=np.float32)
+        increments *= sigma
+        increments += mu
+    else:
+        returns = _worker_state["returns"]
+        idx = rng.integers(0, len(returns), size=(size, n_steps))
+        increments = returns[idx].astype(np.float32)
+        del idx
+
+    np.cumsum(increments, axis=1, out=increments)
+    columns = np.asarray(checkpoints) - 1
+    return [
+        QuantileSketch(RELATIVE_ACCURACY).update(increments[:, column]).to_bytes()
+        for column in columns
+    ]
+
+
+# Script de test
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    history = rng.normal(0, 5e-4, 525_600)
+    simulator = MonteCarloSimulator(history, start_price=60_000)
+
+    for model in MODELS:
+        result = simulator.simulate(
+            n_paths=200_000,
+            n_steps=1440,
+            model=model,
+            seed=7,
+            on_progress=lambda done, total: None
+        )
+        print(f"{model}: {result.paths_per_second:,.0f} trajectoires/s, "
+              f"VaR 99% {result.value_at_risk(0.99):.2%}, "
+              f"ES 99% {result.expected_shortfall(0.99):.2%}")
+    print(result.price_quantiles().filter(pl.col("step") == 1440))
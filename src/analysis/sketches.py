@@ -0,0 +1,189 @@
+# src/analysis/sketches.py
+from typing import Iterable, Optional
+import math
+import struct
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# En-tête binaire : version, précision, nb zéros, nb total, min, max, somme,
+# nb de buckets positifs, nb de buckets négatifs
+_HEADER = struct.Struct("<BdqqdddII")
+_FORMAT_VERSION = 1
+
+
+class QuantileSketch:
+    """
+    Sketch de quantiles à erreur relative bornée (type DDSketch)
+
+    Les valeurs sont rangées dans des buckets logarithmiques de raison
+    gamma = (1 + a) / (1 - a) : tout quantile est restitué avec une erreur
+    relative d'au plus `a`. Deux sketches de même précision se fusionnent
+    exactement en additionnant leurs compteurs, ce qui permet de combiner
+    des partitions journalières pour n'importe quelle plage de dates.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-12):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("La précision relative doit être dans ]0, 1[")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive: dict[int, int] = {}
+        self._negative: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _keys(self, values: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(values) / self._log_gamma).astype(np.int64)
+
+    def _value(self, key: int) -> float:
+        """Valeur représentative d'un bucket (milieu en erreur relative)"""
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    @staticmethod
+    def _accumulate(store: dict[int, int], keys: np.ndarray):
+        unique, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values: Iterable[float]) -> "QuantileSketch":
+        """Ajoute un lot de valeurs (les NaN sont ignorés)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+
+        positive = values[values > self.min_value]
+        negative = -values[values < -self.min_value]
+        self._accumulate(self._positive, self._keys(positive))
+        self._accumulate(self._negative, self._keys(negative))
+        self.zero_count += int(values.size - positive.size - negative.size)
+
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sum += float(values.sum())
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fusionne un autre sketch de même précision dans celui-ci"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Impossible de fusionner des sketches de précisions différentes")
+        for key, count in other._positive.items():
+            self._positive[key] = self._positive.get(key, 0) + count
+        for key, count in other._negative.items():
+            self._negative[key] = self._negative.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        return self
+
+    @classmethod
+    def merge_all(
+        cls,
+        sketches: Iterable["QuantileSketch"],
+        relative_accuracy: float = 0.01
+    ) -> "QuantileSketch":
+        """Fusionne plusieurs sketches dans un nouveau sketch"""
+        merged = cls(relative_accuracy)
+        for sketch in sketches:
+            merged.merge(sketch)
+        return merged
+
+    def _buckets(self) -> tuple[np.ndarray, np.ndarray]:
+        """Valeurs représentatives et effectifs des buckets, par ordre croissant"""
+        neg_keys = sorted(self._negative, reverse=True)
+        pos_keys = sorted(self._positive)
+        values = (
+            [-self._value(k) for k in neg_keys]
+            + ([0.0] if self.zero_count else [])
+            + [self._value(k) for k in pos_keys]
+        )
+        counts = (
+            [self._negative[k] for k in neg_keys]
+            + ([self.zero_count] if self.zero_count else [])
+            + [self._positive[k] for k in pos_keys]
+        )
+        return np.asarray(values), np.asarray(counts, dtype=np.int64)
+
+    def quantiles(self, qs: Iterable[float]) -> list[Optional[float]]:
+        """Quantiles approchés (None si le sketch est vide)"""
+        qs = list(qs)
+        if self.count == 0:
+            return [None] * len(qs)
+
+        values, counts = self._buckets()
+        cumulative = np.cumsum(counts)
+        results = []
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError(f"Quantile hors de [0, 1] : {q}")
+            rank = q * (self.count - 1)
+            value = values[int(np.searchsorted(cumulative, rank, side="right"))]
+            results.append(float(min(max(value, self.min), self.max)))
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def tail_mean(self, q: float) -> Optional[float]:
+        """Moyenne approchée des valeurs inférieures ou égales au quantile q"""
+        if self.count == 0:
+            return None
+        values, counts = self._buckets()
+        cutoff = max(q * self.count, 1.0)
+        cumulative = np.cumsum(counts)
+        taken = np.minimum(counts, np.maximum(cutoff - (cumulative - counts), 0))
+        return float(np.dot(values, taken) / taken.sum())
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_bytes(self) -> bytes:
+        """Sérialisation compacte (en-tête + clés int32 + compteurs int64)"""
+        pos_keys = np.fromiter(self._positive, dtype=np.int32, count=len(self._positive))
+        neg_keys = np.fromiter(self._negative, dtype=np.int32, count=len(self._negative))
+        return b"".join([
+            _HEADER.pack(
+                _FORMAT_VERSION, self.relative_accuracy, self.zero_count, self.count,
+                self.min, self.max, self.sum, len(pos_keys), len(neg_keys)
+            ),
+            pos_keys.tobytes(),
+            np.fromiter(self._positive.values(), dtype=np.int64, count=len(pos_keys)).tobytes(),
+            neg_keys.tobytes(),
+            np.fromiter(self._negative.values(), dtype=np.int64, count=len(neg_keys)).tobytes()
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "QuantileSketch":
+        """Reconstruit un sketch sérialisé par to_bytes"""
+        (
+            version, accuracy, zero_count, count, minimum, maximum, total, n_pos, n_neg
+        ) = _HEADER.unpack_from(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Version de sketch non supportée : {version}")
+
+        sketch = cls(accuracy)
+        sketch.zero_count, sketch.count = zero_count, count
+        sketch.min, sketch.max, sketch.sum = minimum, maximum, total
+
+        offset = _HEADER.size
+        for store, size in ((sketch._positive, n_pos), (sketch._negative, n_neg)):
+            keys = np.frombuffer(data, dtype=np.int32, count=size, offset=offset)
+            offset += keys.nbytes
+            counts = np.frombuffer(data, dtype=np.int64, count=size, offset=offset)
+            offset += counts.nbytes
+            store.update(zip(keys.tolist(), counts.tolist()))
+        return sketch
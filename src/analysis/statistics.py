@@ -1,13 +1,37 @@
 # src/analysis/statistics.py
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional
+import threading
 import numpy as np
 import polars as pl
 from datetime import datetime, timedelta
 import logging
 from .indicators import TechnicalAnalysis
+from .rolling import RollingStatistics, WindowStatistics
+from .range_index import RangeExtremumIndex, RangeExtremes
+from .profiles import VolumeProfile
+from .sketches import QuantileSketch
+from ..monitoring.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_CACHE_REQUESTS = metrics.counter(
+    "summary_cache_requests_total",
+    "Accès au cache des résumés de marché par timeframe et version des données",
+    labels=("result",)
+)
+
+# Fenêtres calendaires usuelles
+WINDOWS = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30)
+}
+
+# Nombre de lignes nécessaires au résumé : 24 périodes pour les variations,
+# 30 rendements (donc 31 prix) pour la volatilité
+SUMMARY_TAIL_ROWS = 31
+
 class MarketStatistics:
     """Calcul des statistiques de marché"""
     
@@ -59,10 +83,128 @@ class MarketStatistics:
             
         return df
     
+    @staticmethod
+    def get_window_statistics(
+        rolling: RollingStatistics,
+        windows: Optional[Dict[str, timedelta]] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, WindowStatistics]:
+        """
+        Calcule variation, volatilité réalisée, volume et VWAP sur des fenêtres
+        calendaires (24h, 7j, 30j par défaut), quel que soit le timeframe
+        
+        Args:
+            rolling: Statistiques glissantes sur la série minute
+            windows: {libellé: durée}
+            end: Fin des fenêtres (dernière barre par défaut)
+        """
+        windows = windows or WINDOWS
+        return {
+            label: rolling.trailing(window, end=end)
+            for label, window in windows.items()
+        }
+    
+    @staticmethod
+    def get_range_extremes(
+        index: RangeExtremumIndex,
+        window: timedelta = WINDOWS["24h"],
+        end: Optional[datetime] = None
+    ) -> RangeExtremes:
+        """
+        Plus haut, plus bas et drawdown maximal sur une fenêtre glissante
+        
+        Args:
+            index: Index des extrêmes sur la série minute
+            window: Durée de la fenêtre
+            end: Fin de la fenêtre (dernière barre par défaut)
+        """
+        return index.trailing(window, end=end)
+    
+    @staticmethod
+    def get_max_drawdown(
+        index: RangeExtremumIndex,
+        start: datetime,
+        end: datetime
+    ) -> Optional[float]:
+        """Drawdown maximal (fraction du plus haut) entre deux dates"""
+        return index.query(start, end).max_drawdown
+    
+    @staticmethod
+    def get_quantiles(
+        store,
+        metric: str,
+        start: datetime,
+        end: datetime,
+        quantiles: tuple = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+    ) -> Dict[float, Optional[float]]:
+        """
+        Quantiles approchés d'une métrique sur une plage de dates
+        
+        Args:
+            store: SketchStore de la base (sketches journaliers fusionnés)
+            metric: "return_<timeframe>", "spread" ou "volume"
+            start, end: Plage [start, end[
+            quantiles: Quantiles demandés
+        """
+        sketch: QuantileSketch = store.merged(metric, start, end)
+        return dict(zip(quantiles, sketch.quantiles(quantiles)))
+    
+    @staticmethod
+    def get_volume_profile(
+        store,
+        start: datetime,
+        end: datetime,
+        rows: Optional[int] = None
+    ) -> VolumeProfile:
+        """
+        Profil de volume (volume par niveau de prix) sur une plage de dates
+        
+        Args:
+            store: VolumeProfileStore de la base (histogrammes journaliers fusionnés)
+            start, end: Plage [start, end[
+            rows: Nombre maximal de niveaux (regroupés), None pour le pas stocké
+        """
+        profile: VolumeProfile = store.merged(start, end)
+        return profile if rows is None else profile.rebin(rows)
+    
+    @staticmethod
+    def get_anchored_vwap(
+        store,
+        anchor: datetime,
+        end: Optional[datetime] = None
+    ) -> Optional[float]:
+        """VWAP ancré : prix moyen pondéré par les volumes depuis `anchor`"""
+        return store.merged(anchor, end or datetime.utcnow()).vwap
+    
+    @staticmethod
+    def get_value_at_risk(
+        store,
+        start: datetime,
+        end: datetime,
+        level: float = 0.95,
+        timeframe: str = "1m"
+    ) -> Dict[str, Optional[float]]:
+        """
+        VaR et expected shortfall historiques des rendements d'un timeframe
+        
+        Les pertes sont exprimées en fraction positive du prix.
+        """
+        sketch: QuantileSketch = store.merged(f"return_{timeframe}", start, end)
+        if len(sketch) == 0:
+            return {"var": None, "expected_shortfall": None, "observations": 0}
+        
+        tail = 1 - level
+        return {
+            "var": -float(np.expm1(sketch.quantile(tail))),
+            "expected_shortfall": -float(np.expm1(sketch.tail_mean(tail))),
+            "observations": len(sketch)
+        }
+    
     @staticmethod
     def get_market_summary(
         df: pl.DataFrame,
-        lookback_days: int = 30
+        lookback_days: int = 30,
+        rolling: Optional[RollingStatistics] = None
     ) -> Dict[str, Any]:
         """
         Calcule un résumé des statistiques de marché
@@ -70,6 +212,9 @@ class MarketStatistics:
         Args:
             df: DataFrame avec indicateurs techniques
             lookback_days: Nombre de jours pour l'analyse
+            rolling: Statistiques glissantes minute ; si fournies, variation,
+                volume et volatilités portent sur de vraies fenêtres de 24h,
+                7j et 30j au lieu d'un nombre de lignes
             
         Returns:
             Dictionnaire avec les statistiques de marché
@@ -84,6 +229,9 @@ class MarketStatistics:
             }
             
         try:
+            # Seules les dernières lignes interviennent dans le résumé
+            df = df.tail(SUMMARY_TAIL_ROWS)
+            
             # Calcul des rendements et volatilité
             df = MarketStatistics.calculate_returns(df)
             df = MarketStatistics.calculate_volatility(df)
@@ -106,6 +254,19 @@ class MarketStatistics:
                 if sma_20 is not None and sma_50 is not None:
                     trend = "Haussière" if sma_20 > sma_50 else "Baissière"
             
+            # Volatilités annualisées (None si historique insuffisant)
+            volatility_7d = df["volatility_7d"].tail(1)[0]
+            volatility_30d = df["volatility_30d"].tail(1)[0]
+            
+            # Fenêtres calendaires si la série minute est disponible
+            if rolling is not None and len(rolling) > 0:
+                windows = MarketStatistics.get_window_statistics(rolling)
+                if windows["24h"].change is not None:
+                    change_24h = windows["24h"].change * 100
+                    volume_24h = windows["24h"].volume
+                volatility_7d = windows["7d"].volatility
+                volatility_30d = windows["30d"].volatility
+            
             # RSI et MACD si disponibles
             rsi = float(df["RSI"].tail(1)[0]) if "RSI" in df.columns else None
             macd = float(df["MACD"].tail(1)[0]) if "MACD" in df.columns else None
@@ -118,6 +279,8 @@ class MarketStatistics:
                 "volume_24h": f"${volume_24h:,.0f}",
                 "rsi": f"{rsi:.1f}" if rsi is not None else "N/A",
                 "trend": trend if trend is not None else "N/D",
+                "volatility_7d": f"{volatility_7d:.1%}" if volatility_7d is not None else "N/A",
+                "volatility_30d": f"{volatility_30d:.1%}" if volatility_30d is not None else "N/A",
                 "technical_indicators": {
                     "rsi": rsi,
                     "macd": macd,
@@ -138,6 +301,84 @@ class MarketStatistics:
             }
 
 
+class SummaryService:
+    """
+    Résumé de marché mémoïsé par (timeframe, version des données)
+    
+    Une instance partagée par processus évite de recalculer le résumé pour
+    chaque KPI et chaque session tant que les données n'ont pas changé.
+    """
+    
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(
+        self,
+        df: pl.DataFrame,
+        timeframe: str,
+        version: Optional[Hashable] = None,
+        rolling: Optional[RollingStatistics] = None
+    ) -> Dict[str, Any]:
+        """
+        Retourne le résumé de marché, calculé au plus une fois par version
+        
+        Args:
+            df: DataFrame avec indicateurs techniques
+            timeframe: Timeframe des données
+            version: Version des données (sans version, pas de mémoïsation)
+            rolling: Statistiques glissantes minute (fenêtres calendaires)
+        """
+        if version is None:
+            return MarketStatistics.get_market_summary(df, rolling=rolling)
+        
+        key = (timeframe, version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                SUMMARY_CACHE_REQUESTS.labels("hit").inc()
+                return self._entries[key]
+        
+        SUMMARY_CACHE_REQUESTS.labels("miss").inc()
+        summary = MarketStatistics.get_market_summary(df, rolling=rolling)
+        if "latest_price" not in summary:
+            # Données vides ou erreur : ne pas figer le résultat
+            return summary
+        
+        with self._lock:
+            self._entries[key] = summary
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return summary
+    
+    def export(self, version: Hashable) -> Dict[str, Dict[str, Any]]:
+        """Résumés mémoïsés d'une version des données, par timeframe"""
+        with self._lock:
+            return {
+                timeframe: summary
+                for (timeframe, entry_version), summary in self._entries.items()
+                if entry_version == version
+            }
+    
+    def restore(self, version: Hashable, summaries: Dict[str, Dict[str, Any]]):
+        """Réinstalle des résumés sauvegardés pour une version des données"""
+        with self._lock:
+            for timeframe, summary in summaries.items():
+                self._entries[(timeframe, version)] = summary
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Vide le cache des résumés"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Instance partagée par toutes les sessions du processus
+summary_service = SummaryService()
+
+
 # Script de test
 if __name__ == "__main__":
     from ..data.processor import DataProcessor
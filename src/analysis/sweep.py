@@ -0,0 +1,307 @@
+# src/analysis/sweep.py
+from typing import Sequence
+import warnings
+import numpy as np
+import polars as pl
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Longueur des blocs de sommes cumulées des bandes de Bollinger (au moins la
+# plus grande période) : chaque bloc est centré sur sa propre moyenne
+BLOCK_SIZE = 256
+
+# Périodes dont l'écart-type est calculé directement sur chaque fenêtre :
+# l'annulation des sommes de carrés y pèse le plus (fenêtres presque plates)
+DIRECT_PERIOD = 16
+
+class IndicatorSweep:
+    """
+    Calcul des indicateurs sur une grille de périodes
+
+    Les sommes cumulées (et cumulées au carré) de la série sont calculées une
+    seule fois, puis chaque fenêtre se déduit par différence : une passe O(n)
+    vectorisée par période au lieu d'un rolling Polars par colonne.
+    Les conventions de TechnicalAnalysis sont conservées (min_periods=1).
+    """
+
+    @staticmethod
+    def _prefix_sums(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+        """
+        Sommes cumulées de la série centrée sur sa moyenne
+
+        Le centrage limite la perte de précision des sommes de carrés sur des
+        prix de l'ordre de 1e5.
+        """
+        offset = float(np.nanmean(values)) if len(values) else 0.0
+        centered = values - offset
+        cs = np.zeros(len(values) + 1)
+        cs2 = np.zeros(len(values) + 1)
+        np.cumsum(centered, out=cs[1:])
+        np.cumsum(centered * centered, out=cs2[1:])
+        return cs, cs2, offset
+
+    @staticmethod
+    def _window_sums(cs: np.ndarray, period: int) -> np.ndarray:
+        """Sommes glissantes déduites des sommes cumulées (min_periods=1)"""
+        n = len(cs) - 1
+        k = min(period, n)
+        sums = np.empty(n)
+        sums[:k] = cs[1:k + 1]
+        sums[k:] = cs[k + 1:] - cs[1:n - k + 1]
+        return sums
+
+    @staticmethod
+    def _block_sums(values: np.ndarray, block: int) -> dict[str, np.ndarray]:
+        """
+        Sommes cumulées par blocs de `block` points, centrées sur la moyenne du bloc
+
+        Sur une longue série, des sommes de carrés cumulées depuis le début
+        (même centrées sur la moyenne globale) atteignent des ordres de
+        grandeur qui noient la variance des petites fenêtres. Repartir de
+        zéro à chaque bloc, autour d'une référence locale, borne l'erreur
+        par la dispersion des prix à l'intérieur d'un bloc.
+        """
+        n = len(values)
+        rows = -(-n // block)
+        padded = np.full(rows * block, np.nan)
+        padded[:n] = values
+        padded = padded.reshape(rows, block)
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            offsets = np.nan_to_num(np.nanmean(padded, axis=1))
+        centered = np.nan_to_num(padded - offsets[:, None])
+        inclusive = np.cumsum(centered, axis=1)
+        inclusive2 = np.cumsum(centered * centered, axis=1)
+        centered = centered.ravel()[:n]
+        return {
+            "offsets": offsets,
+            "reference": np.repeat(offsets, block)[:n],
+            "totals": inclusive[:, -1],
+            "totals2": inclusive2[:, -1],
+            "inclusive": inclusive.ravel()[:n],
+            "inclusive2": inclusive2.ravel()[:n],
+            # Sommes du début du bloc jusqu'au point exclu
+            "exclusive": inclusive.ravel()[:n] - centered,
+            "exclusive2": inclusive2.ravel()[:n] - centered * centered
+        }
+
+    @staticmethod
+    def _window_moments(sums: dict, block: int, period: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Sommes glissantes (valeurs et carrés) centrées sur la référence du bloc
+        de chaque point (min_periods=1)
+
+        Une fenêtre (period <= block) couvre au plus deux blocs : pour les
+        period - 1 premiers points de chaque bloc, la partie du bloc précédent
+        est recentrée sur la référence du bloc courant.
+        """
+        n = len(sums["inclusive"])
+        k = min(period, n)
+        s1 = sums["inclusive"].copy()
+        s2 = sums["inclusive2"].copy()
+        # Début de fenêtre : max(i - period + 1, 0)
+        s1[:k - 1] -= sums["exclusive"][0]
+        s2[:k - 1] -= sums["exclusive2"][0]
+        s1[k - 1:] -= sums["exclusive"][:n - k + 1]
+        s2[k - 1:] -= sums["exclusive2"][:n - k + 1]
+
+        rows = -(-n // block)
+        cross = (np.arange(1, rows)[:, None] * block + np.arange(period - 1)).ravel()
+        cross = cross[cross < n]
+        if len(cross):
+            first = cross - (period - 1)
+            previous = first // block
+            head = sums["totals"][previous] - sums["exclusive"][first]
+            head2 = sums["totals2"][previous] - sums["exclusive2"][first]
+            length = (previous + 1) * block - first
+            shift = sums["offsets"][previous] - sums["reference"][cross]
+            s1[cross] = sums["inclusive"][cross] + head + length * shift
+            s2[cross] = sums["inclusive2"][cross] + head2 + 2 * shift * head + length * shift * shift
+        return s1, s2
+
+    @staticmethod
+    def _direct_std(values: np.ndarray, period: int) -> np.ndarray:
+        """
+        Écart-type échantillon des fenêtres complètes, par écarts au premier point
+
+        Les écarts au sein d'une courte fenêtre restent petits : pas
+        d'annulation, et une fenêtre plate donne exactement zéro.
+        """
+        m = len(values) - period + 1
+        first = values[:m]
+        s1 = np.zeros(m)
+        s2 = np.zeros(m)
+        for offset in range(1, period):
+            deviation = values[offset:offset + m] - first
+            s1 += deviation
+            s2 += deviation * deviation
+        return np.sqrt(np.maximum(s2 - s1 * s1 / period, 0.0) / (period - 1))
+
+    @staticmethod
+    def _window_counts(n: int, period: int) -> np.ndarray:
+        """Nombre de points dans chaque fenêtre (min_periods=1)"""
+        return np.minimum(np.arange(1, n + 1), period).astype(np.float64)
+
+    @staticmethod
+    def _check_periods(periods: Sequence[int]):
+        invalid = [period for period in periods if period <= 0]
+        if invalid:
+            raise ValueError(f"Périodes invalides (entiers positifs attendus) : {invalid}")
+
+    @staticmethod
+    def _column(df: pl.DataFrame, column: str) -> np.ndarray:
+        return df.sort("timestamp")[column].cast(pl.Float64).to_numpy()
+
+    @staticmethod
+    def sma_grid(
+        df: pl.DataFrame,
+        periods: Sequence[int],
+        column: str = "close",
+        dtype: type = np.float64
+    ) -> np.ndarray:
+        """
+        Calcule les SMA pour toutes les périodes demandées
+
+        Returns:
+            Tableau (len(periods), len(df)), une ligne par période
+        """
+        IndicatorSweep._check_periods(periods)
+        values = IndicatorSweep._column(df, column)
+        n = len(values)
+        cs, _, offset = IndicatorSweep._prefix_sums(values)
+        grid = np.empty((len(periods), n), dtype=dtype)
+
+        for row, period in enumerate(periods):
+            count = IndicatorSweep._window_counts(n, period)
+            grid[row] = IndicatorSweep._window_sums(cs, period) / count + offset
+
+        logger.debug(f"Grille SMA calculée: {len(periods)} périodes x {n} points")
+        return grid
+
+    @staticmethod
+    def bollinger_grid(
+        df: pl.DataFrame,
+        periods: Sequence[int],
+        std_dev: float = 2.0,
+        column: str = "close",
+        dtype: type = np.float64
+    ) -> dict[str, np.ndarray]:
+        """
+        Calcule les bandes de Bollinger pour toutes les périodes demandées
+
+        Les variances sont tirées de sommes cumulées par blocs (voir
+        _block_sums), et calculées fenêtre par fenêtre jusqu'à DIRECT_PERIOD.
+
+        Returns:
+            Dictionnaire {"BB_middle", "BB_upper", "BB_lower"} de tableaux
+            (len(periods), len(df))
+        """
+        IndicatorSweep._check_periods(periods)
+        values = IndicatorSweep._column(df, column)
+        n = len(values)
+        shape = (len(periods), n)
+        middle = np.empty(shape, dtype=dtype)
+        upper = np.empty(shape, dtype=dtype)
+        lower = np.empty(shape, dtype=dtype)
+        if n == 0:
+            return {"BB_middle": middle, "BB_upper": upper, "BB_lower": lower}
+        block = max([BLOCK_SIZE, *periods])
+        sums = IndicatorSweep._block_sums(values, block)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for row, period in enumerate(periods):
+                count = IndicatorSweep._window_counts(n, period)
+                s1, s2 = IndicatorSweep._window_moments(sums, block, period)
+                mean = s1 / count
+                # Écart-type échantillon (ddof=1), comme rolling_std
+                var = np.maximum(s2 - s1 * mean, 0.0) / (count - 1)
+                std = np.sqrt(np.where(count > 1, var, np.nan))
+                if 1 < period <= min(DIRECT_PERIOD, n):
+                    std[period - 1:] = IndicatorSweep._direct_std(values, period)
+                middle[row] = mean + sums["reference"]
+                upper[row] = middle[row] + std_dev * std
+                lower[row] = middle[row] - std_dev * std
+
+        logger.debug(f"Grille Bollinger calculée: {len(periods)} périodes x {n} points")
+        return {"BB_middle": middle, "BB_upper": upper, "BB_lower": lower}
+
+    @staticmethod
+    def rsi_grid(
+        df: pl.DataFrame,
+        periods: Sequence[int],
+        column: str = "close",
+        dtype: type = np.float64
+    ) -> np.ndarray:
+        """
+        Calcule le RSI pour toutes les périodes demandées
+
+        Returns:
+            Tableau (len(periods), len(df)), une ligne par période
+        """
+        IndicatorSweep._check_periods(periods)
+        values = IndicatorSweep._column(df, column)
+        n = len(values)
+        diff = np.diff(values, prepend=values[:1]) if n else values
+        gains = np.zeros(n + 1)
+        losses = np.zeros(n + 1)
+        np.cumsum(np.where(diff > 0, diff, 0.0), out=gains[1:])
+        np.cumsum(np.where(diff < 0, -diff, 0.0), out=losses[1:])
+        grid = np.empty((len(periods), n), dtype=dtype)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for row, period in enumerate(periods):
+                # Les moyennes partagent le même dénominateur : le ratio suffit
+                rs = (
+                    IndicatorSweep._window_sums(gains, period)
+                    / IndicatorSweep._window_sums(losses, period)
+                )
+                grid[row] = 100 - (100 / (1 + rs))
+
+        logger.debug(f"Grille RSI calculée: {len(periods)} périodes x {n} points")
+        return grid
+
+    @staticmethod
+    def to_long_frame(
+        df: pl.DataFrame,
+        grid: np.ndarray,
+        periods: Sequence[int],
+        name: str = "value"
+    ) -> pl.DataFrame:
+        """
+        Convertit une grille (périodes x points) en DataFrame au format long
+
+        Returns:
+            DataFrame avec les colonnes timestamp, period et `name`
+        """
+        n_periods, n = grid.shape
+        timestamps = df.sort("timestamp")["timestamp"]
+        return pl.DataFrame({
+            "timestamp": pl.concat([timestamps] * n_periods) if n_periods else timestamps.clear(),
+            "period": np.repeat(np.asarray(periods, dtype=np.int32), n),
+            name: grid.reshape(-1)
+        })
+
+
+# Script de test
+if __name__ == "__main__":
+    import time
+    from datetime import datetime, timedelta
+
+    n = 525_600  # Une année de bougies minute
+    rng = np.random.default_rng(42)
+    df = pl.DataFrame({
+        "timestamp": pl.datetime_range(
+            datetime(2024, 1, 1), datetime(2024, 1, 1) + timedelta(minutes=n - 1), "1m", eager=True
+        ),
+        "close": 40_000 * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+    })
+    periods = list(range(2, 502))
+
+    start = time.perf_counter()
+    IndicatorSweep.sma_grid(df, periods, dtype=np.float32)
+    print(f"SMA  {len(periods)} périodes x {n} points: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    IndicatorSweep.rsi_grid(df, periods, dtype=np.float32)
+    print(f"RSI  {len(periods)} périodes x {n} points: {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,273 @@
+# src/benchmarks/generator.py
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+import argparse
+import math
+import time
+import numpy as np
+import polars as pl
+import pyarrow.parquet as pq
+import logging
+from ..config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Minutes par an (annualisation des paramètres de volatilité et de dérive)
+MINUTES_PER_YEAR = 525_600
+
+# Taille d'un bloc de génération : une graine par bloc, donc des données
+# identiques quelle que soit la taille des lots demandés
+BLOCK_MINUTES = 65_536
+
+# Sous-bloc de la récurrence AR(1) de la volatilité : phi^-k reste proche de 1
+AR_STEP = 1_024
+
+# Degrés de liberté des chocs de Student (queues épaisses)
+TAIL_DOF = 5
+
+
+class MarketDataGenerator:
+    """
+    Générateur de bougies minute synthétiques réalistes
+
+    Les prix suivent un mouvement brownien géométrique dont la volatilité
+    est stochastique : son logarithme suit un AR(1) persistant, ce qui
+    reproduit les grappes de volatilité observées sur le Bitcoin. Les chocs
+    sont de Student (queues épaisses). Le volume dépend de l'heure de la
+    journée et de la volatilité courante, et des interruptions (minutes
+    sans bougie) sont réparties aléatoirement.
+
+    La génération est vectorisée par blocs de BLOCK_MINUTES minutes, chacun
+    avec sa propre graine : le résultat ne dépend que de `seed`, pas de la
+    taille des lots.
+    """
+
+    def __init__(
+        self,
+        seed: int = 42,
+        start_price: float = 60_000.0,
+        annual_volatility: float = 0.6,
+        annual_drift: float = 0.0,
+        vol_persistence: float = 0.9995,
+        vol_of_vol: float = 0.5,
+        gap_rate: float = 1e-4,
+        mean_gap: float = 30.0,
+        mean_volume: float = 5.0
+    ):
+        """
+        Args:
+            seed: Graine du générateur
+            start_price: Prix de la première bougie
+            annual_volatility: Volatilité annualisée moyenne
+            annual_drift: Dérive annualisée des prix
+            vol_persistence: Coefficient AR(1) par minute du log de la volatilité
+            vol_of_vol: Écart-type stationnaire du log de la volatilité
+            gap_rate: Probabilité qu'une interruption commence à une minute donnée
+            mean_gap: Durée moyenne d'une interruption (minutes)
+            mean_volume: Volume moyen par minute (BTC)
+        """
+        self.seed = seed
+        self.start_price = start_price
+        self.sigma = annual_volatility / math.sqrt(MINUTES_PER_YEAR)
+        self.mu = annual_drift / MINUTES_PER_YEAR
+        self.phi = vol_persistence
+        self.eta = vol_of_vol * math.sqrt(1 - vol_persistence ** 2)
+        self.gap_rate = gap_rate
+        self.mean_gap = mean_gap
+        self.mean_volume = mean_volume
+
+    def span(self, rows: int) -> timedelta:
+        """Durée couverte en moyenne par `rows` bougies, interruptions comprises"""
+        gap_fraction = self.gap_rate * self.mean_gap / (1 + self.gap_rate * self.mean_gap)
+        return timedelta(minutes=math.ceil(rows / (1 - gap_fraction)))
+
+    def _log_volatility(self, shocks: np.ndarray, state: float) -> np.ndarray:
+        """
+        Récurrence h[t] = phi * h[t-1] + shocks[t], vectorisée par sous-blocs
+
+        Sur un sous-bloc, h[t] = phi^t * (cumsum(shocks * phi^-k)[t] + phi * h[-1]) ;
+        la taille AR_STEP garde phi^-k proche de 1 (pas de perte de précision).
+        """
+        powers = self.phi ** np.arange(AR_STEP)
+        h = np.empty_like(shocks)
+        for first in range(0, len(shocks), AR_STEP):
+            chunk = shocks[first:first + AR_STEP]
+            p = powers[:len(chunk)]
+            h[first:first + len(chunk)] = p * (np.cumsum(chunk / p) + self.phi * state)
+            state = h[first + len(chunk) - 1]
+        return h
+
+    def _gaps(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Masque des minutes conservées (False pendant une interruption)"""
+        starts = np.flatnonzero(rng.random(n) < self.gap_rate)
+        lengths = rng.geometric(1 / self.mean_gap, size=len(starts))
+        coverage = np.zeros(n + 1, dtype=np.int32)
+        np.add.at(coverage, starts, 1)
+        np.add.at(coverage, np.minimum(starts + lengths, n), -1)
+        return np.cumsum(coverage[:-1]) == 0
+
+    def blocks(self, start: datetime) -> Iterator[pl.DataFrame]:
+        """Blocs successifs de bougies minute à partir de `start` (suite infinie)"""
+        origin = np.datetime64(start.replace(second=0, microsecond=0), "us")
+        first_minute = start.hour * 60 + start.minute
+        log_price = math.log(self.start_price)
+        h = 0.0
+        block = 0
+
+        while True:
+            rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(block,)))
+            n = BLOCK_MINUTES
+            minutes = np.arange(block * n, (block + 1) * n)
+
+            # Volatilité stochastique puis rendements log à queues épaisses
+            h_block = self._log_volatility(rng.normal(0, self.eta, n), h)
+            h = h_block[-1]
+            sigma = self.sigma * np.exp(h_block - self.eta ** 2 / (2 * (1 - self.phi ** 2)))
+            shocks = rng.standard_t(TAIL_DOF, n) / math.sqrt(TAIL_DOF / (TAIL_DOF - 2))
+            returns = (self.mu - sigma ** 2 / 2) + sigma * shocks
+
+            close = np.exp(log_price + np.cumsum(returns))
+            open_ = np.empty(n)
+            open_[0] = math.exp(log_price)
+            open_[1:] = close[:-1]
+            log_price = math.log(close[-1])
+
+            # Mèches : excursion intra-minute proportionnelle à la volatilité
+            wick = sigma[:, None] * np.abs(rng.normal(0, 0.5, (n, 2)))
+            high = np.maximum(open_, close) * np.exp(wick[:, 0])
+            low = np.minimum(open_, close) * np.exp(-wick[:, 1])
+
+            # Volume : saisonnalité intrajournalière (pic vers 14h UTC) et grappes
+            hour = ((first_minute + minutes) % 1440) / 1440
+            seasonality = 1 + 0.5 * np.cos(2 * np.pi * (hour - 14 / 24))
+            volume = (
+                self.mean_volume * seasonality
+                * (sigma / self.sigma) ** 1.5
+                * rng.lognormal(-0.125, 0.5, n)
+            )
+            trades = rng.poisson(volume * 20).astype(np.int32)
+
+            keep = self._gaps(rng, n)
+            yield pl.DataFrame({
+                "timestamp": pl.Series(origin + minutes[keep] * np.timedelta64(1, "m")),
+                "open": open_[keep],
+                "high": high[keep],
+                "low": low[keep],
+                "close": close[keep],
+                "volume": volume[keep],
+                "trades": trades[keep]
+            })
+            block += 1
+
+    def frames(
+        self,
+        rows: int,
+        start: Optional[datetime] = None,
+        chunk_rows: int = 1_000_000
+    ) -> Iterator[pl.DataFrame]:
+        """
+        Lots d'au plus `chunk_rows` bougies, `rows` au total
+
+        Args:
+            rows: Nombre total de bougies
+            start: Première minute ; par défaut, la série se termine vers maintenant
+            chunk_rows: Taille maximale d'un lot
+        """
+        if start is None:
+            start = datetime.utcnow() - self.span(rows)
+
+        pending, pending_rows, remaining = [], 0, rows
+        for block in self.blocks(start):
+            block = block.head(remaining)
+            pending.append(block)
+            pending_rows += len(block)
+            remaining -= len(block)
+            while pending_rows >= chunk_rows or (remaining == 0 and pending_rows):
+                merged = pl.concat(pending)
+                yield merged.head(chunk_rows)
+                pending = [merged.slice(chunk_rows)]
+                pending_rows = len(pending[0])
+            if remaining == 0:
+                return
+
+    def frame(self, rows: int, start: Optional[datetime] = None) -> pl.DataFrame:
+        """Toutes les bougies en un seul DataFrame"""
+        return pl.concat(list(self.frames(rows, start)))
+
+    def to_duckdb(
+        self,
+        path: Path,
+        rows: int,
+        start: Optional[datetime] = None,
+        sketches: bool = True
+    ) -> int:
+        """
+        Écrit les bougies dans bitcoin_prices d'une base DuckDB (créée si besoin)
+
+        Les lots sont insérés directement depuis Arrow, sans objets
+        BitcoinPrice ; le filigrane est incrémenté une fois à la fin et les
+        sketches de quantiles et profils de volume reconstruits si demandé.
+        """
+        from ..database.operations import DatabaseManager
+
+        db = DatabaseManager(path)
+        written = 0
+        begin = time.perf_counter()
+        try:
+            for chunk in self.frames(rows, start):
+                db.conn.execute("INSERT OR REPLACE INTO bitcoin_prices SELECT * FROM chunk")
+                written += len(chunk)
+                logger.info(f"Génération : {written:,}/{rows:,} bougies ({written / (time.perf_counter() - begin):,.0f}/s)")
+            db._bump_watermark()
+            if sketches:
+                db.sketches.rebuild()
+                db.profiles.rebuild()
+        finally:
+            db.conn.close()
+        return written
+
+    def to_parquet(self, path: Path, rows: int, start: Optional[datetime] = None) -> int:
+        """Écrit les bougies dans un fichier Parquet, lot par lot (mémoire bornée)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        writer = None
+        try:
+            for chunk in self.frames(rows, start):
+                table = chunk.to_arrow()
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                writer.write_table(table)
+                written += len(chunk)
+                logger.info(f"Génération : {written:,}/{rows:,} bougies")
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération de bougies minute synthétiques")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Nombre de bougies")
+    parser.add_argument("--seed", type=int, default=42, help="Graine")
+    parser.add_argument("--gap-rate", type=float, default=1e-4, help="Probabilité d'interruption par minute")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--duckdb", type=Path, help="Base DuckDB de destination")
+    target.add_argument("--parquet", type=Path, help="Fichier Parquet de destination")
+    parser.add_argument("--no-sketches", action="store_true", help="Ne pas reconstruire les sketches ni les profils de volume (DuckDB)")
+    args = parser.parse_args()
+    setup_logging()
+
+    generator = MarketDataGenerator(seed=args.seed, gap_rate=args.gap_rate)
+    begin = time.perf_counter()
+    if args.duckdb:
+        written = generator.to_duckdb(args.duckdb, args.rows, sketches=not args.no_sketches)
+    else:
+        written = generator.to_parquet(args.parquet, args.rows)
+    elapsed = time.perf_counter() - begin
+    print(f"{written:,} bougies écrites en {elapsed:.1f}s ({written / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
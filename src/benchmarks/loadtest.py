@@ -0,0 +1,533 @@
+# src/benchmarks/loadtest.py
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import aiohttp
+from aiohttp import web
+import numpy as np
+import psutil
+import logging
+from ..config import config, setup_logging
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAMES = ["1m", "5m", "1H", "6H", "1D", "1W"]
+INDICATORS = ["sma", "bb", "rsi", "macd"]
+OUTPUTS = ["current_price", "price_change", "volume_24h", "rsi_value", "price_chart", "technical_chart"]
+
+# Un palier est au-delà du coude quand son p95 dépasse ce multiple du p95 du premier palier
+KNEE_FACTOR = 3.0
+
+# Dégradation tolérée par rapport à une référence avant de signaler une régression
+REGRESSION_TOLERANCE = 0.2
+
+# Transactions par seconde de l'API locale (identifiant = seconde epoch x taux + rang)
+STAND_IN_TRADES_PER_SECOND = 4
+
+
+def _candle(minute: int) -> tuple:
+    """Bougie déterministe d'une minute epoch (marche aléatoire reproductible)"""
+    rng = np.random.default_rng(minute)
+    close = 60_000 * np.exp(np.sin(minute / 50_000) * 0.2 + np.sin(minute / 700) * 0.01)
+    spread = close * 1e-3 * rng.random(2)
+    return close, close + spread[0], close - spread[1], float(rng.random() * 10)
+
+
+class StandInExchange:
+    """
+    Remplaçant local de l'API Coinbase (bougies, transactions et statistiques)
+
+    Les bougies sont déterministes par minute : deux appels sur la même
+    plage renvoient les mêmes valeurs, comme l'API réelle.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    async def _candles(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        granularity = int(request.query.get("granularity", 60))
+        # Le client envoie des dates UTC naïves
+        end = (
+            datetime.fromisoformat(request.query["end"]) if "end" in request.query
+            else datetime.utcnow()
+        ).replace(tzinfo=timezone.utc)
+        start = (
+            datetime.fromisoformat(request.query["start"]).replace(tzinfo=timezone.utc) if "start" in request.query
+            else end - timedelta(seconds=granularity * 300)
+        )
+        first = int(start.timestamp()) // granularity * granularity
+        candles = []
+        for ts in range(first, int(end.timestamp()) + 1, granularity):
+            close, high, low, volume = _candle(ts // 60)
+            # Format Coinbase : [time, low, high, open, close, volume], du plus récent au plus ancien
+            candles.append([ts, round(low, 2), round(high, 2), round(close, 2), round(close, 2), round(volume, 8)])
+        return web.json_response(candles[::-1])
+
+    async def _trades(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        rate = STAND_IN_TRADES_PER_SECOND
+        limit = min(int(request.query.get("limit", 1000)), 1000)
+        newest = int(time.time() * rate) - 1
+        if "after" in request.query:
+            newest = min(newest, int(request.query["after"]) - 1)
+        ids = np.arange(newest, max(newest - limit, -1), -1)
+        seconds, rank = np.divmod(ids, rate)
+        # Prix autour de la clôture de la minute, quantités et sens déterministes
+        jitter = np.sin(ids * 12.9898) * 43758.5453 % 1
+        minutes, inverse = np.unique(seconds // 60, return_inverse=True)
+        closes = np.array([_candle(int(minute))[0] for minute in minutes])[inverse]
+        trades = [
+            {
+                "time": datetime.fromtimestamp(second + (r + j) / rate, timezone.utc).isoformat().replace("+00:00", "Z"),
+                "trade_id": int(trade_id),
+                "price": f"{close * (1 + (j - 0.5) * 2e-4):.2f}",
+                "size": f"{0.0001 + j * 0.05:.8f}",
+                "side": "buy" if j > 0.5 else "sell"
+            }
+            for trade_id, second, r, j, close in zip(ids, seconds, rank, np.abs(jitter) * 0.999, closes)
+        ]
+        return web.json_response(trades)
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        close, high, low, volume = _candle(int(time.time()) // 60)
+        return web.json_response({
+            "open": close, "high": high, "low": low, "last": close, "volume": volume * 1440
+        })
+
+    async def start(self, port: int) -> str:
+        app = web.Application()
+        app.router.add_get("/products/BTC-USD/candles", self._candles)
+        app.router.add_get("/products/BTC-USD/stats", self._stats)
+        app.router.add_get("/products/BTC-USD/trades", self._trades)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", port).start()
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def free_port() -> int:
+    """Port TCP local libre"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(url: str, timeout: float = 60):
+    """Attend que le serveur réponde sur `url`"""
+    deadline = time.perf_counter() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.perf_counter() < deadline:
+            try:
+                async with http.get(url) as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Le serveur du dashboard n'a pas démarré")
+
+
+def seed_database(path: Path, days: int) -> int:
+    """Crée une base DuckDB avec `days` jours de bougies minute synthétiques, sans interruption"""
+    from .generator import MarketDataGenerator
+
+    end = datetime.utcnow().replace(second=0, microsecond=0)
+    minutes = days * 1440
+    return MarketDataGenerator(seed=42, gap_rate=0).to_duckdb(
+        path, minutes, start=end - timedelta(minutes=minutes - 1)
+    )
+
+
+@dataclass
+class SessionStats:
+    """Mesures d'une session simulée"""
+    latencies: List[float] = field(default_factory=list)   # Interaction -> sorties à jour (s)
+    refreshes: List[float] = field(default_factory=list)   # Instants des mises à jour spontanées
+    initial: Optional[float] = None                        # Premier rendu complet (s)
+    bytes_received: int = 0
+    errors: int = 0
+
+
+class DashboardSession:
+    """
+    Session Shiny simulée par websocket
+
+    Une interaction (changement de timeframe ou d'indicateurs) est mesurée
+    de l'envoi de la nouvelle valeur jusqu'au message `idle` du serveur,
+    c'est-à-dire jusqu'à ce que toutes les sorties invalidées soient
+    recalculées et envoyées. Les cycles `busy`/`idle` non sollicités sont
+    les rafraîchissements périodiques des données.
+    """
+
+    def __init__(self, url: str, think_time: tuple = (1.0, 3.0), seed: Optional[int] = None):
+        self.url = url
+        self.think_time = think_time
+        self.rng = random.Random(seed)
+        self.stats = SessionStats()
+        self.timeframe = self.rng.choice(TIMEFRAMES)
+        self.indicators = sorted(self.rng.sample(INDICATORS, 2))
+        self._pending: Optional[float] = None
+        self._idle = asyncio.Event()
+
+    def _init_message(self) -> dict:
+        data = {
+            "timeframe": self.timeframe,
+            "indicators": self.indicators,
+            ".clientdata_url_search": "",
+            ".clientdata_pixelratio": 1
+        }
+        for output in OUTPUTS:
+            data[f".clientdata_output_{output}_hidden"] = False
+        data[".clientdata_output_price_chart_width"] = 1200
+        data[".clientdata_output_technical_chart_width"] = 1200
+        return {"method": "init", "data": data}
+
+    def _next_action(self) -> dict:
+        if self.rng.random() < 0.5:
+            self.timeframe = self.rng.choice([tf for tf in TIMEFRAMES if tf != self.timeframe])
+            return {"timeframe": self.timeframe}
+        toggled = self.rng.choice(INDICATORS)
+        self.indicators = sorted(set(self.indicators) ^ {toggled}) or [toggled]
+        return {"indicators": self.indicators}
+
+    async def _receive(self, ws: aiohttp.ClientWebSocketResponse):
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                break
+            self.stats.bytes_received += len(msg.data)
+            message = json.loads(msg.data)
+            if message.get("errors"):
+                self.stats.errors += len(message["errors"])
+            if message.get("busy") != "idle":
+                continue
+
+            now = time.perf_counter()
+            if self.stats.initial is None:
+                self.stats.initial = now - self._started
+            elif self._pending is not None:
+                self.stats.latencies.append(now - self._pending)
+                self._pending = None
+            else:
+                self.stats.refreshes.append(now)
+            self._idle.set()
+
+    async def run(self, http: aiohttp.ClientSession, until: float):
+        """Connecte la session et enchaîne les interactions jusqu'à l'instant `until`"""
+        try:
+            async with http.ws_connect(f"{self.url}/websocket/", max_msg_size=0) as ws:
+                self._started = time.perf_counter()
+                receiver = asyncio.create_task(self._receive(ws))
+                await ws.send_str(json.dumps(self._init_message()))
+                await asyncio.wait_for(self._idle.wait(), timeout=60)
+
+                while time.perf_counter() < until:
+                    await asyncio.sleep(self.rng.uniform(*self.think_time))
+                    if time.perf_counter() >= until:
+                        break
+                    self._idle.clear()
+                    self._pending = time.perf_counter()
+                    await ws.send_str(json.dumps({"method": "update", "data": self._next_action()}))
+                    try:
+                        await asyncio.wait_for(self._idle.wait(), timeout=60)
+                    except asyncio.TimeoutError:
+                        self.stats.errors += 1
+                        self._pending = None
+
+                receiver.cancel()
+        except Exception as e:
+            logger.warning(f"Session interrompue : {e}")
+            self.stats.errors += 1
+
+
+@dataclass
+class StageResult:
+    """Résultats d'un palier de charge"""
+    sessions: int
+    duration: float
+    interactions: int
+    throughput: float            # Interactions servies par seconde
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+    initial_p95_ms: Optional[float]
+    refresh_p95_s: Optional[float]  # Écart entre rafraîchissements reçus (30s nominal)
+    errors: int
+    cpu_mean: float              # % d'un cœur
+    cpu_max: float
+    rss_mb: float
+    rss_per_session_mb: Optional[float]
+    kb_per_session_s: float
+
+
+def _percentile(values: List[float], q: float, scale: float = 1.0) -> Optional[float]:
+    return round(float(np.percentile(values, q)) * scale, 2) if values else None
+
+
+class LoadTest:
+    """
+    Montée en charge par paliers de sessions simultanées
+
+    Démarre le remplaçant de l'API, une base synthétique et le serveur du
+    dashboard dans un processus séparé (mesuré par psutil), puis exécute
+    chaque palier et repère le coude : le dernier palier dont le p95 reste
+    sous KNEE_FACTOR fois celui du premier.
+    """
+
+    def __init__(
+        self,
+        stages: List[int],
+        duration: float = 30.0,
+        days: int = 60,
+        refresh_interval: int = 30,
+        think_time: tuple = (1.0, 3.0)
+    ):
+        self.stages = stages
+        self.duration = duration
+        self.days = days
+        self.refresh_interval = refresh_interval
+        self.think_time = think_time
+
+    async def _sample(self, process: psutil.Process, samples: list, stop: asyncio.Event):
+        process.cpu_percent()
+        while not stop.is_set():
+            await asyncio.sleep(0.5)
+            try:
+                samples.append((process.cpu_percent(), process.memory_info().rss))
+            except psutil.Error:
+                break
+
+    async def _run_stage(self, url: str, process: psutil.Process, sessions: int, idle_rss: int) -> StageResult:
+        samples: list = []
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(self._sample(process, samples, stop))
+        clients = [DashboardSession(url, self.think_time, seed=k) for k in range(sessions)]
+
+        start = time.perf_counter()
+        async with aiohttp.ClientSession() as http:
+            await asyncio.gather(*[
+                client.run(http, until=start + self.duration) for client in clients
+            ])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+
+        latencies = [x for c in clients for x in c.stats.latencies]
+        initial = [c.stats.initial for c in clients if c.stats.initial is not None]
+        gaps = [b - a for c in clients for a, b in zip(c.stats.refreshes, c.stats.refreshes[1:])]
+        cpu = [s[0] for s in samples] or [0.0]
+        rss = max((s[1] for s in samples), default=process.memory_info().rss)
+
+        return StageResult(
+            sessions=sessions,
+            duration=round(elapsed, 1),
+            interactions=len(latencies),
+            throughput=round(len(latencies) / elapsed, 2),
+            p50_ms=_percentile(latencies, 50, 1e3),
+            p95_ms=_percentile(latencies, 95, 1e3),
+            p99_ms=_percentile(latencies, 99, 1e3),
+            initial_p95_ms=_percentile(initial, 95, 1e3),
+            refresh_p95_s=_percentile(gaps, 95),
+            errors=sum(c.stats.errors for c in clients),
+            cpu_mean=round(float(np.mean(cpu)), 1),
+            cpu_max=round(float(np.max(cpu)), 1),
+            rss_mb=round(rss / 1e6, 1),
+            rss_per_session_mb=round((rss - idle_rss) / sessions / 1e6, 2) if sessions else None,
+            kb_per_session_s=round(sum(c.stats.bytes_received for c in clients) / sessions / elapsed / 1e3, 2)
+        )
+
+    @staticmethod
+    def find_knee(results: List[StageResult]) -> Dict:
+        """Dernier palier soutenable (p95 sous KNEE_FACTOR x le p95 du premier palier)"""
+        reference = next((r.p95_ms for r in results if r.p95_ms), None)
+        sustainable = None
+        for result in results:
+            if reference is None or result.p95_ms is None or result.p95_ms > KNEE_FACTOR * reference:
+                break
+            sustainable = result.sessions
+        return {"reference_p95_ms": reference, "factor": KNEE_FACTOR, "max_sessions": sustainable}
+
+    async def run(self) -> Dict:
+        exchange = StandInExchange()
+        api_url = await exchange.start(free_port())
+        port = free_port()
+
+        with tempfile.TemporaryDirectory() as workdir:
+            db_path = Path(workdir) / "loadtest.duckdb"
+            rows = seed_database(db_path, self.days)
+            logger.info(f"Base synthétique : {rows} bougies minute")
+
+            server = subprocess.Popen([
+                sys.executable, "-m", "src.benchmarks.loadtest", "serve",
+                "--db", str(db_path), "--port", str(port),
+                "--api-url", api_url, "--refresh", str(self.refresh_interval)
+            ], cwd=config.PROJECT_ROOT)
+            try:
+                url = f"http://127.0.0.1:{port}"
+                await wait_ready(url)
+                process = psutil.Process(server.pid)
+
+                # Session d'amorce : premier chargement des données et des
+                # caches, exclu de la mémoire attribuée aux sessions
+                async with aiohttp.ClientSession() as http:
+                    await DashboardSession(url, seed=-1).run(http, until=0)
+                await asyncio.sleep(2)
+                idle_rss = process.memory_info().rss
+
+                results = []
+                for sessions in self.stages:
+                    logger.info(f"Palier : {sessions} sessions pendant {self.duration:.0f}s")
+                    result = await self._run_stage(url, process, sessions, idle_rss)
+                    logger.info(
+                        f"{sessions} sessions : p95 {result.p95_ms}ms, "
+                        f"{result.throughput} interactions/s, CPU {result.cpu_mean}%"
+                    )
+                    results.append(result)
+                    await asyncio.sleep(2)  # Fermeture des sessions du palier
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+                await exchange.stop()
+
+        return {
+            "created_at": datetime.utcnow().isoformat(),
+            "settings": {
+                "stages": self.stages,
+                "duration": self.duration,
+                "days": self.days,
+                "refresh_interval": self.refresh_interval,
+                "think_time": list(self.think_time),
+                "cpu_count": psutil.cpu_count()
+            },
+            "stages": [asdict(r) for r in results],
+            "knee": self.find_knee(results)
+        }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = REGRESSION_TOLERANCE) -> List[str]:
+    """
+    Compare deux rapports palier par palier
+
+    Returns:
+        Liste des régressions (latences ou mémoire par session au-delà de la tolérance)
+    """
+    previous = {stage["sessions"]: stage for stage in baseline["stages"]}
+    regressions = []
+    for stage in current["stages"]:
+        reference = previous.get(stage["sessions"])
+        if reference is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "rss_per_session_mb"):
+            old, new = reference.get(metric), stage.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(
+                    f"{stage['sessions']} sessions : {metric} {old} -> {new} (+{new / old - 1:.0%})"
+                )
+    knee_old = baseline.get("knee", {}).get("max_sessions")
+    knee_new = current.get("knee", {}).get("max_sessions")
+    if knee_old and (knee_new or 0) < knee_old:
+        regressions.append(f"Coude : {knee_old} -> {knee_new} sessions")
+    return regressions
+
+
+def serve(args: argparse.Namespace):
+    """Serveur du dashboard sur une base et une API locales (processus mesuré)"""
+    import uvicorn
+
+    config.DATABASE_PATH = Path(args.db)
+    # État de travail, traces et alertes dans le répertoire temporaire de la
+    # base : le serveur mesuré ne lit ni n'écrase jamais le vrai data/
+    config.DATA_DIR = config.DATABASE_PATH.parent
+    config.COINBASE_API_URL = args.api_url
+    config.REFRESH_INTERVAL = args.refresh
+    config.WARMUP = args.warmup
+    # Import après la configuration : le hub lit l'intervalle à sa création,
+    # le traceur son répertoire
+    from ..dashboard.app import app
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("asyncio").setLevel(logging.ERROR)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du dashboard")
+    subparsers = parser.add_subparsers(dest="command")
+
+    server_parser = subparsers.add_parser("serve", help=argparse.SUPPRESS)
+    server_parser.add_argument("--db", required=True)
+    server_parser.add_argument("--port", type=int, required=True)
+    server_parser.add_argument("--api-url", required=True)
+    server_parser.add_argument("--refresh", type=int, default=30)
+    server_parser.add_argument("--warmup", action="store_true")
+
+    parser.add_argument("--sessions", default="1,5,10,20,40", help="Paliers de sessions (liste)")
+    parser.add_argument("--duration", type=float, default=30, help="Durée d'un palier (s)")
+    parser.add_argument("--days", type=int, default=60, help="Historique synthétique (jours)")
+    parser.add_argument("--refresh", type=int, default=config.REFRESH_INTERVAL, help="Rafraîchissement du hub (s)")
+    parser.add_argument("--output", type=Path, help="Rapport à écrire (défaut : data/loadtest/baseline.json, sauf si c'est la référence comparée)")
+    parser.add_argument("--compare", type=Path, help="Rapport de référence à comparer")
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.command == "serve":
+        serve(args)
+        return
+
+    # Référence lue avant la mesure ; sans --output explicite, elle n'est
+    # jamais remplacée par le rapport qu'on lui compare
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    output = args.output or config.DATA_DIR / "loadtest" / "baseline.json"
+    if args.output is None and args.compare and output.resolve() == args.compare.resolve():
+        output = None
+
+    logging.getLogger("src").setLevel(logging.INFO)
+    # Fermetures de websockets en fin de palier : avertissements sans intérêt
+    logging.getLogger("asyncio").setLevel(logging.ERROR)
+    test = LoadTest(
+        stages=[int(n) for n in args.sessions.split(",")],
+        duration=args.duration,
+        days=args.days,
+        refresh_interval=args.refresh
+    )
+    report = asyncio.run(test.run())
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        print(f"Rapport enregistré : {output}")
+    for stage in report["stages"]:
+        print(
+            f"{stage['sessions']:>4} sessions | p50 {stage['p50_ms']}ms p95 {stage['p95_ms']}ms "
+            f"p99 {stage['p99_ms']}ms | {stage['throughput']} int/s | CPU {stage['cpu_mean']}% "
+            f"| {stage['rss_per_session_mb']} Mo/session | erreurs {stage['errors']}"
+        )
+    print(f"Coude : {report['knee']['max_sessions']} sessions")
+
+    if args.compare:
+        regressions = compare(report, baseline)
+        for line in regressions:
+            print(f"RÉGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
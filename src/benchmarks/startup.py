@@ -0,0 +1,134 @@
+# src/benchmarks/startup.py
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import aiohttp
+import logging
+from ..config import config, setup_logging
+from .loadtest import DashboardSession, StandInExchange, free_port, seed_database, wait_ready
+
+logger = logging.getLogger(__name__)
+
+
+def import_profile(module: str = "src.dashboard.app", top: int = 15) -> Dict:
+    """
+    Profil d'import d'un module (python -X importtime) dans un processus neuf
+
+    Returns:
+        Durée totale et modules de premier niveau les plus coûteux (ms, cumulé)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=config.PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # Format : "import time: <self> | <cumulé> | <indentation><module>"
+        _, cumulative_us, name = line.split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), int(cumulative_us), depth))
+
+    total = next((cumulative for name, cumulative, _ in entries if name == module), 0)
+    # Profondeur 1 : imports déclenchés directement par le module profilé
+    heaviest = sorted(
+        (entry for entry in entries if entry[2] == 1),
+        key=lambda entry: entry[1],
+        reverse=True
+    )[:top]
+    return {
+        "module": module,
+        "total_ms": round(total / 1e3, 1),
+        "top": [{"module": name, "cumulative_ms": round(cumulative / 1e3, 1)} for name, cumulative, _ in heaviest]
+    }
+
+
+async def measure_readiness(warmup: bool, days: int = 30) -> Dict:
+    """
+    Temps de démarrage vu d'un utilisateur
+
+    Mesure, depuis le lancement du processus, l'ouverture du port puis le
+    premier rendu complet d'une session (toutes les sorties envoyées).
+    """
+    exchange = StandInExchange()
+    api_url = await exchange.start(free_port())
+    port = free_port()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = Path(workdir) / "startup.duckdb"
+        seed_database(db_path, days)
+
+        command = [
+            sys.executable, "-m", "src.benchmarks.loadtest", "serve",
+            "--db", str(db_path), "--port", str(port), "--api-url", api_url
+        ]
+        if warmup:
+            command.append("--warmup")
+
+        started = time.perf_counter()
+        server = subprocess.Popen(command, cwd=config.PROJECT_ROOT)
+        try:
+            url = f"http://127.0.0.1:{port}"
+            await wait_ready(url, timeout=120)
+            listening = time.perf_counter() - started
+
+            session = DashboardSession(url, seed=0)
+            async with aiohttp.ClientSession() as http:
+                await session.run(http, until=0)
+            first_render = session.stats.initial
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+            await exchange.stop()
+
+    return {
+        "warmup": warmup,
+        "listening_s": round(listening, 2),
+        "first_render_s": round(first_render, 2) if first_render is not None else None,
+        "ready_s": round(listening + first_render, 2) if first_render is not None else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure du démarrage du dashboard")
+    parser.add_argument("--module", default="src.dashboard.app", help="Module dont l'import est profilé")
+    parser.add_argument("--top", type=int, default=15, help="Nombre de modules affichés")
+    parser.add_argument("--days", type=int, default=30, help="Historique synthétique (jours)")
+    parser.add_argument("--output", type=Path, help="Rapport JSON")
+    args = parser.parse_args()
+    setup_logging()
+    logging.getLogger("asyncio").setLevel(logging.ERROR)
+
+    profile = import_profile(args.module, args.top)
+    print(f"Import de {profile['module']} : {profile['total_ms']}ms")
+    for entry in profile["top"]:
+        print(f"  {entry['cumulative_ms']:>8.1f}ms  {entry['module']}")
+
+    readiness: List[Dict] = []
+    for warmup in (False, True):
+        result = asyncio.run(measure_readiness(warmup, args.days))
+        readiness.append(result)
+        print(
+            f"{'Avec' if warmup else 'Sans'} préchauffage : port ouvert en {result['listening_s']}s, "
+            f"premier rendu en {result['first_render_s']}s (total {result['ready_s']}s)"
+        )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({"imports": profile, "readiness": readiness}, indent=2))
+        print(f"Rapport enregistré : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+# src/benchmarks/suite.py
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import numpy as np
+import polars as pl
+import psutil
+import logging
+from ..alerts.engine import AlertEngine
+from ..alerts.rules import random_rules
+from ..analysis.indicators import TechnicalAnalysis
+from ..analysis.range_index import RangeExtremumIndex
+from ..analysis.rolling import RollingStatistics
+from ..analysis.statistics import MarketStatistics
+from ..config import config, setup_logging
+from ..data.processor import TIMEFRAME_MINUTES, DataProcessor
+from ..database.models import BitcoinPrice
+from ..database.operations import DatabaseManager
+from .generator import MarketDataGenerator
+from .loadtest import REGRESSION_TOLERANCE
+
+logger = logging.getLogger(__name__)
+
+# Écarts en dessous desquels une hausse n'est pas une régression
+# (ordonnanceur pour les durées, allocateur pour la mémoire)
+TIME_NOISE_S = 0.002
+MEMORY_NOISE_MB = 5.0
+
+# Durée chronométrée minimale d'un benchmark : les plus courts sont répétés
+# davantage pour que le meilleur temps soit stable
+MIN_MEASURED_S = 1.0
+MAX_REPEATS = 100
+
+# Taille des lots d'insertion unitaire (une page de l'API Coinbase)
+INSERT_BATCH = 300
+
+
+@dataclass
+class Dataset:
+    """Jeu de données partagé par les benchmarks d'une exécution"""
+    frame: pl.DataFrame     # Bougies minute générées
+    db_path: Path           # Base DuckDB contenant les mêmes bougies
+    workdir: Path           # Répertoire des bases temporaires
+
+
+@dataclass
+class Benchmark:
+    """
+    Benchmark : préparation (non chronométrée) puis exécution mesurée
+
+    `run` retourne le nombre d'éléments traités (lignes ou requêtes selon
+    `unit`), dont on déduit le débit.
+    """
+    name: str
+    setup: Callable[[Dataset], Any]
+    run: Callable[[Any], int]
+    unit: str = "lignes"
+
+
+@dataclass
+class BenchmarkResult:
+    """Mesures d'un benchmark"""
+    name: str
+    unit: str
+    items: int
+    median_s: float
+    best_s: float
+    throughput: float       # Éléments par seconde (médiane)
+    peak_rss_mb: float      # Hausse maximale du RSS pendant une exécution
+    peak_python_mb: float   # Pic des allocations Python (tracemalloc)
+    runs: int               # Exécutions chronométrées
+
+
+class PeakMemory:
+    """
+    Pic mémoire d'un bloc `with`
+
+    Le RSS est échantillonné par un thread (allocations natives de Polars et
+    DuckDB comprises) ; tracemalloc suit les allocations Python.
+    """
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_python = 0
+        self._stop = threading.Event()
+
+    def _sample(self, process: psutil.Process, baseline: int):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, process.memory_info().rss - baseline)
+
+    def __enter__(self):
+        process = psutil.Process()
+        baseline = process.memory_info().rss
+        self._thread = threading.Thread(target=self._sample, args=(process, baseline), daemon=True)
+        self._thread.start()
+        tracemalloc.start()
+        self._baseline = baseline
+        return self
+
+    def __exit__(self, *exc):
+        _, self.peak_python = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, psutil.Process().memory_info().rss - self._baseline)
+
+
+def _fresh_database(dataset: Dataset):
+    """Base vide dans le répertoire de travail"""
+    return DatabaseManager(dataset.workdir / f"insert-{time.perf_counter_ns()}.duckdb")
+
+
+def _insert_prices(state) -> int:
+    db, prices = state
+    for first in range(0, len(prices), INSERT_BATCH):
+        asyncio.run(db.insert_prices_async(prices[first:first + INSERT_BATCH]))
+    return len(prices)
+
+
+def _price_objects(dataset: Dataset):
+    frame = dataset.frame.head(min(len(dataset.frame), 30 * INSERT_BATCH))
+    return _fresh_database(dataset), [BitcoinPrice(**row) for row in frame.iter_rows(named=True)]
+
+
+def _empty_database_and_frame(dataset: Dataset):
+    return _fresh_database(dataset), dataset.frame
+
+
+def _bulk_insert(state) -> int:
+    db, frame = state
+    db.conn.execute("INSERT OR REPLACE INTO bitcoin_prices SELECT * FROM frame")
+    return len(frame)
+
+
+def _read_database(dataset: Dataset):
+    return DatabaseManager(dataset.db_path)
+
+
+def _select_prices(db) -> int:
+    return len(asyncio.run(db.get_prices_async()))
+
+
+def _ohlcv(timeframe: str) -> Callable[[Any], int]:
+    """Lecture des bougies minute en base puis agrégation (chemin de get_ohlcv_data)"""
+    def run(db) -> int:
+        minutes = asyncio.run(db.get_prices_async())
+        DataProcessor._aggregate(minutes, timeframe)
+        return len(minutes)
+    return run
+
+
+def _aggregate(timeframe: str) -> Callable[[pl.DataFrame], int]:
+    def run(frame: pl.DataFrame) -> int:
+        DataProcessor._aggregate(frame, timeframe)
+        return len(frame)
+    return run
+
+
+def _indicators(frame: pl.DataFrame) -> int:
+    return len(TechnicalAnalysis.add_all_indicators(frame))
+
+
+def _returns_volatility(frame: pl.DataFrame) -> int:
+    return len(MarketStatistics.calculate_volatility(MarketStatistics.calculate_returns(frame)))
+
+
+def _rolling_build(frame: pl.DataFrame) -> int:
+    RollingStatistics.from_frame(frame)
+    RangeExtremumIndex.from_frame(frame)
+    return len(frame)
+
+
+def _summary_inputs(dataset: Dataset):
+    hourly = DataProcessor._aggregate(dataset.frame, "1H")
+    return TechnicalAnalysis.add_all_indicators(hourly), RollingStatistics.from_frame(dataset.frame)
+
+
+def _market_summaries(state, calls: int = 1_000) -> int:
+    indicators, rolling = state
+    for _ in range(calls):
+        MarketStatistics.get_market_summary(indicators, rolling=rolling)
+    return calls
+
+
+# Moteurs d'alertes déjà construits (un benchmark par processus, voir _run_isolated)
+_alert_states: Dict[int, Any] = {}
+
+
+def _alert_engine(dataset: Dataset, rules: int = 10_000, bars: int = 60):
+    """
+    Moteur de 10 000 règles sur les timeframes du dashboard (60 barres, comme
+    le précalcul), construit une fois : `_alert_tick` oublie les notifications
+    """
+    key = id(dataset.frame)
+    if key not in _alert_states:
+        frames = {
+            tf: TechnicalAnalysis.add_all_indicators(
+                DataProcessor._aggregate(dataset.frame.tail(bars * TIMEFRAME_MINUTES[tf]), tf)
+            )
+            for tf in ("1m", "5m", "1H", "1D")
+        }
+        engine = AlertEngine(random_rules(rules, frames), cooldown=0)
+        _alert_states[key] = engine, frames, RollingStatistics.from_frame(dataset.frame)
+    return _alert_states[key]
+
+
+def _alert_tick(state) -> int:
+    """Un passage complet, notifications déjà envoyées oubliées (pire cas)"""
+    engine, frames, rolling = state
+    engine.reset()
+    engine.evaluate(frames, rolling)
+    return len(engine.rules)
+
+
+def _frame(dataset: Dataset) -> pl.DataFrame:
+    return dataset.frame
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("indicators.add_all", _frame, _indicators),
+    Benchmark("statistics.returns_volatility", _frame, _returns_volatility),
+    Benchmark("statistics.rolling_build", _frame, _rolling_build),
+    Benchmark("statistics.market_summary", _summary_inputs, _market_summaries, unit="requêtes"),
+    Benchmark("alerts.evaluate[10k]", _alert_engine, _alert_tick, unit="règles"),
+    *[Benchmark(f"processor.aggregate[{tf}]", _frame, _aggregate(tf)) for tf in ("5m", "1H", "1D")],
+    Benchmark("processor.ohlcv[1H]", _read_database, _ohlcv("1H")),
+    Benchmark("db.select_prices", _read_database, _select_prices),
+    Benchmark("db.insert_prices", _price_objects, _insert_prices),
+    Benchmark("db.bulk_insert", _empty_database_and_frame, _bulk_insert),
+]
+
+
+def run_benchmark(benchmark: Benchmark, dataset: Dataset, repeats: int = 3) -> BenchmarkResult:
+    """
+    Mesure un benchmark : une exécution sous surveillance mémoire, puis au
+    moins `repeats` exécutions chronométrées (davantage pour les benchmarks
+    courts, jusqu'à MIN_MEASURED_S cumulées)
+
+    La mesure mémoire passe en premier (le processus n'a pas encore retenu
+    de mémoire libérée) et à part (tracemalloc ralentit le code Python).
+    """
+    state = benchmark.setup(dataset)
+    gc.collect()
+    with PeakMemory() as memory:
+        items = benchmark.run(state)
+    del state
+
+    timings = []
+    while len(timings) < repeats or (sum(timings) < MIN_MEASURED_S and len(timings) < MAX_REPEATS):
+        state = benchmark.setup(dataset)
+        gc.collect()
+        begin = time.perf_counter()
+        benchmark.run(state)
+        timings.append(time.perf_counter() - begin)
+        del state
+
+    median = float(np.median(timings))
+    return BenchmarkResult(
+        name=benchmark.name,
+        unit=benchmark.unit,
+        items=items,
+        median_s=round(median, 4),
+        best_s=round(min(timings), 4),
+        throughput=round(items / median, 1),
+        peak_rss_mb=round(memory.peak_rss / 2**20, 1),
+        peak_python_mb=round(memory.peak_python / 2**20, 1),
+        runs=len(timings)
+    )
+
+
+def _run_isolated(name: str, parquet: Path, db_path: Path, workdir: Path, repeats: int) -> Dict:
+    """Exécute un benchmark dans un processus neuf (mémoire non polluée par les précédents)"""
+    result = subprocess.run(
+        [
+            sys.executable, "-m", "src.benchmarks.suite", "run-one",
+            "--name", name, "--parquet", str(parquet), "--db", str(db_path),
+            "--workdir", str(workdir), "--repeats", str(repeats)
+        ],
+        cwd=config.PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_suite(
+    rows: int = 1_000_000,
+    seed: int = 42,
+    repeats: int = 3,
+    only: Optional[List[str]] = None
+) -> Dict:
+    """
+    Génère le jeu de données puis exécute les benchmarks, chacun isolé
+
+    Args:
+        rows: Nombre de bougies minute générées
+        seed: Graine du générateur
+        repeats: Exécutions chronométrées par benchmark
+        only: Préfixes de noms des benchmarks à exécuter
+    """
+    selected = [b for b in BENCHMARKS if not only or any(b.name.startswith(p) for p in only)]
+    generator = MarketDataGenerator(seed=seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        workdir = Path(directory)
+        begin = time.perf_counter()
+        parquet = workdir / "bars.parquet"
+        db_path = workdir / "bars.duckdb"
+        generator.to_parquet(parquet, rows)
+        generator.to_duckdb(db_path, rows, sketches=False)
+        logger.info(f"Jeu de données : {rows:,} bougies en {time.perf_counter() - begin:.1f}s")
+
+        results = []
+        for benchmark in selected:
+            result = _run_isolated(benchmark.name, parquet, db_path, workdir, repeats)
+            logger.info(f"{benchmark.name} : {result['median_s']}s")
+            results.append(result)
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rows": rows,
+        "seed": seed,
+        "repeats": repeats,
+        "environment": {
+            "python": platform.python_version(),
+            "polars": pl.__version__,
+            "numpy": np.__version__,
+            "cpus": psutil.cpu_count()
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = REGRESSION_TOLERANCE) -> List[str]:
+    """
+    Compare deux rapports benchmark par benchmark
+
+    Returns:
+        Liste des régressions (meilleure durée ou pic mémoire au-delà de la tolérance)
+    """
+    if (current["rows"], current["seed"]) != (baseline["rows"], baseline["seed"]):
+        logger.warning("Jeux de données différents : comparaison non significative")
+        return []
+
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        reference = previous.get(result["name"])
+        if reference is None:
+            continue
+        # Meilleur temps : le moins sensible à la charge de la machine
+        old, new = reference["best_s"], result["best_s"]
+        if new > old * (1 + tolerance) and new - old > TIME_NOISE_S:
+            regressions.append(f"{result['name']} : durée {old}s -> {new}s (+{new / old - 1:.0%})")
+        old, new = reference["peak_rss_mb"], result["peak_rss_mb"]
+        if new > old * (1 + tolerance) and new - old > MEMORY_NOISE_MB:
+            regressions.append(f"{result['name']} : mémoire {old}Mo -> {new}Mo")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks des calculs et de la base")
+    subparsers = parser.add_subparsers(dest="command")
+
+    one_parser = subparsers.add_parser("run-one", help=argparse.SUPPRESS)
+    one_parser.add_argument("--name", required=True)
+    one_parser.add_argument("--parquet", type=Path, required=True)
+    one_parser.add_argument("--db", type=Path, required=True)
+    one_parser.add_argument("--workdir", type=Path, required=True)
+    one_parser.add_argument("--repeats", type=int, default=3)
+
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Bougies minute générées")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur")
+    parser.add_argument("--repeats", type=int, default=3, help="Exécutions chronométrées par benchmark")
+    parser.add_argument("--only", nargs="*", help="Préfixes des benchmarks à exécuter")
+    parser.add_argument("--output", type=Path, help="Rapport à écrire (défaut : data/benchmarks/baseline.json, sauf si c'est la référence comparée)")
+    parser.add_argument("--compare", type=Path, help="Rapport de référence à comparer")
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.command == "run-one":
+        logging.getLogger().setLevel(logging.WARNING)
+        benchmark = next(b for b in BENCHMARKS if b.name == args.name)
+        dataset = Dataset(pl.read_parquet(args.parquet), args.db, args.workdir)
+        print(json.dumps(asdict(run_benchmark(benchmark, dataset, args.repeats))))
+        return
+
+    # Référence lue avant la mesure ; sans --output explicite, elle n'est
+    # jamais remplacée par le rapport qu'on lui compare
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    output = args.output or config.DATA_DIR / "benchmarks" / "baseline.json"
+    if args.output is None and args.compare and output.resolve() == args.compare.resolve():
+        output = None
+
+    # Le détail des insertions et lectures noierait la progression
+    logging.getLogger("src.database").setLevel(logging.WARNING)
+    report = run_suite(args.rows, args.seed, args.repeats, args.only)
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        print(f"Rapport enregistré : {output}")
+    for result in report["results"]:
+        print(
+            f"{result['name']:<32} {result['median_s']:>8.3f}s | {result['throughput']:>14,.0f} "
+            f"{result['unit']}/s | RSS +{result['peak_rss_mb']}Mo | Python {result['peak_python_mb']}Mo"
+        )
+
+    if args.compare:
+        regressions = compare(report, baseline)
+        for line in regressions:
+            print(f"RÉGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@ from pathlib import Path
 import os
 from dataclasses import dataclass, field
 from typing import List
-from dotenv import load_dotenv
 import logging
 
 def read_env_file():
@@ -30,12 +29,6 @@ def read_env_file():
 # Lecture manuelle du fichier .env
 env_vars = read_env_file()
 
-# Configuration du logging
-log_level = env_vars.get('LOG_LEVEL', 'INFO')
-logging.basicConfig(
-    level=getattr(logging, log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -52,38 +45,105 @@ class Config:
     
     # Paramètres de collecte
     FETCH_INTERVAL: int = field(default=60)
+    REFRESH_INTERVAL: int = field(default=30)
     MAX_RETRIES: int = field(default=3)
     RETRY_DELAY: int = field(default=5)
     
+    # Transactions : collecte à chaque rafraîchissement, pages de 1000
+    # transactions au plus par collecte, conservation (jours)
+    COLLECT_TRADES: bool = field(default=False)
+    TRADE_MAX_PAGES: int = field(default=10)
+    TRADE_RETENTION_DAYS: int = field(default=7)
+    
     # Configuration serveur
     HOST: str = field(default="localhost")
     PORT: int = field(default=8026)
+    WORKERS: int = field(default=1)
+    # Préchauffage des données et des figures avant l'ouverture du port
+    WARMUP: bool = field(default=False)
+    
+    # Tracing : proportion des opérations tracées (0 : désactivé), seuil au-delà
+    # duquel une opération est profilée (ms, 0 : désactivé), format d'export
+    TRACE_SAMPLE_RATE: float = field(default=0.0)
+    TRACE_SLOW_MS: float = field(default=0.0)
+    TRACE_FORMAT: str = field(default="chrome")
+    
+    # Alertes : fichier de règles JSON, délai minimal entre deux notifications
+    # d'une même règle (secondes), webhook de notification (vide : désactivé)
+    ALERTS_FILE: Path = field(default_factory=lambda: Path(__file__).parent.parent / "data" / "alerts.json")
+    ALERT_COOLDOWN: float = field(default=300.0)
+    ALERT_WEBHOOK_URL: str = field(default="")
+    
+    # Sauvegarde de l'état de travail (DATA_DIR/state) pour les redémarrages
+    # à chaud : intervalle minimal entre deux sauvegardes (secondes, 0 : désactivée)
+    STATE_SNAPSHOT_INTERVAL: float = field(default=300.0)
     
     # Paramètres d'analyse
     MAX_HISTORY_DAYS: int = field(default=30)
     
     def __post_init__(self):
         """Initialisation post-création avec gestion des variables d'environnement"""
-        # Création des répertoires nécessaires
-        self.DATA_DIR.mkdir(parents=True, exist_ok=True)
-        
         # Configuration depuis les variables d'environnement nettoyées
         if env_vars:
             if 'FETCH_INTERVAL' in env_vars:
                 self.FETCH_INTERVAL = int(env_vars['FETCH_INTERVAL'])
+            if 'REFRESH_INTERVAL' in env_vars:
+                self.REFRESH_INTERVAL = int(env_vars['REFRESH_INTERVAL'])
             if 'MAX_RETRIES' in env_vars:
                 self.MAX_RETRIES = int(env_vars['MAX_RETRIES'])
             if 'RETRY_DELAY' in env_vars:
                 self.RETRY_DELAY = int(env_vars['RETRY_DELAY'])
+            if 'COLLECT_TRADES' in env_vars:
+                self.COLLECT_TRADES = env_vars['COLLECT_TRADES'].lower() in ('1', 'true', 'yes')
+            if 'TRADE_MAX_PAGES' in env_vars:
+                self.TRADE_MAX_PAGES = int(env_vars['TRADE_MAX_PAGES'])
+            if 'TRADE_RETENTION_DAYS' in env_vars:
+                self.TRADE_RETENTION_DAYS = int(env_vars['TRADE_RETENTION_DAYS'])
             if 'HOST' in env_vars:
                 self.HOST = env_vars['HOST']
             if 'PORT' in env_vars:
                 self.PORT = int(env_vars['PORT'])
-        
-        logger.info(f"Configuration chargée: HOST={self.HOST}, PORT={self.PORT}, FETCH_INTERVAL={self.FETCH_INTERVAL}")
+            if 'WORKERS' in env_vars:
+                self.WORKERS = int(env_vars['WORKERS'])
+            if 'WARMUP' in env_vars:
+                self.WARMUP = env_vars['WARMUP'].lower() in ('1', 'true', 'yes')
+            if 'TRACE_SAMPLE_RATE' in env_vars:
+                self.TRACE_SAMPLE_RATE = float(env_vars['TRACE_SAMPLE_RATE'])
+            if 'TRACE_SLOW_MS' in env_vars:
+                self.TRACE_SLOW_MS = float(env_vars['TRACE_SLOW_MS'])
+            if 'TRACE_FORMAT' in env_vars:
+                self.TRACE_FORMAT = env_vars['TRACE_FORMAT']
+            if 'ALERTS_FILE' in env_vars:
+                self.ALERTS_FILE = self.PROJECT_ROOT / env_vars['ALERTS_FILE']
+            if 'ALERT_COOLDOWN' in env_vars:
+                self.ALERT_COOLDOWN = float(env_vars['ALERT_COOLDOWN'])
+            if 'ALERT_WEBHOOK_URL' in env_vars:
+                self.ALERT_WEBHOOK_URL = env_vars['ALERT_WEBHOOK_URL']
+            if 'STATE_SNAPSHOT_INTERVAL' in env_vars:
+                self.STATE_SNAPSHOT_INTERVAL = float(env_vars['STATE_SNAPSHOT_INTERVAL'])
 
 try:
     config = Config()
 except Exception as e:
     logger.error(f"Erreur lors du chargement de la configuration: {e}")
-    raise
\ No newline at end of file
+    raise
+
+_logging_configured = False
+
+def setup_logging():
+    """
+    Configure le logging de l'application (niveau LOG_LEVEL du .env)
+
+    Appelé par les points d'entrée plutôt qu'à l'import : importer un module
+    du projet (tests, benchmarks, workers) n'a pas d'effet de bord global.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+
+    logging.basicConfig(
+        level=getattr(logging, env_vars.get('LOG_LEVEL', 'INFO')),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger.info(f"Configuration chargée: HOST={config.HOST}, PORT={config.PORT}, FETCH_INTERVAL={config.FETCH_INTERVAL}")
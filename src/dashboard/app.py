@@ -1,29 +1,51 @@
 # src/dashboard/app.py
+from contextlib import asynccontextmanager
 from pathlib import Path
 from shiny import App, Inputs, Outputs, Session, ui, render, reactive
+from shiny.types import SilentException
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import polars as pl
 import logging
+import os
+import time
 from shinywidgets import output_widget, render_widget
-from ..config import config
-from ..data.processor import DataProcessor
-from ..analysis.indicators import TechnicalAnalysis
-from .components.charts import create_price_chart, create_technical_chart
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from ..config import config, setup_logging
+from ..data.hub import WARMUP_ENV, hub
+from ..monitoring.metrics import CONTENT_TYPE, metrics
+from ..monitoring.tracing import tracer
+from .components.charts import (
+    figure_cache,
+    update_price_chart,
+    update_technical_chart
+)
+from .components.downsample import DEFAULT_CHART_WIDTH
 from .components.tables import create_market_summary
 
-# Configuration du logging
-logging.basicConfig(level=logging.DEBUG)
+# Configuration du logging (sans effet si le point d'entrée l'a déjà faite)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Chemin vers la racine du projet
 project_root = Path(__file__).parent.parent.parent
 
+# Vue affichée à l'ouverture d'une session (préparée par le préchauffage)
+DEFAULT_TIMEFRAME = "1m"
+DEFAULT_INDICATORS = ["sma", "bb"]
+
+metrics.gauge(
+    "dashboard_active_sessions",
+    "Sessions Shiny ouvertes dans le processus",
+    function=lambda: hub.active_sessions
+)
+
 # Configuration de l'interface utilisateur
 app_ui = ui.page_fluid(
     # Inclusion des styles
     ui.head_content(
         ui.include_css(project_root / "src" / "dashboard" / "styles" / "main.css"),
+        ui.include_js(project_root / "src" / "dashboard" / "scripts" / "charts.js"),
         ui.tags.link(rel="preconnect", href="https://fonts.googleapis.com"),
         ui.tags.link(rel="preconnect", href="https://fonts.gstatic.com", crossorigin="anonymous"),
         ui.tags.link(href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=JetBrains+Mono:wght@400;600&display=swap", rel="stylesheet")
@@ -80,7 +102,7 @@ app_ui = ui.page_fluid(
                         "1D": "1 Jour",
                         "1W": "1 Semaine"
                     },
-                    selected="1m"
+                    selected=DEFAULT_TIMEFRAME
                 ),
                 ui.input_checkbox_group(
                     "indicators",
@@ -88,10 +110,11 @@ app_ui = ui.page_fluid(
                     choices={
                         "sma": "Moyennes Mobiles",
                         "bb": "Bandes de Bollinger",
+                        "profile": "Profil de volume",
                         "rsi": "RSI",
                         "macd": "MACD"
                     },
-                    selected=["sma", "bb"]
+                    selected=DEFAULT_INDICATORS
                 )
             )
         ),
@@ -125,34 +148,29 @@ def validate_data(data):
 def server(input: Inputs, output: Outputs, session: Session):
     logger.info("Démarrage du serveur Shiny...")
     
-    # Initialisation du processeur de données
-    dp = DataProcessor()
+    # Processeur de données partagé par toutes les sessions du processus
+    dp = hub.attach(session)
     
-    # Variable pour le rafraîchissement
-    last_update = reactive.value(datetime.utcnow())
+    # Version des données publiée par le hub (rafraîchi toutes les 30 secondes)
+    @reactive.poll(lambda: hub.version, 1)
+    def data_version():
+        return hub.version
 
-    # Rafraîchissement périodique
-    @reactive.Effect
-    async def auto_refresh():
-        try:
-            last_update.set(datetime.utcnow())
-            logger.info("Données rafraîchies automatiquement.")
-        except Exception as e:
-            logger.error(f"Erreur lors du rafraîchissement : {e}")
-        finally:
-            reactive.invalidate_later(30)  # Rafraîchissement toutes les 30 secondes
+    # Version des données retournées par get_data, relevée sans attente
+    # intermédiaire pour correspondre toujours au DataFrame servi
+    served = {"version": None}
 
     # Données réactives
     @reactive.Calc
-    @reactive.event(input.timeframe, last_update)
+    @reactive.event(input.timeframe, data_version)
     async def get_data():
         logger.info(f"Mise à jour des données pour le timeframe: {input.timeframe()}")
         try:
-            data = await dp.get_ohlcv_data(timeframe=input.timeframe())
+            with tracer.trace("dashboard.get_data", timeframe=input.timeframe()):
+                data = await dp.get_indicator_data(timeframe=input.timeframe())
+                served["version"] = dp.get_data_version(input.timeframe())
             
             if validate_data(data):
-                logger.info("Calcul des indicateurs techniques...")
-                data = TechnicalAnalysis.add_all_indicators(data)
                 logger.info(f"Données prêtes : {len(data)} points")
                 return data
                 
@@ -162,68 +180,360 @@ def server(input: Inputs, output: Outputs, session: Session):
             logger.error(f"Erreur lors de la mise à jour des données: {e}")
             return None
 
+    # Résumé de marché : un seul calcul pour les quatre KPIs, partagé
+    # entre sessions tant que la version des données ne change pas
+    @reactive.Calc
+    async def get_summary():
+        data = await get_data()
+        if data is None:
+            return None
+        return create_market_summary(
+            data,
+            timeframe=input.timeframe(),
+            version=served["version"],
+            rolling=dp.rolling
+        )
+
     # Mise à jour des KPIs
     @output
     @render.text
     async def current_price():
         logger.info("Mise à jour de current_price...")
-        data = await get_data()
-        if data is None:
+        summary = await get_summary()
+        if summary is None:
             logger.error("Aucune donnée disponible pour current_price.")
             return "Erreur"
-        summary = create_market_summary(data)
         return summary["price"]
     
     @output
     @render.text
     async def price_change():
-        data = await get_data()
-        if data is None:
+        summary = await get_summary()
+        if summary is None:
             return "Erreur"
-        summary = create_market_summary(data)
         return summary["change_24h"]
     
     @output
     @render.text
     async def volume_24h():
-        data = await get_data()
-        if data is None:
+        summary = await get_summary()
+        if summary is None:
             return "Erreur"
-        summary = create_market_summary(data)
         return summary["volume_24h"]
     
     @output
     @render.text
     async def rsi_value():
-        data = await get_data()
-        if data is None:
+        summary = await get_summary()
+        if summary is None:
             return "Erreur"
-        summary = create_market_summary(data)
         return summary["rsi"]
     
-    # Mise à jour des graphiques
+    # Graphiques : redessin complet uniquement au changement de timeframe ou
+    # d'indicateurs, sinon mise à jour en place du FigureWidget existant (seuls
+    # les points nouveaux ou révisés sont envoyés, voir scripts/charts.js)
+    redraw = reactive.value(0)
+    
+    # Ajouts incrémentaux aux graphiques, abandonnés pour la session (séries
+    # renvoyées en entier) si le navigateur n'a pas pu en appliquer un
+    incremental = reactive.value(True)
+    
+    # Plage zoomée du graphique des prix (None : tout l'historique)
+    zoom = reactive.value(None)
+    
+    def chart_width(output_id: str) -> float:
+        """Largeur (arrondie) d'un graphique rapportée par le navigateur, sinon largeur par défaut"""
+        key = f".clientdata_output_{output_id}_width"
+        width = DEFAULT_CHART_WIDTH
+        if key in input:
+            with reactive.isolate():
+                try:
+                    width = input[key]() or DEFAULT_CHART_WIDTH
+                except SilentException:
+                    pass
+        return figure_cache.view_width(width)
+    
+    def volume_profile(indicators):
+        """Profil de volume précalculé du timeframe affiché, si le profil est sélectionné"""
+        if "profile" not in indicators:
+            return None
+        with reactive.isolate():
+            return dp.get_volume_profile(input.timeframe())
+    
+    def current_widget(chart):
+        """Widget affiché par une sortie, None s'il n'a pas encore été rendu"""
+        try:
+            return chart.widget
+        except SilentException:
+            return None
+    
     @output
     @render_widget
-    @reactive.event(input.indicators, input.timeframe, last_update)
     async def price_chart():
-        data = await get_data()
-        if not validate_data(data):
-            return go.Figure()
-        logger.info("Création du graphique des prix...")
-        return create_price_chart(data, selected_indicators=input.indicators())
+        # Dépendances explicites (pas de reactive.event) : shinywidgets ferme
+        # le widget à l'invalidation du contexte où il a été créé, qui ne doit
+        # donc pas dépendre des données
+        input.indicators(), input.timeframe(), redraw()
+        with tracer.trace("dashboard.price_chart", timeframe=input.timeframe()):
+            with reactive.isolate():
+                data = await get_data()
+                zoom.set(None)
+            if not validate_data(data):
+                return go.FigureWidget()
+            logger.info("Création du graphique des prix...")
+            return figure_cache.widget(
+                "price",
+                data,
+                input.indicators(),
+                timeframe=input.timeframe(),
+                version=served["version"],
+                width=chart_width("price_chart"),
+                volume_profile=volume_profile(input.indicators())
+            )
     
     @output
     @render_widget
-    @reactive.event(input.indicators, input.timeframe, last_update)
     async def technical_chart():
-        data = await get_data()
+        # Dépendances explicites (pas de reactive.event) : shinywidgets ferme
+        # le widget à l'invalidation du contexte où il a été créé, qui ne doit
+        # donc pas dépendre des données
+        input.indicators(), input.timeframe(), redraw()
+        with tracer.trace("dashboard.technical_chart", timeframe=input.timeframe()):
+            with reactive.isolate():
+                data = await get_data()
+            if not validate_data(data):
+                return go.FigureWidget()
+            logger.info("Création du graphique des indicateurs...")
+            return figure_cache.widget(
+                "technical",
+                data,
+                input.indicators(),
+                timeframe=input.timeframe(),
+                version=served["version"],
+                width=chart_width("technical_chart")
+            )
+    
+    @reactive.effect
+    def watch_zoom():
+        # Le zoom dans le navigateur (relayout) met à jour la mise en page du
+        # widget côté serveur ; on le relaie pour recharger la zone zoomée
+        widget = price_chart.widget
+        
+        def on_zoom(layout, x_range, autorange):
+            zoom.set(None if autorange or not x_range else tuple(x_range))
+        
+        # Axes partagés : le zoom peut venir du panneau des prix ou du volume
+        for axis in ('xaxis', 'xaxis2'):
+            widget.layout.on_change(on_zoom, f'{axis}.range', f'{axis}.autorange')
+    
+    @reactive.effect
+    @reactive.event(data_version, zoom, ignore_init=True)
+    async def refresh_charts():
+        with tracer.trace("dashboard.refresh_charts", timeframe=input.timeframe()):
+            data = await get_data()
+            if not validate_data(data):
+                return
+            indicators = input.indicators()
+            enabled = incremental()
+            increments = {}
+            widget = current_widget(price_chart)
+            if widget is not None:
+                increments["price_chart"] = update_price_chart(
+                    widget, data, indicators,
+                    width=chart_width("price_chart"),
+                    x_range=zoom(),
+                    volume_profile=volume_profile(indicators),
+                    incremental=enabled
+                )
+            widget = current_widget(technical_chart)
+            if widget is not None:
+                increments["technical_chart"] = update_technical_chart(
+                    widget, data, indicators,
+                    width=chart_width("technical_chart"),
+                    incremental=enabled
+                )
+            if any(changes is None for changes in increments.values()):
+                redraw.set(redraw() + 1)
+                return
+            increments = {output_id: changes for output_id, changes in increments.items() if changes}
+            if increments:
+                await session.send_custom_message("chart_increments", increments)
+    
+    @reactive.effect
+    @reactive.event(input.chart_resync)
+    def resync_charts():
+        # Graphique du navigateur différent de l'état du widget : redessin
+        # complet, puis mises à jour sans ajouts incrémentaux
+        if not incremental():
+            return
+        logger.warning(f"Graphique {input.chart_resync()} désynchronisé, redessin complet")
+        incremental.set(False)
+        redraw.set(redraw() + 1)
+
+def preload_widget_dependencies(app: App):
+    """
+    Enregistre dès le démarrage les fichiers JavaScript des widgets plotly
+    
+    shinywidgets ne les monte qu'à la première session d'un processus ; avec
+    plusieurs workers, le navigateur peut les demander à un worker qui n'a
+    encore servi aucune session.
+    
+    Reprend des API internes de shiny et shinywidgets (versions bornées dans
+    pyproject.toml) : leur absence arrête le démarrage plutôt que de laisser
+    les workers servir des graphiques vides.
+    
+    Raises:
+        RuntimeError: API internes introuvables ou fichiers du widget plotly absents
+    """
+    from types import SimpleNamespace
+    from plotly.basewidget import BaseFigureWidget
+    from starlette.staticfiles import StaticFiles
+    import shinywidgets
+    
+    try:
+        from shinywidgets._dependencies import require_dependency
+    except ImportError as e:
+        raise RuntimeError(
+            f"shinywidgets {shinywidgets.__version__} non pris en charge en mode multi-workers : {e}"
+        ) from e
+    missing = [
+        name for name in ("_register_web_dependency", "_dependency_handler")
+        if not hasattr(app, name)
+    ]
+    if missing:
+        raise RuntimeError(f"Version de shiny non prise en charge en mode multi-workers : {missing} introuvables")
+    
+    # Un FigureWidget ne peut être instancié hors session : valeurs par défaut de la classe
+    stand_in = SimpleNamespace(
+        __module__=BaseFigureWidget.__module__,
+        **{
+            name: getattr(BaseFigureWidget, name).default_value
+            for name in ("_model_module", "_view_module", "_model_module_version")
+        }
+    )
+    dependency = require_dependency(stand_in, SimpleNamespace(app=app), warn_if_missing=False)
+    if dependency is None:
+        raise RuntimeError("Fichiers JavaScript du widget plotly (jupyterlab-plotly) introuvables")
+    app._register_web_dependency(dependency)
+    
+    app._dependency_handler.mount(
+        "/dist/",
+        StaticFiles(directory=Path(shinywidgets.__file__).parent / "static"),
+        name="shinywidgets-static-resources"
+    )
+
+async def warm_up():
+    """
+    Prépare la vue par défaut avant l'ouverture du port
+
+    Ouvre la source de données et effectue le premier rafraîchissement
+    (hub.warm_up), puis remplit les caches du résumé de marché et des
+    figures : la première session ne paie ni l'ouverture de la base, ni
+    l'appel à l'API, ni la construction des graphiques.
+    """
+    started = time.perf_counter()
+    try:
+        await hub.warm_up()
+        dp = hub.processor
+        data = await dp.get_indicator_data(timeframe=DEFAULT_TIMEFRAME)
         if not validate_data(data):
-            return go.Figure()
-        logger.info("Création du graphique des indicateurs...")
-        return create_technical_chart(data, selected_indicators=input.indicators())
+            return
+        version = dp.get_data_version(DEFAULT_TIMEFRAME)
+        create_market_summary(data, timeframe=DEFAULT_TIMEFRAME, version=version, rolling=dp.rolling)
+        for kind in figure_cache.BUILDERS:
+            figure_cache.get(
+                kind,
+                data,
+                DEFAULT_INDICATORS,
+                timeframe=DEFAULT_TIMEFRAME,
+                version=version,
+                width=figure_cache.view_width(DEFAULT_CHART_WIDTH)
+            )
+    except Exception as e:
+        logger.error(f"Erreur lors du préchauffage : {e}")
+    finally:
+        logger.info(f"Préchauffage terminé en {time.perf_counter() - started:.2f}s")
+
+def enable_warm_up(app: App):
+    """
+    Exécute warm_up au démarrage du serveur ASGI
+
+    uvicorn termine la phase de démarrage (lifespan) avant d'ouvrir le
+    port : aucune connexion n'est acceptée pendant le préchauffage, ce qui
+    convient aux redémarrages progressifs derrière un répartiteur.
+    """
+    router = app.starlette_app.router
+    lifespan = router.lifespan_context
+    
+    @asynccontextmanager
+    async def warm_lifespan(starlette_app):
+        await warm_up()
+        async with lifespan(starlette_app):
+            yield
+    
+    router.lifespan_context = warm_lifespan
+
+def enable_state_save(app: App):
+    """
+    Sauvegarde l'état de travail à l'arrêt du serveur ASGI
+
+    Complète les sauvegardes périodiques du hub : un redémarrage (déploiement)
+    reprend l'état le plus récent et ne relit que les minutes manquantes.
+    """
+    router = app.starlette_app.router
+    lifespan = router.lifespan_context
+    
+    @asynccontextmanager
+    async def state_lifespan(starlette_app):
+        async with lifespan(starlette_app):
+            yield
+        await hub.save_state()
+    
+    router.lifespan_context = state_lifespan
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """
+    Métriques au format texte Prometheus
+    
+    Chaque processus expose ses propres compteurs. En mode multi-workers,
+    les séries portent le worker en étiquette `process`, et celles du
+    producteur (base, API, précalcul) sont relayées depuis le répertoire
+    des instantanés.
+    """
+    if hub.reader is None:
+        body = metrics.render()
+    else:
+        body = metrics.render({"process": f"worker-{os.getpid()}"}) + hub.reader.producer_metrics()
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
+
+def mount_metrics(app: App):
+    """Ajoute /metrics aux routes de l'application Shiny (avant les fichiers statiques)"""
+    app.starlette_app.router.routes.insert(0, Route("/metrics", metrics_endpoint, methods=["GET"]))
+
+async def export_endpoint(request: Request):
+    """API d'export des barres (module importé à la première requête : démarrage inchangé)"""
+    from ..data.export import export_endpoint as endpoint
+    return await endpoint(request)
+
+def mount_export(app: App):
+    """Ajoute l'API d'export /api/v1/ohlcv aux routes de l'application Shiny"""
+    app.starlette_app.router.routes.insert(0, Route("/api/v1/ohlcv", export_endpoint, methods=["GET"]))
 
 # Création de l'application
 app = App(app_ui, server)
+mount_metrics(app)
+mount_export(app)
+
+# Mode multi-workers : fichiers des widgets servis par chaque worker ;
+# processus unique : état de travail sauvegardé à l'arrêt
+if hub.reader is not None:
+    preload_widget_dependencies(app)
+else:
+    enable_state_save(app)
+
+# Préchauffage : option --warmup du lanceur, sinon WARMUP du .env
+if os.environ.get(WARMUP_ENV, "1" if config.WARMUP else "0") == "1":
+    enable_warm_up(app)
 
 if __name__ == "__main__":
     app.run(
@@ -1,18 +1,170 @@
 # src/dashboard/components/charts.py
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import numpy as np
 import polars as pl
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Hashable, Optional
+import math
+import threading
+import logging
+from .downsample import (
+    candle_budget,
+    clip_range,
+    decimate,
+    line_budget,
+    merge_candles
+)
+from ...analysis.profiles import VolumeProfile
+from ...monitoring.metrics import metrics
+from ...monitoring.tracing import tracer
 
-def create_price_chart(df: pl.DataFrame, selected_indicators: list = None) -> go.Figure:
+logger = logging.getLogger(__name__)
+
+FIGURE_SECONDS = metrics.histogram(
+    "figure_build_seconds",
+    "Durée de préparation des figures (build : traces plotly, serialize : dictionnaire validé, widget : FigureWidget de session)",
+    labels=("kind", "stage")
+)
+FIGURE_CACHE_REQUESTS = metrics.counter(
+    "figure_cache_requests_total",
+    "Accès au cache des figures par vue et version des données",
+    labels=("kind", "result")
+)
+
+# Couleurs de l'histogramme MACD, indexées par le signe de la barre (0 : négatif)
+HISTOGRAM_COLORSCALE = [[0, 'red'], [1, 'green']]
+
+# Profil de volume superposé aux prix : nombre de niveaux affichés et part
+# de la largeur du graphique occupée par le niveau le plus échangé
+PROFILE_ROWS = 60
+PROFILE_WIDTH = 0.25
+
+def _timestamps(x: pl.Series) -> np.ndarray:
+    """
+    Timestamps en millisecondes epoch
+    
+    Les tableaux numériques sont transmis au navigateur en binaire, alors
+    que les dates le seraient en chaînes ISO ; les axes sont déclarés de
+    type date pour conserver l'affichage.
+    """
+    return x.dt.epoch("ms").cast(pl.Float64).to_numpy()
+
+def _values(y: pl.Series, dtype=np.float32) -> np.ndarray:
+    """
+    Valeurs d'une trace en tableau typé
+    
+    La simple précision (7 chiffres significatifs) suffit aux indicateurs et
+    aux volumes ; les prix OHLC restent en double précision pour les centimes.
+    """
+    return y.cast(pl.Float64).to_numpy().astype(dtype, copy=False)
+
+def _line(df: pl.DataFrame, column: str, width: int = None, method: str = "lttb") -> dict:
+    """Coordonnées d'une ligne, réduites à la largeur affichée si elle est connue"""
+    x, y = df['timestamp'], df[column]
+    if width is not None:
+        x, y = decimate(x, y, line_budget(width), method)
+    return {'x': _timestamps(x), 'y': _values(y)}
+
+def _price_series(
+    df: pl.DataFrame,
+    selected_indicators: list,
+    width: int = None,
+    x_range: tuple = None,
+    volume_profile: VolumeProfile = None
+) -> dict:
+    """
+    Données des traces du graphique des prix, par nom de trace
+    
+    Les bougies sont fusionnées (OHLC exact) et les lignes réduites par LTTB
+    pour ne pas envoyer plus de points que la largeur ne peut en afficher.
+    Le profil de volume est regroupé en PROFILE_ROWS niveaux ; ses barres
+    sont normalisées par le niveau le plus échangé pour que l'axe qui les
+    porte garde une échelle fixe d'une mise à jour à l'autre.
+    """
+    df = clip_range(df, x_range)
+    candles = df if width is None else merge_candles(df, candle_budget(width))
+    x = _timestamps(candles['timestamp'])
+    series = {
+        'BTC/USD': {
+            'x': x,
+            **{col: _values(candles[col], np.float64) for col in ['open', 'high', 'low', 'close']}
+        },
+        'Volume': {'x': x, 'y': _values(candles['volume'])}
+    }
+    
+    if 'sma' in selected_indicators:
+        for period in [20, 50, 200]:
+            if f'SMA_{period}' in df.columns:
+                series[f'SMA {period}'] = _line(df, f'SMA_{period}', width)
+    
+    if 'bb' in selected_indicators and all(
+        col in df.columns for col in ['BB_upper', 'BB_middle', 'BB_lower']
+    ):
+        series['BB Upper'] = _line(df, 'BB_upper', width)
+        series['BB Lower'] = _line(df, 'BB_lower', width)
+    
+    if 'profile' in selected_indicators and volume_profile is not None and volume_profile.total_volume > 0:
+        profile = volume_profile.rebin(PROFILE_ROWS)
+        series['Volume Profile'] = {
+            'x': (profile.volume / profile.volume.max()).astype(np.float32),
+            'y': profile.prices,
+            'width': np.full(len(profile), profile.tick),
+            'customdata': profile.volume.astype(np.float32)
+        }
+        series['VWAP'] = {'x': x[[0, -1]], 'y': np.full(2, profile.vwap)}
+    
+    return series
+
+def _technical_series(
+    df: pl.DataFrame,
+    selected_indicators: list,
+    width: int = None,
+    x_range: tuple = None
+) -> dict:
+    """
+    Données des traces du graphique des indicateurs, par nom de trace
+    
+    Les oscillateurs sont réduits par min-max pour conserver leurs pics.
+    """
+    df = clip_range(df, x_range)
+    series = {}
+    
+    if 'rsi' in selected_indicators and 'RSI' in df.columns:
+        series['RSI'] = _line(df, 'RSI', width, method="minmax")
+    
+    if 'macd' in selected_indicators and 'MACD' in df.columns:
+        series['MACD'] = _line(df, 'MACD', width, method="minmax")
+        series['Signal'] = _line(df, 'MACD_Signal', width, method="minmax")
+        histogram = _line(df, 'MACD_Histogram', width, method="minmax")
+        # Couleur par barre via une échelle à deux niveaux : un octet par barre
+        histogram['marker.color'] = (histogram['y'] >= 0).astype(np.uint8)
+        series['Histogram'] = histogram
+    
+    return series
+
+def create_price_chart(
+    df: pl.DataFrame,
+    selected_indicators: list = None,
+    width: int = None,
+    x_range: tuple = None,
+    volume_profile: VolumeProfile = None
+) -> go.Figure:
     """
     Crée un graphique de chandelier avec les indicateurs techniques
     
     Args:
         df: DataFrame avec les données
-        selected_indicators: Liste des indicateurs à afficher ['sma', 'bb', 'rsi', 'macd']
+        selected_indicators: Liste des indicateurs à afficher ['sma', 'bb', 'profile', 'rsi', 'macd']
+        width: Largeur du graphique en pixels ; les séries sont réduites en
+            conséquence (None : pleine résolution)
+        x_range: Plage de timestamps affichée (zoom), None pour tout l'historique
+        volume_profile: Profil de volume de la période, superposé aux prix
+            en histogramme horizontal avec son VWAP si 'profile' est sélectionné
     """
     selected_indicators = selected_indicators or []
+    series = _price_series(df, selected_indicators, width, x_range, volume_profile)
     
     # Création du graphique avec sous-graphiques
     fig = make_subplots(
@@ -26,59 +178,73 @@ def create_price_chart(df: pl.DataFrame, selected_indicators: list = None) -> go
     # Chandelier japonais
     fig.add_trace(
         go.Candlestick(
-            x=df['timestamp'],
-            open=df['open'],
-            high=df['high'],
-            low=df['low'],
-            close=df['close'],
+            **series['BTC/USD'],
             name='BTC/USD'
         ),
         row=1, col=1
     )
 
     # Moyennes mobiles
-    if 'sma' in selected_indicators:
-        for period in [20, 50, 200]:
-            if f'SMA_{period}' in df.columns:
-                fig.add_trace(
-                    go.Scatter(
-                        x=df['timestamp'],
-                        y=df[f'SMA_{period}'],
-                        name=f'SMA {period}',
-                        line=dict(width=1)
-                    ),
-                    row=1, col=1
-                )
-
-    # Bandes de Bollinger
-    if 'bb' in selected_indicators:
-        if all(col in df.columns for col in ['BB_upper', 'BB_middle', 'BB_lower']):
+    for period in [20, 50, 200]:
+        if f'SMA {period}' in series:
             fig.add_trace(
                 go.Scatter(
-                    x=df['timestamp'],
-                    y=df['BB_upper'],
-                    name='BB Upper',
-                    line=dict(color='gray', dash='dash')
+                    **series[f'SMA {period}'],
+                    name=f'SMA {period}',
+                    line=dict(width=1)
                 ),
                 row=1, col=1
             )
-            
-            fig.add_trace(
-                go.Scatter(
-                    x=df['timestamp'],
-                    y=df['BB_lower'],
-                    name='BB Lower',
-                    line=dict(color='gray', dash='dash'),
-                    fill='tonexty'
-                ),
-                row=1, col=1
+
+    # Bandes de Bollinger
+    if 'BB Upper' in series:
+        fig.add_trace(
+            go.Scatter(
+                **series['BB Upper'],
+                name='BB Upper',
+                line=dict(color='gray', dash='dash')
+            ),
+            row=1, col=1
+        )
+        
+        fig.add_trace(
+            go.Scatter(
+                **series['BB Lower'],
+                name='BB Lower',
+                line=dict(color='gray', dash='dash'),
+                fill='tonexty'
+            ),
+            row=1, col=1
+        )
+
+    # Profil de volume : barres horizontales sur un axe des volumes propre,
+    # superposé à celui des dates et ancré à droite du panneau des prix
+    if 'Volume Profile' in series:
+        fig.add_trace(
+            go.Bar(
+                **series['Volume Profile'],
+                name='Volume Profile',
+                orientation='h',
+                xaxis='x3',
+                yaxis='y',
+                marker=dict(color='rgba(100, 149, 237, 0.35)'),
+                hovertemplate='%{y:.0f} USD : %{customdata:.4f} BTC<extra></extra>'
             )
+        )
+        fig.add_trace(
+            go.Scatter(
+                **series['VWAP'],
+                name='VWAP',
+                mode='lines',
+                line=dict(color='purple', width=1, dash='dot')
+            ),
+            row=1, col=1
+        )
 
     # Volume
     fig.add_trace(
         go.Bar(
-            x=df['timestamp'],
-            y=df['volume'],
+            **series['Volume'],
             name='Volume'
         ),
         row=2, col=1
@@ -100,11 +266,26 @@ def create_price_chart(df: pl.DataFrame, selected_indicators: list = None) -> go
             x=0.5
         )
     )
+    # Abscisses transmises en millisecondes epoch
+    fig.update_xaxes(type='date')
+    if 'Volume Profile' in series:
+        fig.update_layout(xaxis3=dict(
+            type='linear',
+            overlaying='x',
+            range=[1 / PROFILE_WIDTH, 0],
+            fixedrange=True,
+            visible=False
+        ))
 
     return fig
 
-def create_technical_chart(df: pl.DataFrame, selected_indicators: list = None) -> go.Figure:
-    """Crée un graphique des indicateurs techniques sélectionnés"""
+def create_technical_chart(
+    df: pl.DataFrame,
+    selected_indicators: list = None,
+    width: int = None,
+    x_range: tuple = None
+) -> go.Figure:
+    """Crée un graphique des indicateurs techniques sélectionnés (voir create_price_chart)"""
     selected_indicators = selected_indicators or []
     
     # Ne garder que RSI et MACD
@@ -128,14 +309,14 @@ def create_technical_chart(df: pl.DataFrame, selected_indicators: list = None) -
         subplot_titles=[ind.upper() for ind in technical_indicators]
     )
 
+    series = _technical_series(df, technical_indicators, width, x_range)
     current_row = 1
 
     # RSI
-    if 'rsi' in technical_indicators and 'RSI' in df.columns:
+    if 'RSI' in series:
         fig.add_trace(
             go.Scatter(
-                x=df['timestamp'],
-                y=df['RSI'],
+                **series['RSI'],
                 name='RSI',
                 line=dict(color='blue')
             ),
@@ -162,11 +343,10 @@ def create_technical_chart(df: pl.DataFrame, selected_indicators: list = None) -
         current_row += 1
 
     # MACD
-    if 'macd' in technical_indicators and 'MACD' in df.columns:
+    if 'MACD' in series:
         fig.add_trace(
             go.Scatter(
-                x=df['timestamp'],
-                y=df['MACD'],
+                **series['MACD'],
                 name='MACD',
                 line=dict(color='blue')
             ),
@@ -175,8 +355,7 @@ def create_technical_chart(df: pl.DataFrame, selected_indicators: list = None) -
         
         fig.add_trace(
             go.Scatter(
-                x=df['timestamp'],
-                y=df['MACD_Signal'],
+                **series['Signal'],
                 name='Signal',
                 line=dict(color='orange')
             ),
@@ -185,11 +364,14 @@ def create_technical_chart(df: pl.DataFrame, selected_indicators: list = None) -
         
         fig.add_trace(
             go.Bar(
-                x=df['timestamp'],
-                y=df['MACD_Histogram'],
+                x=series['Histogram']['x'],
+                y=series['Histogram']['y'],
                 name='Histogram',
                 marker=dict(
-                    color=['green' if x >= 0 else 'red' for x in df['MACD_Histogram']]
+                    color=series['Histogram']['marker.color'],
+                    colorscale=HISTOGRAM_COLORSCALE,
+                    cmin=0,
+                    cmax=1
                 )
             ),
             row=current_row, col=1
@@ -210,5 +392,396 @@ def create_technical_chart(df: pl.DataFrame, selected_indicators: list = None) -
     
     # Ajuster les marges pour éviter la superposition
     fig.update_layout(margin=dict(t=30, b=50))
+    fig.update_xaxes(type='date')
+
+    return fig
+
+def _unchanged(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Égalité point à point, les NaN de début de série (fenêtres incomplètes) étant égaux"""
+    equal = old == new
+    if equal.dtype == bool and old.dtype.kind == 'f' and new.dtype.kind == 'f':
+        equal |= np.isnan(old) & np.isnan(new)
+    return equal
+
+def _json_values(values: np.ndarray) -> list:
+    """
+    Valeurs d'un tableau pour un message JSON
+    
+    NaN et infinis sont transmis comme null. Les valeurs en simple précision
+    sont écrites sous leur forme la plus courte, relue à l'identique par les
+    tableaux Float32Array du navigateur.
+    """
+    if values.dtype == np.float32:
+        return [float(str(v)) if math.isfinite(v) else None for v in values]
+    return [v if math.isfinite(v) else None for v in values.tolist()]
+
+def _increment(old: dict, new: dict) -> Optional[dict]:
+    """
+    Points nouveaux ou révisés d'une trace temporelle
+    
+    La fenêtre affichée glisse d'une mise à jour à l'autre : la nouvelle
+    série reprend la fin de l'ancienne (à partir du décalage `shift`) puis
+    ajoute les nouvelles barres. Dans la partie commune, seuls les premiers
+    points (indicateurs calculés sur la fenêtre, dont le début change) et
+    les derniers (bougie en cours) peuvent être révisés. Le navigateur
+    reconstitue les tableaux en entourant les points [start, end) de
+    l'ancienne série de `head` (à défaut, ses points [shift, start)) et de
+    `tail`.
+    
+    Args:
+        old: Tableaux affichés, par propriété (dont 'x')
+        new: Nouveaux tableaux, mêmes propriétés
+    
+    Returns:
+        None si la série ne prolonge pas l'ancienne (changement de zoom,
+        bougies fusionnées, profil de volume...) ou si plus de la moitié
+        des points est à envoyer : elle est alors renvoyée en entier,
+        en binaire
+    """
+    old_x, new_x = old['x'], new['x']
+    if len(old_x) == 0 or len(new_x) == 0 or any(
+        len(old[prop]) != len(old_x) or len(new[prop]) != len(new_x) for prop in new
+    ):
+        return None
+    
+    shift = int(np.searchsorted(old_x, new_x[0]))
+    if shift >= len(old_x) or old_x[shift] != new_x[0]:
+        return None
+    overlap = min(len(old_x) - shift, len(new_x))
+    if not np.array_equal(old_x[shift:shift + overlap], new_x[:overlap]):
+        return None
+    
+    # Points conservés : premier point inchangé jusqu'à la révision suivante
+    equal = {
+        prop: _unchanged(old[prop][shift:shift + overlap], values[:overlap])
+        for prop, values in new.items()
+    }
+    unchanged = np.logical_and.reduce(list(equal.values()))
+    kept = np.flatnonzero(unchanged)
+    if len(kept) == 0:
+        return None
+    first = int(kept[0])
+    revised = np.flatnonzero(~unchanged[first:])
+    stop = first + int(revised[0]) if len(revised) else overlap
+    if first + len(new_x) - stop > len(new_x) // 2:
+        return None
+    
+    return {
+        'length': len(old_x),
+        'last': float(old_x[-1]),
+        'shift': shift,
+        'start': shift + first,
+        'end': shift + stop,
+        # Début révisé : seules les propriétés modifiées (x ne l'est jamais)
+        'head': {
+            prop: _json_values(values[:first])
+            for prop, values in new.items() if not equal[prop][:first].all()
+        },
+        'tail': {prop: _json_values(values[stop:]) for prop, values in new.items()}
+    }
+
+def _update_traces(fig: go.FigureWidget, columns: dict, incremental: bool = True) -> Optional[list]:
+    """
+    Met à jour en place les tableaux des traces nommées d'une figure
+    
+    Les traces dont la fenêtre n'a fait que glisser (nouvelles barres,
+    dernière bougie révisée) ne sont pas renvoyées : leurs points nouveaux
+    ou révisés sont retournés (voir _increment) pour être envoyés par la
+    session au script du tableau de bord, qui les insère dans le navigateur.
+    L'état du widget côté serveur est aligné sans message, comme pour une
+    modification faite dans le navigateur. Le volume d'une mise à jour est
+    ainsi proportionnel aux points modifiés, et non à la fenêtre affichée.
+    
+    Les autres traces modifiées sont renvoyées en entier par le widget, un
+    message par ensemble de propriétés modifiées ; les propriétés inchangées
+    ne sont pas renvoyées.
+    
+    Args:
+        incremental: False pour tout renvoyer par le widget (navigateur
+            qui n'a pas pu appliquer un ajout)
+    
+    Returns:
+        Ajouts à envoyer au navigateur (index de trace et points), None si
+        les traces de la figure ne sont pas exactement celles attendues
+        (trace absente, ou trace à retirer comme un profil de volume devenu
+        indisponible)
+    """
+    traces = {trace.name: (index, trace) for index, trace in enumerate(fig.data)}
+    missing = set(columns) - set(traces)
+    stale = set(traces) - set(columns)
+    if missing or stale:
+        logger.debug(f"Traces différentes, redessin complet nécessaire : {missing or ''} {stale or ''}")
+        return None
+    
+    increments = []
+    # Traces renvoyées en entier, regroupées par propriétés modifiées
+    restyles = {}
+    for name, props in columns.items():
+        index, trace = traces[name]
+        new = {
+            prop: values.to_numpy() if isinstance(values, pl.Series) else np.asarray(values)
+            for prop, values in props.items()
+        }
+        old = {prop: trace[prop] for prop in new}
+        
+        increment = None
+        if incremental and 'x' in new and all(values is not None for values in old.values()):
+            increment = _increment({prop: np.asarray(values) for prop, values in old.items()}, new)
+        if increment is not None:
+            if (
+                increment['head'] or increment['tail']['x']
+                or increment['shift'] > 0 or increment['end'] < increment['length']
+            ):
+                increments.append({'index': index, **increment})
+                # Méthode appliquée par plotly aux modifications venues du
+                # navigateur : met à jour l'état serveur sans le renvoyer
+                fig._perform_plotly_restyle({prop: [values] for prop, values in new.items()}, [index])
+            continue
+        
+        changed = []
+        for prop, values in new.items():
+            current = old[prop]
+            if current is not None and len(current) == len(values):
+                current = np.asarray(current)
+                try:
+                    if _unchanged(current, values).all():
+                        continue
+                except TypeError:
+                    if np.array_equal(current, values):
+                        continue
+            changed.append(prop)
+        if changed:
+            indexes, data = restyles.setdefault(tuple(changed), ([], {prop: [] for prop in changed}))
+            indexes.append(index)
+            for prop in changed:
+                data[prop].append(new[prop])
+    
+    # plotly_restyle plutôt qu'une affectation : les widgets instanciés sans
+    # validation (FigureCache.widget) n'envoient pas les affectations
+    for indexes, data in restyles.values():
+        fig.plotly_restyle(data, indexes)
+    return increments
+
+def update_price_chart(
+    fig: go.FigureWidget,
+    df: pl.DataFrame,
+    selected_indicators: list = None,
+    width: int = None,
+    x_range: tuple = None,
+    volume_profile: VolumeProfile = None,
+    incremental: bool = True
+) -> Optional[list]:
+    """
+    Met à jour le graphique des prix sans le reconstruire
+    
+    La structure (sous-graphiques, mise en page, liste des traces) est
+    conservée ; seuls les points nouveaux ou révisés sont envoyés au
+    navigateur (voir _update_traces).
+    Avec `x_range`, seules les barres de la zone zoomée sont réduites, ce
+    qui restitue la pleine résolution dès qu'elle tient dans la largeur.
+    
+    Returns:
+        Ajouts à envoyer au navigateur, None si la figure ne correspond plus
+        aux indicateurs (redessin requis)
+    """
+    with tracer.span("figure.update", kind="price"):
+        return _update_traces(
+            fig, _price_series(df, selected_indicators or [], width, x_range, volume_profile), incremental
+        )
+
+def update_technical_chart(
+    fig: go.FigureWidget,
+    df: pl.DataFrame,
+    selected_indicators: list = None,
+    width: int = None,
+    x_range: tuple = None,
+    incremental: bool = True
+) -> Optional[list]:
+    """
+    Met à jour le graphique des indicateurs techniques sans le reconstruire
+    
+    Returns:
+        Ajouts à envoyer au navigateur, None si la figure ne correspond plus
+        aux indicateurs (redessin requis)
+    """
+    with tracer.span("figure.update", kind="technical"):
+        return _update_traces(fig, _technical_series(df, selected_indicators or [], width, x_range), incremental)
+
+class FigureCache:
+    """
+    Figures construites, mémoïsées par vue et version des données
+    
+    Une vue est définie par le type de graphique, le timeframe, l'ensemble
+    des indicateurs et la largeur (arrondie) : toutes les sessions qui
+    affichent la même vue partagent une seule construction par version des
+    données. Les figures sont conservées sous forme de dictionnaires déjà
+    validés, à partir desquels chaque session instancie son propre widget
+    sans nouvelle validation.
+    """
+    
+    # Pas d'arrondi des largeurs : les fenêtres de tailles voisines partagent la figure
+    WIDTH_STEP = 100
+    
+    BUILDERS = {
+        'price': create_price_chart,
+        'technical': create_technical_chart
+    }
+    
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def view_width(cls, width: Optional[float]) -> Optional[int]:
+        """Largeur arrondie utilisée pour construire et mettre à jour une vue"""
+        if width is None:
+            return None
+        return math.ceil(width / cls.WIDTH_STEP) * cls.WIDTH_STEP
+    
+    def get(
+        self,
+        kind: str,
+        df: pl.DataFrame,
+        selected_indicators: list,
+        timeframe: str,
+        version: Optional[Hashable] = None,
+        width: int = None,
+        **options
+    ) -> dict:
+        """
+        Retourne la figure (dictionnaire plotly) d'une vue, construite au plus
+        une fois par version des données
+        
+        Args:
+            kind: 'price' ou 'technical'
+            version: Version des données (sans version, pas de mémoïsation)
+            width: Largeur en pixels (None : pleine résolution)
+            options: Arguments supplémentaires du constructeur, déterminés
+                par la version des données (ex. volume_profile) ; seule leur
+                présence distingue deux vues
+        """
+        if kind not in self.BUILDERS:
+            raise ValueError(f"Type de graphique inconnu : {kind}")
+        width = self.view_width(width)
+        
+        if version is None:
+            return self._build(kind, df, selected_indicators, width, options)
+        
+        key = (
+            kind, timeframe, tuple(sorted(selected_indicators or [])), version, width,
+            tuple(sorted(name for name, value in options.items() if value is not None))
+        )
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                FIGURE_CACHE_REQUESTS.labels(kind, "hit").inc()
+                return self._entries[key]
+        
+        FIGURE_CACHE_REQUESTS.labels(kind, "miss").inc()
+        figure = self._build(kind, df, selected_indicators, width, options)
+        with self._lock:
+            self._entries[key] = figure
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.debug(f"Figure construite : {key}")
+        return figure
+    
+    def _build(
+        self,
+        kind: str,
+        df: pl.DataFrame,
+        selected_indicators: list,
+        width: Optional[int],
+        options: dict
+    ) -> dict:
+        with tracer.span("figure.build", kind=kind, rows=len(df)), FIGURE_SECONDS.labels(kind, "build").time():
+            figure = self.BUILDERS[kind](df, selected_indicators, width=width, **options)
+        with tracer.span("figure.serialize", kind=kind), FIGURE_SECONDS.labels(kind, "serialize").time():
+            return figure.to_dict()
+    
+    def widget(self, kind: str, *args, **kwargs) -> go.FigureWidget:
+        """FigureWidget propre à une session, instancié depuis la figure mémoïsée (voir get)"""
+        figure = self.get(kind, *args, **kwargs)
+        with tracer.span("figure.widget", kind=kind), FIGURE_SECONDS.labels(kind, "widget").time():
+            return go.FigureWidget(figure, _validate=False)
+    
+    def clear(self):
+        """Vide le cache des figures"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Instance partagée par toutes les sessions du processus
+figure_cache = FigureCache()
+
+
+# Script de test : octets envoyés au navigateur par les widgets
+if __name__ == "__main__":
+    import json
+    import time
+    from ipywidgets.widgets.widget import _remove_buffers
+
+    def message_size(state: dict) -> int:
+        """Taille d'un message de widget (JSON + tampons binaires encodés en base64)"""
+        state, _, buffers = _remove_buffers(state)
+        return len(json.dumps(state, default=str)) + sum(4 * -(-len(b) // 3) for b in buffers)
+
+    n = 200_000
+    rng = np.random.default_rng(42)
+    close = 40_000 * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+    start_date = datetime(2024, 1, 1)
+    df = pl.DataFrame({
+        "timestamp": pl.datetime_range(
+            start_date, start_date + timedelta(minutes=n - 1), "1m", eager=True
+        ),
+        "open": np.roll(close, 1),
+        "high": close * 1.001,
+        "low": close * 0.999,
+        "close": close,
+        "volume": rng.random(n) * 10,
+        "RSI": 50 + 20 * np.sin(np.arange(n) / 300),
+        "MACD": rng.normal(0, 10, n),
+        "MACD_Signal": rng.normal(0, 10, n),
+        "MACD_Histogram": rng.normal(0, 5, n)
+    }).with_columns(
+        [pl.col("close").rolling_mean(window_size=p).alias(f"SMA_{p}") for p in (20, 50, 200)]
+        + [
+            pl.col("close").rolling_mean(window_size=20).alias("BB_middle"),
+            (pl.col("close") * 1.01).alias("BB_upper"),
+            (pl.col("close") * 0.99).alias("BB_lower")
+        ]
+    )
+    indicators = ["sma", "bb", "rsi", "macd"]
+
+    for label, data, width in (
+        ("5 000 bougies, pleine résolution", df.tail(5_000), None),
+        ("200 000 bougies, 1200px", df, 1200)
+    ):
+        begin = time.perf_counter()
+        widgets = [
+            go.FigureWidget(create_price_chart(data, indicators, width=width)),
+            go.FigureWidget(create_technical_chart(data, indicators, width=width))
+        ]
+        initial = sum(message_size(w.get_state()) for w in widgets)
+        elapsed = time.perf_counter() - begin
+
+        # Mise à jour après l'arrivée d'une nouvelle bougie
+        updates = []
+        for w in widgets:
+            w.send_state = lambda key=None, w=w: updates.append(message_size(w.get_state(key)))
+        shifted = pl.concat([
+            data.slice(1),
+            data.tail(1).with_columns(pl.col("timestamp") + timedelta(minutes=1))
+        ])
+        begin_update = time.perf_counter()
+        increments = [
+            update_price_chart(widgets[0], shifted, indicators, width=width),
+            update_technical_chart(widgets[1], shifted, indicators, width=width)
+        ]
+        update_elapsed = time.perf_counter() - begin_update
+        # Ajouts envoyés par la session (message Shiny en JSON)
+        updates.append(len(json.dumps(increments)))
 
-    return fig
\ No newline at end of file
+        print(f"{label} : état initial {initial / 1e3:.0f} ko en {elapsed * 1e3:.0f}ms, "
+              f"mise à jour {sum(updates) / 1e3:.0f} ko en {update_elapsed * 1e3:.0f}ms")
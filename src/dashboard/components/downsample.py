@@ -0,0 +1,237 @@
+# src/dashboard/components/downsample.py
+from datetime import datetime
+from typing import Optional
+import math
+import numpy as np
+import polars as pl
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Largeur par défaut d'un graphique quand le navigateur ne la communique pas
+DEFAULT_CHART_WIDTH = 1200
+
+# Densités d'affichage : une bougie lisible occupe au moins 3 pixels, une
+# ligne gagne peu au-delà de deux points (min et max) par pixel
+CANDLE_PIXELS = 3
+LINE_POINTS_PER_PIXEL = 2
+
+
+def candle_budget(width: Optional[float]) -> int:
+    """Nombre maximal de bougies affichables sur une largeur en pixels"""
+    return max(int((width or DEFAULT_CHART_WIDTH) // CANDLE_PIXELS), 2)
+
+
+def line_budget(width: Optional[float]) -> int:
+    """Nombre maximal de points utiles pour une ligne sur une largeur en pixels"""
+    return max(int((width or DEFAULT_CHART_WIDTH) * LINE_POINTS_PER_PIXEL), 3)
+
+
+def merge_candles(df: pl.DataFrame, max_candles: int) -> pl.DataFrame:
+    """
+    Fusionne les bougies consécutives par groupes de taille fixe
+
+    Chaque groupe garde l'ouverture de sa première bougie, la clôture de la
+    dernière, le plus haut et le plus bas du groupe et la somme des volumes :
+    les extrêmes de prix restent exacts quelle que soit la réduction.
+    """
+    if len(df) <= max_candles:
+        return df
+
+    size = math.ceil(len(df) / max_candles)
+    aggregations = [
+        pl.col('timestamp').first(),
+        pl.col('open').first(),
+        pl.col('high').max(),
+        pl.col('low').min(),
+        pl.col('close').last()
+    ]
+    if 'volume' in df.columns:
+        aggregations.append(pl.col('volume').sum())
+
+    return (
+        df.group_by((pl.int_range(pl.len()) // size).alias('_bucket'), maintain_order=True)
+        .agg(aggregations)
+        .drop('_bucket')
+    )
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices conservant le minimum et le maximum de chaque groupe de points
+
+    Adapté aux séries bruitées ou oscillantes (RSI, MACD, histogrammes) :
+    aucun pic n'est perdu. Les NaN ne sont jamais retenus comme extrêmes.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+
+    size = math.ceil(n / max(max_points // 2, 1))
+    rows = math.ceil(n / size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, size)
+    missing = np.isnan(padded)
+
+    offsets = np.arange(rows) * size
+    highs = offsets + np.argmax(np.where(missing, -np.inf, padded), axis=1)
+    lows = offsets + np.argmin(np.where(missing, np.inf, padded), axis=1)
+
+    indices = np.union1d(np.union1d(highs, lows), [0, n - 1])
+    return indices[indices < n]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices retenus par l'algorithme Largest-Triangle-Three-Buckets
+
+    Le premier et le dernier point sont conservés ; dans chaque groupe
+    intermédiaire, le point retenu maximise l'aire du triangle formé avec
+    le point précédemment retenu et la moyenne du groupe suivant. Les
+    moyennes sont calculées en une passe vectorisée, seule la sélection
+    (dépendante du point précédent) parcourt les groupes. Les NaN (début
+    de fenêtre des indicateurs) sont écartés.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(y))
+    n = len(valid)
+    if n <= max_points or max_points < 3:
+        return valid
+
+    x = np.asarray(x, dtype=np.float64)[valid]
+    y = y[valid]
+
+    # Groupes intermédiaires [edges[i], edges[i + 1]) entre le premier et le dernier point
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # Le « groupe suivant » du dernier groupe est le dernier point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(len(counts)):
+        start, end = edges[i], edges[i + 1]
+        xa, ya = x[previous], y[previous]
+        area = np.abs(
+            (xa - next_x[i]) * (y[start:end] - ya)
+            - (xa - x[start:end]) * (next_y[i] - ya)
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+
+    return valid[selected]
+
+
+def decimate(
+    x: pl.Series,
+    y: pl.Series,
+    max_points: int,
+    method: str = "lttb"
+) -> tuple[pl.Series, pl.Series]:
+    """
+    Réduit une série (x, y) à au plus `max_points` points
+
+    Args:
+        method: "lttb" pour les lignes lissées (moyennes mobiles, bandes),
+            "minmax" pour les séries oscillantes dont les pics comptent
+    """
+    if len(y) <= max_points:
+        return x, y
+
+    values = y.cast(pl.Float64).to_numpy()
+    if method == "lttb":
+        positions = x.dt.epoch("ms").to_numpy() if x.dtype.is_temporal() else x.to_numpy()
+        indices = lttb_indices(positions, values, max_points)
+    elif method == "minmax":
+        indices = minmax_indices(values, max_points)
+    else:
+        raise ValueError(f"Méthode de réduction inconnue : {method}")
+
+    return x.gather(indices), y.gather(indices)
+
+
+def clip_range(df: pl.DataFrame, x_range: Optional[tuple]) -> pl.DataFrame:
+    """
+    Restreint un DataFrame à une plage de timestamps (zoom du graphique)
+
+    Une barre est conservée de part et d'autre pour que les lignes
+    atteignent les bords de la zone affichée.
+    """
+    if not x_range or df.is_empty():
+        return df
+
+    # Plotly renvoie les bornes sous forme de chaînes ISO de précision variable
+    start, end = (
+        datetime.fromisoformat(bound) if isinstance(bound, str) else bound
+        for bound in x_range
+    )
+
+    timestamps = df['timestamp']
+    first = max(int(timestamps.search_sorted(start, side="left")) - 1, 0)
+    last = min(int(timestamps.search_sorted(end, side="right")) + 1, len(df))
+    return df.slice(first, last - first)
+
+
+# Script de test : volume et coût des figures sur 500 000 bougies
+if __name__ == "__main__":
+    import time
+    from datetime import timedelta
+    from .charts import create_price_chart, create_technical_chart
+
+    n = 500_000
+    rng = np.random.default_rng(42)
+    close = 40_000 * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+    start_date = datetime(2024, 1, 1)
+    df = pl.DataFrame({
+        "timestamp": pl.datetime_range(
+            start_date, start_date + timedelta(minutes=n - 1), "1m", eager=True
+        ),
+        "open": np.roll(close, 1),
+        "high": close * (1 + rng.random(n) * 1e-3),
+        "low": close * (1 - rng.random(n) * 1e-3),
+        "close": close,
+        "volume": rng.random(n) * 10,
+        "RSI": 50 + 20 * np.sin(np.arange(n) / 500),
+        "MACD": rng.normal(0, 10, n),
+        "MACD_Signal": rng.normal(0, 10, n),
+        "MACD_Histogram": rng.normal(0, 5, n)
+    }).with_columns([
+        pl.col("close").rolling_mean(window_size=period).alias(f"SMA_{period}")
+        for period in (20, 50, 200)
+    ]).with_columns([
+        pl.col("close").rolling_mean(window_size=20).alias("BB_middle"),
+        (pl.col("close").rolling_mean(window_size=20)
+         + 2 * pl.col("close").rolling_std(window_size=20)).alias("BB_upper"),
+        (pl.col("close").rolling_mean(window_size=20)
+         - 2 * pl.col("close").rolling_std(window_size=20)).alias("BB_lower")
+    ])
+
+    begin = time.perf_counter()
+    candles = merge_candles(df, candle_budget(None))
+    print(f"Fusion des bougies : {len(df)} -> {len(candles)} en {(time.perf_counter() - begin) * 1e3:.1f}ms")
+    assert candles["high"].max() == df["high"].max() and candles["low"].min() == df["low"].min()
+
+    x = df["timestamp"].dt.epoch("ms").to_numpy()
+    for name, reduce in (
+        ("LTTB", lambda: lttb_indices(x, close, line_budget(None))),
+        ("Min-max", lambda: minmax_indices(close, line_budget(None)))
+    ):
+        begin = time.perf_counter()
+        indices = reduce()
+        print(f"{name} : {n} -> {len(indices)} points en {(time.perf_counter() - begin) * 1e3:.1f}ms")
+
+    indicators = ["sma", "bb", "rsi", "macd"]
+    for label, width in (("Pleine résolution", None), (f"Réduit ({DEFAULT_CHART_WIDTH}px)", DEFAULT_CHART_WIDTH)):
+        begin = time.perf_counter()
+        payload = (
+            create_price_chart(df, indicators, width=width).to_json()
+            + create_technical_chart(df, indicators, width=width).to_json()
+        )
+        elapsed = time.perf_counter() - begin
+        print(f"{label} : {len(payload) / 1e6:.1f} Mo, construction + sérialisation {elapsed:.2f}s")
@@ -1,20 +1,30 @@
 # src/dashboard/components/tables.py
+from typing import Hashable, Optional
 import polars as pl
-from ...analysis.statistics import MarketStatistics
+from ...analysis.rolling import RollingStatistics
+from ...analysis.statistics import summary_service
 
-def create_market_summary(df: pl.DataFrame) -> dict:
+def create_market_summary(
+    df: pl.DataFrame,
+    timeframe: Optional[str] = None,
+    version: Optional[Hashable] = None,
+    rolling: Optional[RollingStatistics] = None
+) -> dict:
     """
     Crée un résumé du marché pour affichage
+    
+    Avec un timeframe et une version de données, le résumé est partagé entre
+    les sorties et les sessions via le service mémoïsé.
     """
-    stats = MarketStatistics.get_market_summary(df)
+    stats = summary_service.get(df, timeframe, version, rolling=rolling)
     if stats is None:
         raise ValueError("Le résumé du marché est vide.")
     
     return {
-        "price": stats["latest_price"],
+        "price": stats.get("latest_price", stats.get("price")),
         "change_24h": stats["change_24h"],
         "volatility": stats.get("volatility_30d", "N/A"),
         "trend": stats["trend"],
-        "rsi": stats["technical_indicators"]["rsi"] if stats["technical_indicators"] else "N/A",
+        "rsi": stats["technical_indicators"]["rsi"] if stats.get("technical_indicators") else "N/A",
         "volume_24h": stats["volume_24h"]
     }
\ No newline at end of file
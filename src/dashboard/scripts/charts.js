@@ -0,0 +1,114 @@
+// src/dashboard/scripts/charts.js
+// Ajouts incrémentaux aux graphiques du tableau de bord
+//
+// Le serveur n'envoie, pour chaque trace dont la fenêtre a glissé, que les
+// points nouveaux ou révisés (voir _increment dans components/charts.py) ;
+// les tableaux complets sont reconstitués ici autour des points conservés,
+// puis appliqués par le plotly.js embarqué dans le widget, le même qui a
+// dessiné le graphique.
+(function () {
+  // Délai laissé à un graphique en cours de rendu pour atteindre l'état
+  // sur lequel l'ajout a été calculé (widget recréé juste avant l'envoi)
+  const WAIT_MS = 2000;
+  const POLL_MS = 100;
+
+  let figureView = null;
+  const queues = {};
+
+  function loadFigureView() {
+    // Module AMD du widget plotly, déjà chargé par shinywidgets
+    if (!figureView) {
+      figureView = new Promise((resolve, reject) => {
+        window.require(["jupyterlab-plotly"], module => resolve(module.FigureView), reject);
+      });
+    }
+    return figureView;
+  }
+
+  function restyle(FigureView, gd, data, traces) {
+    // Même traitement qu'une modification envoyée par Python au widget
+    // (_py2js_restyle), sans renvoi de l'état du navigateur vers le serveur
+    FigureView.prototype.do_restyle.call({
+      el: gd,
+      model: {
+        get: () => ({restyle_data: data, restyle_traces: traces}),
+        _normalize_trace_indexes: indexes => indexes
+      },
+      _sendTraceDeltas: () => {},
+      _sendLayoutDelta: () => {}
+    });
+  }
+
+  function property(trace, path) {
+    return path.split(".").reduce((value, key) => (value == null ? undefined : value[key]), trace);
+  }
+
+  function splice(current, increment, prop) {
+    // Tableaux typés (transmis en binaire par le widget) : les NaN arrivent en null
+    // Début non révisé (x notamment) : repris de l'ancienne série
+    const head = increment.head[prop] || Array.from(current.slice(increment.shift, increment.start));
+    const kept = Array.from(current.slice(increment.start, increment.end));
+    const tail = increment.tail[prop];
+    if (!ArrayBuffer.isView(current)) {
+      return head.concat(kept, tail);
+    }
+    const values = new current.constructor(head.length + kept.length + tail.length);
+    const toNumber = value => (value === null ? NaN : value);
+    values.set(head.map(toNumber));
+    values.set(kept, head.length);
+    values.set(tail.map(toNumber), head.length + kept.length);
+    return values;
+  }
+
+  function matches(gd, increments) {
+    return increments.every(increment => {
+      const x = property(gd.data[increment.index], "x");
+      return x != null && x.length === increment.length && Number(x[x.length - 1]) === increment.last;
+    });
+  }
+
+  async function apply(id, increments) {
+    const FigureView = await loadFigureView();
+    const deadline = Date.now() + WAIT_MS;
+    let gd;
+    while (!(gd = document.querySelector(`#${id} .js-plotly-plot`)) || !gd.data || !matches(gd, increments)) {
+      if (Date.now() > deadline) {
+        throw new Error("état du graphique différent de celui de l'ajout");
+      }
+      await new Promise(resolve => setTimeout(resolve, POLL_MS));
+    }
+
+    // Une modification par ensemble de propriétés (bougies, lignes...)
+    const groups = new Map();
+    for (const increment of increments) {
+      const props = Object.keys(increment.tail).sort();
+      const key = props.join(",");
+      if (!groups.has(key)) {
+        groups.set(key, {data: Object.fromEntries(props.map(prop => [prop, []])), traces: []});
+      }
+      const group = groups.get(key);
+      const trace = gd.data[increment.index];
+      group.traces.push(increment.index);
+      for (const prop of props) {
+        group.data[prop].push(splice(property(trace, prop), increment, prop));
+      }
+    }
+    for (const group of groups.values()) {
+      restyle(FigureView, gd, group.data, group.traces);
+    }
+  }
+
+  $(document).on("shiny:connected", () => {
+    Shiny.addCustomMessageHandler("chart_increments", message => {
+      for (const [id, increments] of Object.entries(message)) {
+        // Ajouts appliqués dans l'ordre de réception, graphique par graphique
+        queues[id] = (queues[id] || Promise.resolve())
+          .then(() => apply(id, increments))
+          .catch(error => {
+            console.warn(`Ajout impossible sur le graphique ${id} :`, error);
+            Shiny.setInputValue("chart_resync", id, {priority: "event"});
+          });
+      }
+    });
+  });
+})();
@@ -4,12 +4,31 @@ import asyncio
 import time
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
+import polars as pl
 import logging
 from ..config import config
 from ..database.models import BitcoinPrice
+from ..monitoring.metrics import metrics
+from ..monitoring.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+REQUEST_SECONDS = metrics.histogram(
+    "coinbase_request_seconds",
+    "Durée d'une tentative de requête à l'API Coinbase",
+    labels=("endpoint",)
+)
+REQUEST_RETRIES = metrics.counter(
+    "coinbase_request_retries_total",
+    "Nouvelles tentatives après une erreur de l'API Coinbase",
+    labels=("endpoint",)
+)
+REQUEST_FAILURES = metrics.counter(
+    "coinbase_request_failures_total",
+    "Requêtes à l'API Coinbase en échec après toutes les tentatives",
+    labels=("endpoint",)
+)
+
 class CoinbaseClient:
     """Client API asynchrone pour Coinbase"""
     
@@ -51,19 +70,26 @@ class CoinbaseClient:
             try:
                 await self._ensure_session()
                 
-                async with self.session.request(
-                    method=method,
-                    url=url,
-                    params=params
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
+                with (
+                    tracer.span("coinbase.request", endpoint=endpoint, attempt=attempt + 1) as span,
+                    REQUEST_SECONDS.labels(endpoint).time()
+                ):
+                    async with self.session.request(
+                        method=method,
+                        url=url,
+                        params=params
+                    ) as response:
+                        span.set("status", response.status)
+                        response.raise_for_status()
+                        return await response.json()
                     
             except aiohttp.ClientError as e:
                 if attempt == retries - 1:
+                    REQUEST_FAILURES.labels(endpoint).inc()
                     logger.error(f"Échec de la requête après {retries} tentatives: {e}")
                     raise
                 
+                REQUEST_RETRIES.labels(endpoint).inc()
                 wait_time = config.RETRY_DELAY * (2 ** attempt)  # Backoff exponentiel
                 logger.warning(f"Tentative {attempt + 1} échouée, nouvel essai dans {wait_time}s")
                 await asyncio.sleep(wait_time)
@@ -93,6 +119,45 @@ class CoinbaseClient:
                 logger.error(f"Erreur lors de la récupération des données historiques: {e}")
                 return []
     
+    async def get_trades(
+        self,
+        after: Optional[int] = None,
+        limit: int = 1000
+    ) -> pl.DataFrame:
+        """
+        Récupère une page de transactions, de la plus récente à la plus ancienne
+        
+        Les transactions restent en colonnes (timestamp, trade_id, price,
+        size, side) : à plusieurs dizaines de millions par jour, un objet
+        par transaction coûterait plus cher que l'appel lui-même.
+        
+        Args:
+            after: Ne renvoyer que les transactions d'identifiant inférieur (page précédente)
+            limit: Taille de la page (1000 au plus)
+        """
+        async with self._lock:
+            endpoint = "/products/BTC-USD/trades"
+            
+            params = {"limit": limit}
+            if after is not None:
+                params["after"] = after
+            
+            try:
+                data = await self._make_request("GET", endpoint, params=params)
+                if not data:
+                    return pl.DataFrame()
+                return pl.DataFrame(data).select(
+                    pl.col("time").str.to_datetime(time_zone="UTC").dt.replace_time_zone(None)
+                      .dt.cast_time_unit("us").alias("timestamp"),
+                    pl.col("trade_id").cast(pl.Int64),
+                    pl.col("price").cast(pl.Float64),
+                    pl.col("size").cast(pl.Float64),
+                    pl.col("side")
+                )
+            except Exception as e:
+                logger.error(f"Erreur lors de la récupération des transactions: {e}")
+                return pl.DataFrame()
+    
     async def get_latest_price(self) -> Optional[BitcoinPrice]:
         """Récupère le dernier prix disponible de façon asynchrone"""
         async with self._lock:
@@ -0,0 +1,467 @@
+# src/data/export.py
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+import asyncio
+import base64
+import hashlib
+import zlib
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+import logging
+from ..monitoring.metrics import metrics
+from ..monitoring.tracing import tracer
+from .hub import hub
+from .processor import TIMEFRAME_MINUTES
+
+logger = logging.getLogger(__name__)
+
+EXPORT_REQUESTS = metrics.counter(
+    "export_requests_total",
+    "Requêtes de l'API d'export par format et résultat",
+    labels=("format", "result")
+)
+EXPORT_ROWS = metrics.counter(
+    "export_rows_total",
+    "Barres envoyées par l'API d'export",
+    labels=("format",)
+)
+
+# Formats servis et type de contenu
+FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+    "ndjson": "application/x-ndjson"
+}
+
+# Colonnes ajoutées par indicateur (mêmes noms que TechnicalAnalysis)
+INDICATOR_COLUMNS = {
+    "sma": ["SMA_20", "SMA_50", "SMA_200"],
+    "bb": ["BB_middle", "BB_upper", "BB_lower"],
+    "rsi": ["RSI"],
+    "macd": ["MACD", "MACD_Signal", "MACD_Histogram"]
+}
+
+# Barres lues avant le début de la page : fenêtres complètes pour les SMA
+# et convergence des moyennes exponentielles du MACD ((1 - 2/27)^600 ~ 1e-20)
+WARMUP_BARS = 600
+
+DEFAULT_LIMIT = 10_000
+MAX_LIMIT = 1_000_000
+
+# Lignes par lot lu dans DuckDB puis encodé et envoyé
+BATCH_ROWS = 65_536
+
+
+class ExportError(ValueError):
+    """Paramètre de requête invalide (réponse 400)"""
+
+
+@dataclass
+class ExportQuery:
+    """Paramètres normalisés d'une requête d'export"""
+    timeframe: str
+    indicators: List[str]
+    start: Optional[datetime]
+    end: Optional[datetime]
+    limit: int
+    format: str
+
+    @property
+    def minutes(self) -> int:
+        return TIMEFRAME_MINUTES[self.timeframe]
+
+    def columns(self) -> List[str]:
+        base = ["timestamp", "open", "high", "low", "close", "volume", "trades"]
+        return base + [c for name in self.indicators for c in INDICATOR_COLUMNS[name]]
+
+    def key(self) -> str:
+        """Empreinte des paramètres (partie de l'ETag)"""
+        canonical = "|".join([
+            self.timeframe, ",".join(self.indicators), str(self.start), str(self.end),
+            str(self.limit), self.format
+        ])
+        return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def _parse_datetime(value: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Date invalide : {value}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def encode_cursor(timestamp: datetime) -> str:
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> datetime:
+    try:
+        return datetime.fromisoformat(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise ExportError("Curseur invalide")
+
+
+def parse_query(request: Request) -> ExportQuery:
+    """Paramètres de la requête ; le format vient de `format`, sinon de l'en-tête Accept"""
+    params = request.query_params
+
+    timeframe = params.get("timeframe", "1m")
+    if timeframe not in TIMEFRAME_MINUTES:
+        raise ExportError(f"Timeframe inconnu : {timeframe} ({', '.join(TIMEFRAME_MINUTES)})")
+
+    indicators = [i for i in params.get("indicators", "").split(",") if i]
+    unknown = set(indicators) - INDICATOR_COLUMNS.keys()
+    if unknown:
+        raise ExportError(f"Indicateurs inconnus : {sorted(unknown)} ({', '.join(INDICATOR_COLUMNS)})")
+    indicators = [name for name in INDICATOR_COLUMNS if name in indicators]
+
+    format = params.get("format")
+    if format is None:
+        accept = request.headers.get("accept", "")
+        format = next((name for name, media in FORMATS.items() if media in accept), "arrow")
+    if format not in FORMATS:
+        raise ExportError(f"Format inconnu : {format} ({', '.join(FORMATS)})")
+
+    try:
+        limit = int(params.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise ExportError("limit doit être un entier")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ExportError(f"limit doit être compris entre 1 et {MAX_LIMIT}")
+
+    # Le curseur remplace le début de la plage (pagination par clé)
+    start = decode_cursor(params["cursor"]) if "cursor" in params else (
+        _parse_datetime(params["start"]) if "start" in params else None
+    )
+    end = _parse_datetime(params["end"]) if "end" in params else None
+    return ExportQuery(timeframe, indicators, start, end, limit, format)
+
+
+class _EwmState:
+    """
+    Moyenne exponentielle ajustée (ewm_mean de Polars, adjust=True) calculée
+    lot par lot
+
+    Sur un lot, y[t] = num[t] / den[t] avec num[t] = S[t] + beta^(t+1) * num
+    et den[t] = D[t] + beta^(t+1) * den, où S et D sont les sommes pondérées
+    propres au lot et (num, den) l'état hérité du lot précédent : le
+    résultat est identique à un calcul sur la série entière.
+    """
+
+    def __init__(self, span: int):
+        self.beta = 1 - 2 / (span + 1)
+        self.span = span
+        self.num = 0.0
+        self.den = 0.0
+
+    def apply(self, values: pl.Series) -> pl.Series:
+        n = len(values)
+        if n == 0:
+            return values.cast(pl.Float64)
+        decay = self.beta ** np.arange(1, n + 1)
+        local_den = (1 - decay) / (1 - self.beta)
+        local_num = values.ewm_mean(span=self.span, min_periods=1).to_numpy() * local_den
+        num = local_num + decay * self.num
+        den = local_den + decay * self.den
+        self.num, self.den = num[-1], den[-1]
+        return pl.Series(values.name, num / den)
+
+
+class _Sink:
+    """Flux de sortie en mémoire vidé après chaque lot (écrivains Arrow et Parquet)"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _Encoder:
+    """Encodage incrémental d'une suite de DataFrames dans un format d'export"""
+
+    def __init__(self, format: str):
+        self.format = format
+        self._sink = _Sink()
+        self._writer = None
+        self._gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if format == "ndjson" else None
+
+    @property
+    def started(self) -> bool:
+        return self._writer is not None
+
+    def write(self, frame: pl.DataFrame) -> bytes:
+        if self.format == "ndjson":
+            return self._gzip.compress(frame.write_ndjson().encode()) if len(frame) else b""
+        table = frame.to_arrow()
+        if self._writer is None:
+            self._writer = (
+                pa.ipc.new_stream(self._sink, table.schema) if self.format == "arrow"
+                else pq.ParquetWriter(self._sink, table.schema, compression="zstd")
+            )
+        if len(frame):
+            if self.format == "arrow":
+                for batch in table.to_batches():
+                    self._writer.write_batch(batch)
+            else:
+                self._writer.write_table(table)
+        return self._sink.take()
+
+    def close(self) -> bytes:
+        if self._gzip is not None:
+            return self._gzip.flush()
+        if self._writer is None:
+            raise RuntimeError("Aucun lot écrit : schéma inconnu")
+        self._writer.close()
+        return self._sink.take()
+
+
+class ExportService:
+    """
+    Export des barres OHLCV et indicateurs depuis DuckDB
+
+    L'agrégation au timeframe et les indicateurs à fenêtre (SMA, Bollinger,
+    RSI) sont calculés en SQL par des fonctions de fenêtrage, avec les
+    mêmes définitions que TechnicalAnalysis ; le MACD (moyennes
+    exponentielles) est prolongé lot par lot. Le résultat est lu en lots
+    Arrow (fetch_record_batch) et encodé au fil de l'eau : une page n'est
+    jamais matérialisée entière.
+
+    La pagination est par clé : la page suivante commence au premier
+    intervalle non servi, transmis dans un curseur opaque.
+    """
+
+    def __init__(self, conn):
+        """
+        Args:
+            conn: Connexion DuckDB de l'application ; chaque export utilise
+                son propre curseur (connexion dupliquée, sûre entre threads)
+        """
+        self.conn = conn
+
+    def watermark(self) -> int:
+        cursor = self.conn.cursor()
+        try:
+            return cursor.execute("SELECT version FROM data_watermark WHERE id = 1").fetchone()[0]
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _bucket(query: ExportQuery, column: str = "timestamp") -> str:
+        """Début d'intervalle, aligné sur l'epoch comme dt.truncate de Polars"""
+        if query.minutes == 1:
+            return column
+        return f"time_bucket(INTERVAL '{query.minutes} minutes', {column}, TIMESTAMP '1970-01-01')"
+
+    def _bars_sql(self, query: ExportQuery) -> str:
+        """Barres du timeframe sur [?, ?[ (mêmes agrégats que DataProcessor._aggregate)"""
+        if query.minutes == 1:
+            return """
+                SELECT
+                    timestamp,
+                    CAST(open AS DOUBLE) AS open,
+                    CAST(high AS DOUBLE) AS high,
+                    CAST(low AS DOUBLE) AS low,
+                    CAST(close AS DOUBLE) AS close,
+                    CAST(volume AS DOUBLE) AS volume,
+                    CAST(trades AS BIGINT) AS trades
+                FROM bitcoin_prices
+                WHERE timestamp >= ? AND timestamp < ?
+            """
+        return f"""
+            SELECT
+                {self._bucket(query)} AS timestamp,
+                CAST(arg_min(open, timestamp) AS DOUBLE) AS open,
+                CAST(max(high) AS DOUBLE) AS high,
+                CAST(min(low) AS DOUBLE) AS low,
+                CAST(arg_max(close, timestamp) AS DOUBLE) AS close,
+                CAST(sum(volume) AS DOUBLE) AS volume,
+                CAST(sum(trades) AS BIGINT) AS trades
+            FROM bitcoin_prices
+            WHERE timestamp >= ? AND timestamp < ?
+            GROUP BY 1
+        """
+
+    def _indicators_sql(self, query: ExportQuery) -> str:
+        """Barres et indicateurs à fenêtre, en fonctions de fenêtrage"""
+        def rows(n: int) -> str:
+            return f"(ORDER BY timestamp ROWS BETWEEN {n - 1} PRECEDING AND CURRENT ROW)"
+
+        columns = ["timestamp", "open", "high", "low", "close", "volume", "trades"]
+        if "sma" in query.indicators:
+            columns += [f"avg(close) OVER {rows(n)} AS SMA_{n}" for n in (20, 50, 200)]
+        if "bb" in query.indicators:
+            columns += [
+                f"avg(close) OVER {rows(20)} AS BB_middle",
+                f"avg(close) OVER {rows(20)} + 2 * stddev_samp(close) OVER {rows(20)} AS BB_upper",
+                f"avg(close) OVER {rows(20)} - 2 * stddev_samp(close) OVER {rows(20)} AS BB_lower"
+            ]
+        if "rsi" in query.indicators:
+            columns.append(
+                f"100 - 100 / (1 + avg(CASE WHEN diff > 0 THEN diff ELSE 0 END) OVER {rows(14)}"
+                f" / avg(CASE WHEN diff < 0 THEN -diff ELSE 0 END) OVER {rows(14)}) AS RSI"
+            )
+        return f"""
+            SELECT {", ".join(columns)}
+            FROM (
+                SELECT *, close - lag(close) OVER (ORDER BY timestamp) AS diff
+                FROM ({self._bars_sql(query)})
+            )
+            ORDER BY timestamp
+        """
+
+    def page_bounds(self, cursor, query: ExportQuery) -> tuple[datetime, datetime, Optional[datetime]]:
+        """
+        Début, fin et suite de la page
+
+        Returns:
+            (début aligné, fin exclue, début de la page suivante ou None)
+        """
+        first, last = cursor.execute(
+            "SELECT min(timestamp), max(timestamp) FROM bitcoin_prices"
+        ).fetchone()
+        end = query.end or (last + timedelta(minutes=1) if last else datetime.utcnow())
+        start = query.start or first or end
+        start = cursor.execute(f"SELECT {self._bucket(query, '?')}", [start]).fetchone()[0]
+
+        # Intervalle non vide suivant les `limit` premiers : début de la page suivante
+        following = cursor.execute(f"""
+            SELECT bucket FROM (
+                SELECT DISTINCT {self._bucket(query)} AS bucket
+                FROM bitcoin_prices
+                WHERE timestamp >= ? AND timestamp < ?
+            )
+            ORDER BY bucket
+            LIMIT 1 OFFSET ?
+        """, [start, end, query.limit]).fetchone()
+        if following is None:
+            return start, end, None
+        return start, following[0], following[0]
+
+    def stream(self, query: ExportQuery, cursor, start: datetime, end: datetime) -> Iterator[bytes]:
+        """Contenu encodé de la page [start, end[, lot par lot"""
+        encoder = _Encoder(query.format)
+        warmup = start
+        if query.indicators:
+            warmup = cursor.execute(
+                f"SELECT ?::TIMESTAMP - INTERVAL '{query.minutes * WARMUP_BARS} minutes'", [start]
+            ).fetchone()[0]
+
+        macd = (_EwmState(12), _EwmState(26), _EwmState(9)) if "macd" in query.indicators else None
+        columns = query.columns()
+
+        def finish(frame: pl.DataFrame) -> pl.DataFrame:
+            """MACD prolongé sur le lot, puis retrait du préchauffage"""
+            if macd is not None:
+                fast, slow, signal = macd
+                line = (fast.apply(frame["close"]) - slow.apply(frame["close"])).alias("MACD")
+                frame = frame.with_columns(
+                    line,
+                    signal.apply(line).alias("MACD_Signal")
+                ).with_columns((pl.col("MACD") - pl.col("MACD_Signal")).alias("MACD_Histogram"))
+            return frame.filter(pl.col("timestamp") >= start).select(columns)
+
+        rows = 0
+        try:
+            with tracer.trace("export.stream", timeframe=query.timeframe, format=query.format) as span:
+                reader = cursor.execute(
+                    self._indicators_sql(query), [warmup, end]
+                ).fetch_record_batch(BATCH_ROWS)
+                for batch in reader:
+                    frame = finish(pl.from_arrow(batch))
+                    if len(frame):
+                        rows += len(frame)
+                        yield encoder.write(frame)
+                if not encoder.started:
+                    # Page vide : un flux Arrow ou Parquet valide porte au moins le schéma
+                    yield encoder.write(finish(pl.from_arrow(reader.schema.empty_table())))
+                span.set("rows", rows)
+            yield encoder.close()
+            EXPORT_ROWS.labels(query.format).inc(rows)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export : {e}")
+            raise
+        finally:
+            cursor.close()
+
+
+async def export_endpoint(request: Request) -> Response:
+    """
+    Barres OHLCV et indicateurs en Arrow IPC (flux), Parquet ou NDJSON gzip
+
+    Paramètres : timeframe, indicators (sma,bb,rsi,macd), start, end (ISO
+    8601, UTC par défaut), limit, cursor, format (sinon en-tête Accept).
+    La page suivante est annoncée par les en-têtes Link et X-Next-Cursor ;
+    l'ETag dépend du filigrane des données et des paramètres
+    (If-None-Match -> 304).
+    """
+    format = request.query_params.get("format", "?")
+    if hub.reader is not None:
+        EXPORT_REQUESTS.labels(format, "unavailable").inc()
+        # Les workers lisent des instantanés ; la base appartient au producteur
+        return JSONResponse(
+            {"error": "Export indisponible en mode multi-workers (base ouverte par le producteur)"},
+            status_code=503
+        )
+
+    try:
+        query = parse_query(request)
+    except ExportError as e:
+        EXPORT_REQUESTS.labels(format, "invalid").inc()
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    service = ExportService(hub.processor.db.conn)
+    etag = f'"{service.watermark()}-{query.key()}"'
+    if etag in [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]:
+        EXPORT_REQUESTS.labels(query.format, "not_modified").inc()
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cursor = hub.processor.db.conn.cursor()
+    try:
+        # Parcours des intervalles de la plage : hors de la boucle asyncio
+        start, end, following = await asyncio.to_thread(service.page_bounds, cursor, query)
+    except Exception as e:
+        cursor.close()
+        logger.error(f"Erreur lors de la préparation de l'export : {e}")
+        EXPORT_REQUESTS.labels(query.format, "error").inc()
+        return JSONResponse({"error": "Erreur interne"}, status_code=500)
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if query.format == "ndjson":
+        headers["Content-Encoding"] = "gzip"
+    if following is not None:
+        next_cursor = encode_cursor(following)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+
+    EXPORT_REQUESTS.labels(query.format, "ok").inc()
+    # Itérateur synchrone : Starlette le consomme dans son pool de threads
+    return StreamingResponse(
+        service.stream(query, cursor, start, end),
+        media_type=FORMATS[query.format],
+        headers=headers
+    )
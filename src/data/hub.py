@@ -0,0 +1,255 @@
+# src/data/hub.py
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+import asyncio
+import os
+import logging
+from ..config import config
+from ..monitoring.metrics import metrics
+from ..monitoring.tracing import tracer
+from .snapshots import SnapshotPublisher, SnapshotReader
+from .state import StateStore
+
+if TYPE_CHECKING:
+    # Import différé : DuckDB, aiohttp et l'analyse ne sont chargés que par le
+    # processus qui ouvre la base (jamais par les workers en mode instantanés)
+    from .processor import DataProcessor
+    from ..alerts.engine import AlertEngine
+
+logger = logging.getLogger(__name__)
+
+# Variable d'environnement transmise aux workers du dashboard : répertoire
+# des instantanés publiés par le producteur (mode multi-workers)
+SNAPSHOT_DIR_ENV = "DASHBOARD_SNAPSHOT_DIR"
+
+# Intervalle de scrutation du pointeur d'instantané dans les workers (secondes)
+SNAPSHOT_POLL_INTERVAL = 1
+
+# Variable d'environnement activant le préchauffage (transmise aux workers)
+WARMUP_ENV = "DASHBOARD_WARMUP"
+
+class DataHub:
+    """
+    Pile de données partagée par toutes les sessions du processus
+
+    Un seul DataProcessor (connexion DuckDB, client Coinbase, caches) et une
+    seule boucle de rafraîchissement servent toutes les sessions. Chaque
+    rafraîchissement incrémente `version`, que les sessions surveillent pour
+    invalider leurs sorties.
+
+    En mode multi-workers, le producteur publie chaque rafraîchissement
+    (`publisher`) et les workers lisent ces instantanés (`reader`) au lieu
+    d'ouvrir la base.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: Optional[int] = None,
+        publisher: Optional[SnapshotPublisher] = None,
+        reader: Optional[SnapshotReader] = None
+    ):
+        self.refresh_interval = refresh_interval or config.REFRESH_INTERVAL
+        self.publisher = publisher
+        self.reader = reader
+        self.version = 0
+        self.last_refresh: Optional[datetime] = None
+        self.active_sessions = 0
+        self._processor: Optional["DataProcessor"] = None
+        self._alerts: Optional["AlertEngine"] = None
+        self._state: Optional[StateStore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._notifications: set = set()   # envois d'alertes en cours
+        self._lock = asyncio.Lock()
+
+    @property
+    def processor(self) -> Union["DataProcessor", SnapshotReader]:
+        """Source de données des sessions, créée au premier accès"""
+        if self.reader is not None:
+            return self.reader
+        if self._processor is None:
+            from .processor import DataProcessor
+            self._processor = DataProcessor()
+        return self._processor
+
+    @property
+    def alerts(self) -> "AlertEngine":
+        """Moteur d'alertes du processus qui ouvre la base, créé au premier accès"""
+        if self._alerts is None:
+            from ..alerts.engine import create_engine
+            self._alerts = create_engine()
+        return self._alerts
+
+    @property
+    def state(self) -> Optional[StateStore]:
+        """Sauvegarde de l'état de travail du processus qui ouvre la base (None si désactivée)"""
+        if self.reader is not None or config.STATE_SNAPSHOT_INTERVAL <= 0:
+            return None
+        if self._state is None:
+            self._state = StateStore(config.DATA_DIR / "state")
+        return self._state
+
+    async def save_state(self):
+        """
+        Sauvegarde l'état de travail du processeur
+
+        L'écriture se fait dans un thread : l'état ne contient que des
+        références, que les précalculs suivants remplacent sans les modifier.
+        """
+        if self.state is None or self._processor is None:
+            return
+        working_set = self._processor.working_set()
+        if working_set is None:
+            return
+        try:
+            with tracer.span("hub.save_state"):
+                await asyncio.to_thread(self.state.save, working_set)
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde de l'état de travail : {e}")
+
+    async def refresh(self):
+        """Précalcule tous les timeframes (ou charge le dernier instantané) puis publie une nouvelle version"""
+        alerts = []
+        async with self._lock:
+            with tracer.trace("hub.refresh", version=self.version):
+                try:
+                    if self.reader is not None:
+                        if not self.reader.refresh():
+                            return
+                    else:
+                        frames = {}
+                        if self.version == 0 and self.state is not None:
+                            # Redémarrage à chaud : état sauvegardé et delta de la base
+                            frames = await self.processor.restore_state(self.state)
+                        if not frames:
+                            frames = await self.processor.precompute_timeframes()
+                            if frames and self.state is not None and self.state.due(config.STATE_SNAPSHOT_INTERVAL):
+                                await self.save_state()
+                        if self.publisher is not None:
+                            if frames:
+                                self.publisher.publish(
+                                    frames,
+                                    {tf: self.processor.get_data_version(tf) for tf in frames},
+                                    {
+                                        tf: profile for tf in frames
+                                        if (profile := self.processor.get_volume_profile(tf)) is not None
+                                    }
+                                )
+                            self.publisher.publish_metrics(metrics.render({"process": "producer"}))
+                    self.last_refresh = datetime.utcnow()
+                    self.version += 1
+                    logger.info(f"Données rafraîchies (version {self.version})")
+                    # Alertes évaluées une seule fois, par le processus qui ouvre la base,
+                    # après la publication
+                    if self.reader is None and frames:
+                        alerts = self.alerts.check(frames, self.processor.rolling)
+                except Exception as e:
+                    logger.error(f"Erreur lors du rafraîchissement : {e}")
+        # Notifications envoyées hors du verrou : un webhook lent ne retarde
+        # ni les sessions ni le rafraîchissement suivant
+        if alerts:
+            task = asyncio.get_running_loop().create_task(self.alerts.dispatch(alerts))
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
+
+    async def _refresh_loop(self, delay: float = 0):
+        await asyncio.sleep(delay)
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self, delay: float = 0):
+        """Démarre la boucle de rafraîchissement (une seule par processus)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_loop(delay))
+
+    async def warm_up(self):
+        """
+        Prépare la source de données avant l'arrivée des sessions
+
+        Ouvre la base (schéma, sketches) ou le dernier instantané, effectue un
+        premier rafraîchissement complet puis démarre la boucle, dont le
+        prochain passage attend un intervalle entier.
+        """
+        await self.refresh()
+        self.start(delay=self.refresh_interval)
+
+    def attach(self, session) -> "DataProcessor":
+        """
+        Enregistre une session Shiny et retourne le processeur partagé
+
+        La boucle de rafraîchissement démarre avec la première session.
+        """
+        self.start()
+        self.active_sessions += 1
+        if self.reader is not None and self.reader.current is None:
+            # Premier accès d'un worker : servir l'instantané existant sans attendre la boucle
+            for attempt in range(2):
+                try:
+                    self.reader.refresh()
+                    break
+                except FileNotFoundError as e:
+                    # Instantané supprimé par le producteur entre la lecture du
+                    # pointeur et celle des fichiers : le pointeur désigne déjà
+                    # le suivant
+                    if attempt:
+                        logger.warning(f"Instantané indisponible à l'ouverture de la session : {e}")
+                except Exception as e:
+                    logger.error(f"Erreur lors du chargement de l'instantané : {e}")
+                    break
+
+        def detach():
+            self.active_sessions -= 1
+
+        session.on_ended(detach)
+        return self.processor
+
+    async def close(self):
+        """Arrête la boucle, sauvegarde l'état de travail et libère les ressources réseau"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.save_state()
+        if self._processor is not None:
+            await self._processor.client.close()
+        if self._notifications:
+            await asyncio.gather(*self._notifications)
+        if self._alerts is not None:
+            await self._alerts.close()
+
+
+async def _publish_loop(directory: Path):
+    publisher_hub = DataHub(publisher=SnapshotPublisher(directory))
+    try:
+        await publisher_hub._refresh_loop()
+    finally:
+        await publisher_hub.close()
+
+
+def run_publisher(directory: Path):
+    """
+    Point d'entrée du processus producteur en mode multi-workers
+
+    Seul ce processus ouvre la base DuckDB et interroge l'API ; chaque
+    rafraîchissement est publié dans `directory` pour les workers.
+    """
+    logger.info(f"Producteur d'instantanés démarré ({directory})")
+    try:
+        asyncio.run(_publish_loop(Path(directory)))
+    except KeyboardInterrupt:
+        pass
+
+
+def create_hub() -> DataHub:
+    """Hub du processus : lecteur d'instantanés dans un worker, processeur sinon"""
+    snapshot_dir = os.environ.get(SNAPSHOT_DIR_ENV)
+    if snapshot_dir:
+        return DataHub(
+            refresh_interval=SNAPSHOT_POLL_INTERVAL,
+            reader=SnapshotReader(Path(snapshot_dir))
+        )
+    return DataHub()
+
+
+# Instance partagée par toutes les sessions du processus
+hub = create_hub()
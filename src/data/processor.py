@@ -1,22 +1,108 @@
 # src/data/processor.py
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import date, datetime, timedelta
 import logging
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterable, Union
 import polars as pl
 import asyncio
-from ..database.operations import DatabaseManager
+import time
+from ..config import config
+from ..database.operations import FINGERPRINT_UNITS, DatabaseManager
 from ..database.models import BitcoinPrice
+from ..analysis.indicators import TechnicalAnalysis
+from ..analysis.profiles import VolumeProfile
+from ..analysis.rolling import RollingStatistics
+from ..analysis.statistics import MarketStatistics, summary_service
+from ..analysis.range_index import RangeExtremumIndex
+from ..monitoring.metrics import metrics
+from ..monitoring.tracing import tracer
 from .coinbase import CoinbaseClient
+from .state import STATE_RESTORES, STATE_SECONDS, StateStore, WorkingSet
 
 logger = logging.getLogger(__name__)
 
+CACHE_REQUESTS = metrics.counter(
+    "processor_cache_requests_total",
+    "Accès aux caches du processeur de données (ohlcv : bougies agrégées, indicators : timeframes précalculés)",
+    labels=("cache", "result")
+)
+INDICATOR_SECONDS = metrics.histogram(
+    "indicator_compute_seconds",
+    "Durée du calcul des indicateurs techniques d'un timeframe",
+    labels=("timeframe",)
+)
+TRADE_GAPS = metrics.gauge(
+    "trade_gaps",
+    "Trous ouverts dans la collecte des transactions (rattrapés aux rafraîchissements suivants)"
+)
+PRECOMPUTE_SECONDS = metrics.histogram(
+    "processor_precompute_seconds",
+    "Durée du précalcul complet des timeframes (collecte, lecture, agrégation, indicateurs)"
+)
+
+# Durée d'une bougie (en minutes) pour chaque timeframe du dashboard
+TIMEFRAME_MINUTES = {
+    "1m": 1,
+    "5m": 5,
+    "1H": 60,
+    "6H": 360,
+    "1D": 1440,
+    "1W": 10080
+}
+
+# Colonnes des bougies agrégées (timeframes sans indicateurs)
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "trades"]
+
+# Durée de validité des timeframes précalculés (deux cycles de rafraîchissement)
+SNAPSHOT_TTL = timedelta(seconds=60)
+
+# Minutes relues en base à la restauration d'un état, avant sa dernière
+# minute : la collecte réécrit les dernières bougies (révisions)
+REPLAY_MARGIN = timedelta(minutes=15)
+
+# Unités des intervalles libres ("15s", "3m", "4H"...), notation des timeframes
+INTERVAL_UNITS = {
+    "s": timedelta(seconds=1),
+    "m": timedelta(minutes=1),
+    "H": timedelta(hours=1),
+    "D": timedelta(days=1),
+    "W": timedelta(weeks=1)
+}
+
+def parse_interval(interval: str) -> timedelta:
+    """Durée d'un intervalle noté comme les timeframes (ex. "15s", "3m", "4H")"""
+    number, unit = interval[:-1], interval[-1:]
+    if not number.isdigit() or unit not in INTERVAL_UNITS or int(number) == 0:
+        raise ValueError(f"Intervalle invalide : {interval} (ex. 15s, 3m, 4H, 1D)")
+    return int(number) * INTERVAL_UNITS[unit]
+
 class DataProcessor:
     """Processeur des données pour l'analyse"""
     
     def __init__(self):
         self.db = DatabaseManager()
+        # Identité de la base : un état sauvegardé depuis une autre base est rejeté
+        self._database_id = self.db.get_database_id()
         self.client = CoinbaseClient()
         self._cache = {}  # {timeframe: (timestamp, DataFrame)}
+        # Timeframes avec indicateurs, remplacés d'un bloc par precompute_timeframes
+        self._snapshot = {}  # {timeframe: (timestamp, DataFrame)}
+        self._versions = {}  # {timeframe: version des données (filigrane DB)}
+        self._profiles = {}  # {timeframe: profil de volume de la période couverte}
+        # Dernière série minute précalculée et sa version (état de travail sauvegardé)
+        self._minutes: Optional[pl.DataFrame] = None
+        self._watermark: Optional[int] = None
+        # Jour du dernier nettoyage des transactions (rétention TRADE_RETENTION_DAYS)
+        self._trades_cleaned: Optional[date] = None
+        # Sommes préfixes de la série minute (fenêtres calendaires en O(1))
+        self.rolling = RollingStatistics()
+        # Arbre de segments des plus hauts / plus bas minute
+        self.extremes = RangeExtremumIndex()
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(TIMEFRAME_MINUTES),
+            thread_name_prefix="precompute"
+        )
     
     async def _collect_latest_data_async(self, timeframe: str) -> List[BitcoinPrice]:
         """Collecte les dernières données depuis l'API"""
@@ -45,6 +131,97 @@ class DataProcessor:
             logger.error(f"Erreur lors de la collecte des données : {e}")
             return []
     
+    async def collect_trades(self, max_pages: Optional[int] = None) -> int:
+        """
+        Collecte les transactions récentes depuis l'API et les stocke
+        
+        Les pages sont parcourues de la plus récente vers les plus anciennes
+        jusqu'à rejoindre la dernière transaction stockée. Si `max_pages`
+        pages n'y suffisent pas (premier lancement, interruption, pic
+        d'activité), le trou restant est enregistré en base et rattrapé
+        aux rafraîchissements suivants depuis le curseur `after`, avec un
+        budget de `max_pages` pages de plus par rafraîchissement.
+        
+        Returns:
+            Nombre de transactions ajoutées
+        """
+        max_pages = max_pages or config.TRADE_MAX_PAGES
+        try:
+            last_id = self.db.get_last_trade_id()
+            pages = []
+            after = None
+            for _ in range(max_pages):
+                page = await self.client.get_trades(after=after)
+                if page.is_empty():
+                    break
+                pages.append(page)
+                after = page["trade_id"].min()
+                if last_id is not None and after <= last_id + 1:
+                    break
+            else:
+                if last_id is not None:
+                    self.db.save_trade_gap(last_id, after)
+                    logger.warning(
+                        f"Transactions manquantes : {max_pages} pages ne rejoignent pas l'identifiant "
+                        f"{last_id}, trou ]{last_id}, {after}[ à rattraper"
+                    )
+            
+            added = await self.db.insert_trades_async(pl.concat(pages)) if pages else 0
+            return added + await self._fill_trade_gaps(max_pages)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la collecte des transactions : {e}")
+            return 0
+    
+    async def _fill_trade_gaps(self, max_pages: int) -> int:
+        """
+        Rattrape les trous de la collecte, du plus récent au plus ancien
+        
+        Chaque page part du curseur du trou ; le curseur est avancé en base
+        après chaque page insérée, et le trou fermé une fois rejoint.
+        
+        Returns:
+            Nombre de transactions ajoutées
+        """
+        added = 0
+        pages = 0
+        for low_id, cursor_id in self.db.get_trade_gaps():
+            while pages < max_pages:
+                page = await self.client.get_trades(after=cursor_id)
+                pages += 1
+                if not page.is_empty():
+                    added += await self.db.insert_trades_async(page, after_id=low_id)
+                    cursor_id = page["trade_id"].min()
+                if page.is_empty() or cursor_id <= low_id + 1:
+                    self.db.close_trade_gap(low_id)
+                    logger.info(f"Trou de transactions après l'identifiant {low_id} rattrapé")
+                    break
+                self.db.save_trade_gap(low_id, cursor_id)
+        TRADE_GAPS.set(len(self.db.get_trade_gaps()))
+        return added
+    
+    async def get_ohlcv_from_trades(
+        self,
+        interval: Union[str, timedelta],
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> pl.DataFrame:
+        """
+        Bougies OHLCV d'un intervalle quelconque ("15s", "3m"...) recalculées
+        à partir des transactions
+        
+        L'agrégation est faite dans DuckDB : seules les bougies sont
+        transférées, quel que soit le nombre de transactions.
+        """
+        if isinstance(interval, str):
+            interval = parse_interval(interval)
+        try:
+            with tracer.span("processor.trade_bars", interval=str(interval)):
+                return await self.db.get_trade_bars_async(interval, start_time, end_time)
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul des bougies depuis les transactions : {e}")
+            return pl.DataFrame()
+    
     def _get_interval(self, data: pl.DataFrame) -> int:
         """Calcule l'intervalle en minutes entre les points de données"""
         if data.is_empty():
@@ -88,14 +265,17 @@ class DataProcessor:
             if use_cache and cache_key in self._cache:
                 timestamp, data = self._cache[cache_key]
                 if datetime.utcnow() - timestamp < timedelta(seconds=10):
+                    CACHE_REQUESTS.labels("ohlcv", "hit").inc()
                     return data
+            CACHE_REQUESTS.labels("ohlcv", "miss").inc()
             
             # 2. Calculer la fenêtre temporelle
             window_size = self._get_window_size(timeframe)
             start_time = datetime.utcnow() - window_size
             
             # 3. Collecter les nouvelles données
-            latest_data = await self._collect_latest_data_async(timeframe)
+            with tracer.span("processor.collect", timeframe=timeframe):
+                latest_data = await self._collect_latest_data_async(timeframe)
             if latest_data:
                 await self.db.insert_prices_async(latest_data)
                 logger.info(f"Données mises à jour : {len(latest_data)} points")
@@ -108,30 +288,8 @@ class DataProcessor:
                 return pl.DataFrame()
             
             # 5. Agréger les données si nécessaire
-            if timeframe != "1m":
-                interval_map = {
-                    "1m": 1,
-                    "5m": 5,
-                    "1H": 60,
-                    "6H": 360,
-                    "1D": 1440,
-                    "1W": 10080
-                }
-                interval = interval_map[timeframe]
-                
-                # Arrondir les timestamps à l'intervalle
-                data = data.with_columns([
-                    (pl.col("timestamp")
-                     .dt.truncate(f"{interval}m"))
-                    .alias("time_bin")
-                ]).group_by("time_bin").agg([
-                    pl.col("open").first().alias("open"),
-                    pl.col("high").max().alias("high"),
-                    pl.col("low").min().alias("low"),
-                    pl.col("close").last().alias("close"),
-                    pl.col("volume").sum().alias("volume"),
-                    pl.col("trades").sum().alias("trades")
-                ]).sort("time_bin").rename({"time_bin": "timestamp"})
+            with tracer.span("processor.aggregate", timeframe=timeframe, rows=len(data)):
+                data = self._aggregate(data, timeframe)
                 
             # 6. Mettre à jour le cache
             self._cache[cache_key] = (datetime.utcnow(), data)
@@ -143,14 +301,366 @@ class DataProcessor:
             logger.error(f"Erreur lors du traitement des données : {e}")
             return pl.DataFrame()
     
+    @staticmethod
+    def _aggregate(data: pl.DataFrame, timeframe: str) -> pl.DataFrame:
+        """Agrège les bougies minute au timeframe demandé"""
+        if timeframe == "1m":
+            return data
+        
+        interval = TIMEFRAME_MINUTES[timeframe]
+        
+        # Arrondir les timestamps à l'intervalle
+        return data.with_columns([
+            (pl.col("timestamp")
+             .dt.truncate(f"{interval}m"))
+            .alias("time_bin")
+        ]).group_by("time_bin").agg([
+            pl.col("open").first().alias("open"),
+            pl.col("high").max().alias("high"),
+            pl.col("low").min().alias("low"),
+            pl.col("close").last().alias("close"),
+            pl.col("volume").sum().alias("volume"),
+            pl.col("trades").sum().alias("trades")
+        ]).sort("time_bin").rename({"time_bin": "timestamp"})
+    
+    def _build_timeframe(
+        self,
+        minutes: pl.DataFrame,
+        timeframe: str,
+        now: datetime
+    ) -> tuple[pl.DataFrame, pl.DataFrame]:
+        """Construit un timeframe et ses indicateurs (exécuté dans le pool de threads)"""
+        start_time = now - self._get_window_size(timeframe)
+        with tracer.span("processor.aggregate", timeframe=timeframe):
+            data = self._aggregate(
+                minutes.filter(pl.col("timestamp") >= start_time),
+                timeframe
+            )
+        with (
+            tracer.span("indicators.add_all", timeframe=timeframe, rows=len(data)),
+            INDICATOR_SECONDS.labels(timeframe).time()
+        ):
+            return data, TechnicalAnalysis.add_all_indicators(data)
+    
+    def _volume_profile(self, data: pl.DataFrame, timeframe: str, now: datetime) -> Optional[VolumeProfile]:
+        """Profil de volume de la période couverte par un timeframe (fusion des jours persistés)"""
+        if data.is_empty():
+            return None
+        try:
+            return MarketStatistics.get_volume_profile(
+                self.db.profiles,
+                now - self._get_window_size(timeframe),
+                data["timestamp"][-1] + timedelta(minutes=TIMEFRAME_MINUTES[timeframe])
+            )
+        except Exception as e:
+            logger.warning(f"Profil de volume {timeframe} non calculé : {e}")
+            return None
+    
+    async def _build_timeframes(
+        self,
+        minutes: pl.DataFrame,
+        timeframes: List[str],
+        now: datetime,
+        version: Optional[int]
+    ) -> Dict[str, pl.DataFrame]:
+        """
+        Agrège les timeframes depuis la série minute et les publie d'un bloc
+        
+        Returns:
+            Timeframes avec indicateurs
+        """
+        # Agrégation et indicateurs en parallèle (le contexte de trace est
+        # copié pour rattacher les étapes des threads à la trace courante)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(
+                self._executor, copy_context().run, self._build_timeframe, minutes, tf, now
+            )
+            for tf in timeframes
+        ])
+        
+        # Profils de volume des périodes couvertes (fusion des histogrammes
+        # journaliers, sans relire les bougies)
+        with tracer.span("processor.volume_profiles"):
+            profiles = {
+                tf: self._volume_profile(data, tf, now)
+                for tf, (data, _) in zip(timeframes, results)
+            }
+        
+        self._install(
+            {tf: (data, indicators, profiles[tf]) for tf, (data, indicators) in zip(timeframes, results)},
+            version,
+            minutes
+        )
+        return {tf: indicators for tf, (_, indicators) in zip(timeframes, results)}
+    
+    def _install(
+        self,
+        built: Dict[str, tuple],
+        version: Optional[int],
+        minutes: pl.DataFrame
+    ):
+        """
+        Publication atomique des timeframes (remplacement des références)
+        
+        Args:
+            built: {timeframe: (OHLCV, OHLCV + indicateurs, profil de volume ou None)}
+            version: Version des données (filigrane DB)
+            minutes: Série minute dont sont issus les timeframes
+        """
+        published_at = datetime.utcnow()
+        cache = dict(self._cache)
+        snapshot = dict(self._snapshot)
+        versions = dict(self._versions)
+        volume_profiles = dict(self._profiles)
+        for tf, (data, indicators, profile) in built.items():
+            cache[tf] = (published_at, data)
+            snapshot[tf] = (published_at, indicators)
+            versions[tf] = version
+            if profile is not None:
+                volume_profiles[tf] = profile
+        self._cache = cache
+        self._snapshot = snapshot
+        self._versions = versions
+        self._profiles = volume_profiles
+        # Série minute conservée (référence) pour la sauvegarde de l'état
+        self._minutes = minutes
+        self._watermark = version
+    
+    async def precompute_timeframes(
+        self,
+        timeframes: Optional[Iterable[str]] = None
+    ) -> Dict[str, pl.DataFrame]:
+        """
+        Précalcule tous les timeframes et leurs indicateurs
+        
+        Les données minute sont lues une seule fois sur la fenêtre la plus
+        large, puis chaque timeframe est agrégé en parallèle dans le pool de
+        threads (Polars libère le GIL). Les résultats remplacent le cache d'un
+        bloc : un lecteur voit soit l'ancien jeu complet, soit le nouveau.
+        """
+        timeframes = list(timeframes or TIMEFRAME_MINUTES)
+        started = time.perf_counter()
+        try:
+            # 1. Collecter les nouvelles bougies minute
+            with tracer.span("processor.collect", timeframe="1m"):
+                latest_data = await self._collect_latest_data_async("1m")
+            if latest_data:
+                await self.db.insert_prices_async(latest_data)
+            if config.COLLECT_TRADES:
+                with tracer.span("processor.collect_trades"):
+                    await self.collect_trades()
+                await self._clean_old_trades()
+            
+            # 2. Une seule lecture pour tous les timeframes
+            version = self.db.get_watermark()
+            now = datetime.utcnow()
+            window = max(self._get_window_size(tf) for tf in timeframes)
+            minutes = await self.db.get_prices_async(start_time=now - window)
+            if minutes.is_empty():
+                logger.error("Aucune donnée disponible pour le précalcul")
+                return {}
+            
+            # Seules les barres nouvelles ou révisées sont ajoutées
+            with tracer.span("processor.extend_statistics"):
+                self.rolling.extend(minutes)
+                self.extremes.extend(minutes)
+            
+            # 3. Agrégation, indicateurs et profils, publiés d'un bloc
+            frames = await self._build_timeframes(minutes, timeframes, now, version)
+            
+            PRECOMPUTE_SECONDS.observe(time.perf_counter() - started)
+            logger.info(f"Timeframes précalculés : {', '.join(timeframes)}")
+            return frames
+            
+        except Exception as e:
+            logger.error(f"Erreur lors du précalcul des timeframes : {e}")
+            return {}
+    
+    async def get_indicator_data(self, timeframe: str = "1m") -> pl.DataFrame:
+        """
+        Récupère les données OHLCV avec indicateurs techniques
+        
+        Sert le résultat précalculé s'il est encore valide, sinon calcule le
+        timeframe seul et l'ajoute au cache.
+        """
+        snapshot = self._snapshot
+        if timeframe in snapshot:
+            timestamp, data = snapshot[timeframe]
+            if datetime.utcnow() - timestamp < SNAPSHOT_TTL:
+                CACHE_REQUESTS.labels("indicators", "hit").inc()
+                return data
+        CACHE_REQUESTS.labels("indicators", "miss").inc()
+        
+        data = await self.get_ohlcv_data(timeframe=timeframe)
+        if data.is_empty():
+            return data
+        
+        with (
+            tracer.span("indicators.add_all", timeframe=timeframe, rows=len(data)),
+            INDICATOR_SECONDS.labels(timeframe).time()
+        ):
+            data = TechnicalAnalysis.add_all_indicators(data)
+        self._versions = {**self._versions, timeframe: self.db.get_watermark()}
+        self._snapshot = {**self._snapshot, timeframe: (datetime.utcnow(), data)}
+        return data
+    
+    def get_data_version(self, timeframe: str) -> Optional[int]:
+        """Version des données servies pour un timeframe (None si inconnue)"""
+        return self._versions.get(timeframe)
+    
+    def get_volume_profile(self, timeframe: str) -> Optional[VolumeProfile]:
+        """Profil de volume précalculé de la période d'un timeframe (None si inconnu)"""
+        return self._profiles.get(timeframe)
+    
+    def working_set(self) -> Optional[WorkingSet]:
+        """État de travail du dernier précalcul, à sauvegarder (None avant le premier)"""
+        if self._minutes is None:
+            return None
+        frames = {
+            tf: data for tf, (_, data) in self._snapshot.items()
+            if self._versions.get(tf) == self._watermark
+        }
+        return WorkingSet(
+            database_id=self._database_id,
+            watermark=self._watermark,
+            saved_at=datetime.utcnow(),
+            minutes=self._minutes,
+            frames=frames,
+            profiles={tf: profile for tf, profile in self._profiles.items() if tf in frames},
+            summaries=summary_service.export(self._watermark)
+        )
+    
+    async def restore_state(self, store: StateStore) -> Dict[str, pl.DataFrame]:
+        """
+        Restaure l'état de travail sauvegardé au lieu d'un précalcul complet
+        
+        Un état sauvegardé depuis une autre base est rejeté. L'historique
+        sauvegardé est ensuite comparé à la base (empreinte exacte des
+        bougies). Avec un filigrane inchangé, timeframes, profils et résumés
+        sont réinstallés tels quels. Sinon, seules les minutes postérieures à
+        la sauvegarde (moins REPLAY_MARGIN) sont relues, puis les timeframes
+        sont réagrégés en mémoire. Un historique modifié (import, nettoyage)
+        invalide l'état.
+        
+        Returns:
+            Timeframes restaurés (vide : précalcul complet nécessaire)
+        """
+        started = time.perf_counter()
+        try:
+            with tracer.span("processor.restore_state") as span:
+                state = await asyncio.to_thread(store.load)
+                if state is None or state.minutes.is_empty() or not state.frames:
+                    STATE_RESTORES.labels("missing").inc()
+                    return {}
+                if state.database_id != self._database_id:
+                    STATE_RESTORES.labels("invalid").inc()
+                    logger.warning(
+                        f"État de travail ignoré : sauvegardé depuis la base {state.database_id}, "
+                        f"base ouverte {self._database_id} ({self.db.db_path})"
+                    )
+                    return {}
+                
+                watermark = self.db.get_watermark()
+                minutes = state.minutes
+                if watermark == state.watermark:
+                    start = minutes["timestamp"][0]
+                    end = minutes["timestamp"][-1] + timedelta(minutes=1)
+                    kept = minutes
+                else:
+                    now = datetime.utcnow()
+                    start = now - max(self._get_window_size(tf) for tf in TIMEFRAME_MINUTES)
+                    end = minutes["timestamp"][-1] - REPLAY_MARGIN
+                    kept = minutes.filter(
+                        (pl.col("timestamp") >= start) & (pl.col("timestamp") < end)
+                    )
+                if not self._same_history(kept, start, end):
+                    STATE_RESTORES.labels("invalid").inc()
+                    logger.warning("État de travail périmé (historique modifié en base) : précalcul complet")
+                    return {}
+                if watermark == state.watermark:
+                    result = "exact"
+                else:
+                    delta = await self.db.get_prices_async(start_time=end)
+                    minutes = pl.concat([kept, delta], how="vertical_relaxed")
+                    result = "replayed"
+                    span.set("replayed", len(delta))
+                span.set("result", result)
+                
+                with tracer.span("processor.extend_statistics"):
+                    self.rolling = RollingStatistics.from_frame(minutes)
+                    self.extremes = RangeExtremumIndex.from_frame(minutes)
+                
+                if result == "exact":
+                    self._install(
+                        {
+                            tf: (frame.select(OHLCV_COLUMNS), frame, state.profiles.get(tf))
+                            for tf, frame in state.frames.items()
+                        },
+                        watermark,
+                        minutes
+                    )
+                    summary_service.restore(watermark, state.summaries)
+                    frames = state.frames
+                else:
+                    frames = await self._build_timeframes(minutes, list(TIMEFRAME_MINUTES), now, watermark)
+            
+            STATE_RESTORES.labels(result).inc()
+            STATE_SECONDS.labels("restore").observe(time.perf_counter() - started)
+            logger.info(
+                f"État de travail restauré ({result}, sauvegardé le {state.saved_at:%Y-%m-%d %H:%M:%S}) "
+                f"en {time.perf_counter() - started:.2f}s"
+            )
+            return frames
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de la restauration de l'état de travail : {e}")
+            return {}
+    
+    def _same_history(self, minutes: pl.DataFrame, start: datetime, end: datetime) -> bool:
+        """
+        Vrai si les bougies sauvegardées de [start, end[ sont celles de la base
+
+        L'empreinte est exacte (sommes entières en cents et en satoshis) : la
+        moindre révision d'un prix ou d'un volume invalide l'état sauvegardé.
+        """
+        fingerprint = minutes.select(
+            pl.len(),
+            (pl.col("timestamp").dt.epoch("s") // 60).sum(),
+            *[
+                (pl.col(column).cast(pl.Float64) * unit).round().cast(pl.Int64).sum()
+                for column, unit in FINGERPRINT_UNITS.items()
+            ]
+        ).row(0)
+        return tuple(int(value or 0) for value in fingerprint) == self.db.get_fingerprint(start, end)
+    
+    async def _clean_old_trades(self):
+        """
+        Applique la rétention des transactions, une fois par jour
+        
+        Seules les partitions de transactions sont supprimées : les bougies
+        minute restent nécessaires aux fenêtres 1D et 1W.
+        """
+        today = datetime.utcnow().date()
+        if self._trades_cleaned == today:
+            return
+        try:
+            await self.db.clean_old_trades_async(datetime.utcnow() - timedelta(days=config.TRADE_RETENTION_DAYS))
+            self._trades_cleaned = today
+        except Exception as e:
+            logger.error(f"Erreur lors du nettoyage des transactions : {e}")
+    
     async def cleanup_old_data(self):
         """Nettoie les anciennes données"""
         try:
             cutoff_time = datetime.utcnow() - timedelta(days=30)
             await self.db.clean_old_data_async(cutoff_time)
+            await self.db.clean_old_trades_async(datetime.utcnow() - timedelta(days=config.TRADE_RETENTION_DAYS))
         except Exception as e:
             logger.error(f"Erreur lors du nettoyage des données : {e}")
     
     def __del__(self):
         """Nettoyage à la destruction"""
-        self._cache.clear()
\ No newline at end of file
+        self._cache.clear()
+        self._snapshot.clear()
+        self._executor.shutdown(wait=False)
\ No newline at end of file
@@ -0,0 +1,176 @@
+# src/data/snapshots.py
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import os
+import shutil
+import time
+import polars as pl
+import logging
+from ..analysis.profiles import VolumeProfile
+
+logger = logging.getLogger(__name__)
+
+# Fichier pointant vers le dernier instantané publié
+POINTER = "CURRENT"
+MANIFEST = "manifest.json"
+
+# Métriques du producteur (format texte Prometheus), relayées par les workers
+PRODUCER_METRICS = "producer.prom"
+
+
+class SnapshotPublisher:
+    """
+    Publication des timeframes précalculés pour les workers du dashboard
+
+    Chaque publication écrit un répertoire complet (un fichier Arrow IPC non
+    compressé par timeframe et un manifeste des versions), puis remplace
+    atomiquement le pointeur CURRENT : un lecteur voit toujours un jeu
+    cohérent, jamais un fichier en cours d'écriture.
+    """
+
+    def __init__(self, directory: Path, keep: int = 3):
+        self.directory = Path(directory)
+        self.keep = keep
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def publish(
+        self,
+        frames: Dict[str, pl.DataFrame],
+        versions: Dict[str, Optional[int]],
+        profiles: Optional[Dict[str, VolumeProfile]] = None
+    ) -> str:
+        """
+        Publie un jeu de timeframes
+
+        Args:
+            frames: DataFrames OHLCV + indicateurs par timeframe
+            versions: Version des données (filigrane DB) par timeframe
+            profiles: Profils de volume des périodes couvertes par timeframe
+
+        Returns:
+            Nom de l'instantané publié
+        """
+        name = f"{time.time_ns():020d}"
+        staging = self.directory / f".{name}.tmp"
+        staging.mkdir()
+        try:
+            for timeframe, df in frames.items():
+                # Non compressé : les lecteurs projettent le fichier sans copie
+                df.write_ipc(staging / f"{timeframe}.arrow", compression="uncompressed")
+            profiles = profiles or {}
+            for timeframe, profile in profiles.items():
+                profile.to_frame().write_ipc(staging / f"{timeframe}.profile.arrow", compression="uncompressed")
+            (staging / MANIFEST).write_text(json.dumps({
+                "published_at": datetime.utcnow().isoformat(),
+                "versions": versions,
+                "timeframes": list(frames),
+                # Pas des niveaux de prix de chaque profil publié
+                "profiles": {timeframe: profile.tick for timeframe, profile in profiles.items()}
+            }))
+            os.replace(staging, self.directory / name)
+
+            pointer = self.directory / f".{POINTER}.tmp"
+            pointer.write_text(name)
+            os.replace(pointer, self.directory / POINTER)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._cleanup(name)
+        logger.debug(f"Instantané publié : {name} ({len(frames)} timeframes)")
+        return name
+
+    def publish_metrics(self, text: str):
+        """Publie les métriques du producteur, qui n'expose pas de port HTTP"""
+        staging = self.directory / f".{PRODUCER_METRICS}.tmp"
+        staging.write_text(text)
+        os.replace(staging, self.directory / PRODUCER_METRICS)
+
+    def _cleanup(self, current: str):
+        """Supprime les instantanés les plus anciens (les lecteurs gardent leur projection)"""
+        snapshots = sorted(
+            path for path in self.directory.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        )
+        for path in snapshots[:-self.keep]:
+            if path.name == current:
+                continue
+            try:
+                shutil.rmtree(path)
+            except OSError as e:
+                logger.warning(f"Impossible de supprimer l'instantané {path.name} : {e}")
+
+
+class SnapshotReader:
+    """
+    Lecture des instantanés publiés par le processus producteur
+
+    Expose la même interface de lecture que DataProcessor pour le dashboard.
+    Les fichiers Arrow sont projetés en mémoire (mmap) : tous les workers
+    partagent les mêmes pages du cache système au lieu d'une copie chacun.
+    Le changement d'instantané remplace le dictionnaire des timeframes d'un
+    bloc.
+    """
+
+    # Les statistiques minute (sommes préfixes) restent dans le producteur
+    rolling = None
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.current: Optional[str] = None
+        self._frames: Dict[str, pl.DataFrame] = {}
+        self._versions: Dict[str, Optional[int]] = {}
+        self._profiles: Dict[str, VolumeProfile] = {}
+
+    def refresh(self) -> bool:
+        """
+        Charge le dernier instantané s'il a changé
+
+        Returns:
+            True si un nouvel instantané a été chargé
+        """
+        try:
+            name = (self.directory / POINTER).read_text().strip()
+        except FileNotFoundError:
+            return False
+        if name == self.current:
+            return False
+
+        snapshot = self.directory / name
+        manifest = json.loads((snapshot / MANIFEST).read_text())
+        frames = {
+            timeframe: pl.read_ipc(snapshot / f"{timeframe}.arrow", memory_map=True)
+            for timeframe in manifest["timeframes"]
+        }
+        profiles = {
+            timeframe: VolumeProfile.from_frame(pl.read_ipc(snapshot / f"{timeframe}.profile.arrow"), tick)
+            for timeframe, tick in manifest.get("profiles", {}).items()
+        }
+
+        self._frames = frames
+        self._versions = manifest["versions"]
+        self._profiles = profiles
+        self.current = name
+        logger.debug(f"Instantané chargé : {name}")
+        return True
+
+    async def get_indicator_data(self, timeframe: str = "1m") -> pl.DataFrame:
+        """Données OHLCV avec indicateurs du dernier instantané"""
+        return self._frames.get(timeframe, pl.DataFrame())
+
+    def get_data_version(self, timeframe: str) -> Optional[int]:
+        """Version des données servies pour un timeframe (None si inconnue)"""
+        return self._versions.get(timeframe)
+
+    def get_volume_profile(self, timeframe: str) -> Optional[VolumeProfile]:
+        """Profil de volume publié pour la période d'un timeframe (None si absent)"""
+        return self._profiles.get(timeframe)
+
+    def producer_metrics(self) -> str:
+        """Dernières métriques publiées par le producteur (vide si aucune)"""
+        try:
+            return (self.directory / PRODUCER_METRICS).read_text()
+        except FileNotFoundError:
+            return ""
@@ -0,0 +1,152 @@
+# src/data/state.py
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import os
+import shutil
+import time
+import polars as pl
+import logging
+from ..analysis.profiles import VolumeProfile
+from ..monitoring.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+STATE_SECONDS = metrics.histogram(
+    "state_snapshot_seconds",
+    "Durée des sauvegardes et restaurations de l'état de travail (save, restore)",
+    labels=("operation",)
+)
+STATE_RESTORES = metrics.counter(
+    "state_restores_total",
+    "Restaurations de l'état au démarrage (exact : filigrane inchangé, replayed : delta rejoué, invalid : historique modifié ou autre base, missing : aucun état)",
+    labels=("result",)
+)
+
+# Version du format des fichiers : un état d'un autre format est ignoré
+STATE_FORMAT = 2
+
+POINTER = "CURRENT"
+MANIFEST = "manifest.json"
+MINUTES = "minutes.arrow"
+
+
+@dataclass
+class WorkingSet:
+    """État de travail du processeur, restauré au redémarrage"""
+    database_id: str                    # identité de la base sauvegardée
+    watermark: Optional[int]            # filigrane de la base à la sauvegarde
+    saved_at: datetime
+    minutes: pl.DataFrame               # série minute de la dernière lecture
+    frames: Dict[str, pl.DataFrame]     # timeframes avec indicateurs
+    profiles: Dict[str, VolumeProfile]  # profils de volume par timeframe
+    summaries: Dict[str, dict]          # résumés de marché de cette version
+
+
+class StateStore:
+    """
+    Sauvegarde de l'état de travail dans DATA_DIR pour les redémarrages à chaud
+
+    Chaque sauvegarde écrit un répertoire complet (fichiers Arrow IPC non
+    compressés et manifeste JSON versionné), puis remplace atomiquement le
+    pointeur CURRENT, comme les instantanés des workers : un processus qui
+    démarre lit toujours un état complet.
+    """
+
+    def __init__(self, directory: Path, keep: int = 2):
+        self.directory = Path(directory)
+        self.keep = keep
+        self.last_saved: Optional[float] = None   # time.monotonic()
+
+    def due(self, interval: float) -> bool:
+        """Vrai si la dernière sauvegarde du processus date de plus de `interval` secondes"""
+        return self.last_saved is None or time.monotonic() - self.last_saved >= interval
+
+    def save(self, state: WorkingSet) -> str:
+        """
+        Écrit un état de travail
+
+        Returns:
+            Nom de l'état écrit
+        """
+        with STATE_SECONDS.labels("save").time():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = f"{time.time_ns():020d}"
+            staging = self.directory / f".{name}.tmp"
+            staging.mkdir()
+            try:
+                state.minutes.write_ipc(staging / MINUTES, compression="uncompressed")
+                for timeframe, df in state.frames.items():
+                    df.write_ipc(staging / f"{timeframe}.arrow", compression="uncompressed")
+                for timeframe, profile in state.profiles.items():
+                    profile.to_frame().write_ipc(staging / f"{timeframe}.profile.arrow", compression="uncompressed")
+                (staging / MANIFEST).write_text(json.dumps({
+                    "format": STATE_FORMAT,
+                    "database_id": state.database_id,
+                    "watermark": state.watermark,
+                    "saved_at": state.saved_at.isoformat(),
+                    "timeframes": list(state.frames),
+                    "profiles": {timeframe: profile.tick for timeframe, profile in state.profiles.items()},
+                    "summaries": state.summaries
+                }))
+                os.replace(staging, self.directory / name)
+
+                pointer = self.directory / f".{POINTER}.tmp"
+                pointer.write_text(name)
+                os.replace(pointer, self.directory / POINTER)
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+
+        self.last_saved = time.monotonic()
+        self._cleanup(name)
+        logger.info(f"État de travail sauvegardé : {name} ({len(state.minutes)} minutes, filigrane {state.watermark})")
+        return name
+
+    def load(self) -> Optional[WorkingSet]:
+        """Dernier état sauvegardé, None s'il n'existe pas, est illisible ou d'un autre format"""
+        try:
+            name = (self.directory / POINTER).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+        try:
+            path = self.directory / name
+            manifest = json.loads((path / MANIFEST).read_text())
+            if manifest.get("format") != STATE_FORMAT:
+                logger.warning(f"État de travail {name} ignoré : format {manifest.get('format')} au lieu de {STATE_FORMAT}")
+                return None
+            return WorkingSet(
+                database_id=manifest["database_id"],
+                watermark=manifest["watermark"],
+                saved_at=datetime.fromisoformat(manifest["saved_at"]),
+                minutes=pl.read_ipc(path / MINUTES),
+                frames={
+                    timeframe: pl.read_ipc(path / f"{timeframe}.arrow")
+                    for timeframe in manifest["timeframes"]
+                },
+                profiles={
+                    timeframe: VolumeProfile.from_frame(pl.read_ipc(path / f"{timeframe}.profile.arrow"), tick)
+                    for timeframe, tick in manifest["profiles"].items()
+                },
+                summaries=manifest["summaries"]
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture de l'état de travail {name} : {e}")
+            return None
+
+    def _cleanup(self, current: str):
+        """Supprime les états les plus anciens"""
+        states = sorted(
+            path for path in self.directory.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        )
+        for path in states[:-self.keep]:
+            if path.name == current:
+                continue
+            try:
+                shutil.rmtree(path)
+            except OSError as e:
+                logger.warning(f"Impossible de supprimer l'état {path.name} : {e}")
@@ -0,0 +1,461 @@
+# src/database/bulk_import.py
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+import argparse
+import re
+import time
+import logging
+from ..config import setup_logging
+from ..monitoring.tracing import tracer
+from .operations import QUERY_ROWS, QUERY_SECONDS, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Extensions reconnues et lecteur DuckDB correspondant (la compression est détectée par DuckDB)
+FORMATS = {
+    ".csv": "csv",
+    ".csv.gz": "csv",
+    ".txt": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet"
+}
+
+# Noms de colonnes usuels des dumps publics (normalisés : minuscules, séparateurs en "_"),
+# par ordre de préférence
+BAR_ALIASES = {
+    "timestamp": ["timestamp", "unix", "unix_timestamp", "open_time", "time", "datetime", "date", "ts", "t"],
+    "open": ["open", "o", "open_price"],
+    "high": ["high", "h", "high_price"],
+    "low": ["low", "l", "low_price"],
+    "close": ["close", "c", "close_price"],
+    "volume": ["volume", "volume_btc", "base_volume", "vol", "v"],
+    "trades": ["trades", "tradecount", "trade_count", "number_of_trades", "count", "n"]
+}
+TRADE_ALIASES = {
+    "timestamp": BAR_ALIASES["timestamp"],
+    "price": ["price", "p", "rate"],
+    "size": ["size", "amount", "qty", "quantity", "volume"]
+}
+
+# Types DuckDB d'un timestamp epoch numérique
+NUMERIC_TYPES = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UBIGINT", "UINTEGER", "DOUBLE", "FLOAT", "DECIMAL")
+
+# Décalage explicite en fin d'horodatage texte (Z, +02, +0200, +02:00), après l'heure
+OFFSET_PATTERN = r"\d{2}:\d{2}(:\d{2}(\.\d+)?)?\s*(Z|[+-]\d{2}(:?\d{2})?)$"
+
+# Volume de fichiers lu par requête : plusieurs fichiers par lecture (parallélisme
+# de DuckDB entre fichiers), une étape de progression par lot
+BATCH_BYTES = 256 * 2**20
+
+
+@dataclass
+class ImportResult:
+    """Bilan d'un import"""
+    files: int
+    rows_valid: int         # Bougies valides et distinctes lues dans les fichiers
+    rows_inserted: int      # Bougies écrites (nouvelles, ou remplacées avec on_conflict="replace")
+    seconds: float
+    first: Optional[datetime] = None
+    last: Optional[datetime] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_valid / self.seconds if self.seconds else 0.0
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _quote(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def discover_files(paths: Iterable[Path]) -> List[Path]:
+    """Fichiers importables (récursivement pour les répertoires), triés par nom"""
+    files = []
+    for path in map(Path, paths):
+        if not path.exists():
+            raise ValueError(f"Fichier introuvable : {path}")
+        candidates = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for candidate in candidates:
+            if _format(candidate) is not None:
+                files.append(candidate)
+            elif not path.is_dir():
+                raise ValueError(f"Format non reconnu : {candidate}")
+    return files
+
+
+def _format(path: Path) -> Optional[str]:
+    name = path.name.lower()
+    return next((fmt for ext, fmt in FORMATS.items() if name.endswith(ext)), None)
+
+
+class BulkImporter:
+    """
+    Import massif de bougies minute (ou de transactions) dans bitcoin_prices
+
+    Les fichiers sont lus par les lecteurs parallèles natifs de DuckDB
+    (read_csv, read_parquet) et insérés en SQL, sans passer par des objets
+    BitcoinPrice : le débit est celui de DuckDB (plusieurs millions de
+    lignes par minute). Les fichiers sont regroupés par schéma, puis pour
+    chaque lot :
+    - les colonnes sont associées aux colonnes de bitcoin_prices (alias
+      usuels ou correspondance explicite), schéma par schéma ;
+    - les timestamps sont ramenés en UTC naïf (epoch s/ms/µs/ns, texte avec
+      ou sans décalage, TIMESTAMPTZ, ou heure locale du fuseau `timezone`)
+      et tronqués à la minute ;
+    - les doublons du lot sont écartés, puis ceux déjà en base ignorés ou
+      remplacés selon `on_conflict`.
+
+    Des transactions (timestamp, prix, quantité) sont agrégées en bougies
+    minute ; leur import se fait en une seule requête pour qu'aucune minute
+    ne soit coupée entre deux lots.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        columns: Optional[Dict[str, str]] = None,
+        timezone: str = "UTC",
+        on_conflict: str = "ignore",
+        kind: str = "auto",
+        skip: int = 0
+    ):
+        """
+        Args:
+            db: Base de destination
+            columns: Correspondance explicite {colonne cible: colonne source}
+            timezone: Fuseau des timestamps sans fuseau ni décalage
+            on_conflict: "ignore" (conserver les bougies existantes) ou "replace"
+            kind: "bars", "trades" ou "auto" (d'après les colonnes)
+            skip: Lignes à sauter en tête des CSV (avant l'en-tête)
+        """
+        if on_conflict not in ("ignore", "replace"):
+            raise ValueError(f"Politique de conflit inconnue : {on_conflict}")
+        if kind not in ("auto", "bars", "trades"):
+            raise ValueError(f"Type de données inconnu : {kind}")
+        self.db = db
+        self.columns = columns or {}
+        self.timezone = timezone
+        self.on_conflict = on_conflict
+        self.kind = kind
+        self.skip = skip
+
+    def _source(self, files: List[Path], text: Optional[str] = None) -> str:
+        """Lecture DuckDB des fichiers ; `text` : colonne CSV lue en texte brut"""
+        paths = "[" + ", ".join(_quote(f) for f in files) + "]"
+        if _format(files[0]) == "parquet":
+            return f"read_parquet({paths}, union_by_name = true)"
+        options = f", skip = {self.skip}" if self.skip else ""
+        if text is not None:
+            options += f", types = {{{_quote(text)}: 'VARCHAR'}}"
+        return f"read_csv({paths}, union_by_name = true{options})"
+
+    def _resolve(self, available: Dict[str, str], aliases: Dict[str, List[str]]) -> Dict[str, str]:
+        """Colonne source de chaque colonne cible (explicite, sinon premier alias présent)"""
+        by_normalized = {_normalize(name): name for name in available}
+        resolved = {}
+        for target, candidates in aliases.items():
+            if target in self.columns:
+                if self.columns[target] not in available:
+                    raise ValueError(f"Colonne absente des fichiers : {self.columns[target]}")
+                resolved[target] = self.columns[target]
+                continue
+            match = next((by_normalized[a] for a in candidates if a in by_normalized), None)
+            if match is not None:
+                resolved[target] = match
+        return resolved
+
+    def _timestamp(self, column: str, column_type: str) -> str:
+        """Expression SQL du timestamp UTC naïf d'une colonne source"""
+        col = _identifier(column)
+        if column_type.startswith(NUMERIC_TYPES):
+            # Unité déduite de l'ordre de grandeur (secondes jusqu'à l'an 5000)
+            micros = (
+                f"CASE WHEN abs({col}) >= 1e17 THEN {col} / 1000 "
+                f"WHEN abs({col}) >= 1e14 THEN {col} "
+                f"WHEN abs({col}) >= 1e11 THEN {col} * 1000 "
+                f"ELSE {col} * 1000000 END"
+            )
+            return f"make_timestamp(CAST({micros} AS BIGINT))"
+        if column_type == "TIMESTAMP WITH TIME ZONE":
+            return f"timezone('UTC', {col})"
+        # Un décalage explicite est appliqué par le cast ; sinon fuseau `timezone`
+        naive = f"CAST({col} AS TIMESTAMP)"
+        if self.timezone.upper() == "UTC":
+            return naive
+        local = f"timezone('UTC', timezone({_quote(self.timezone)}, {naive}))"
+        if column_type != "VARCHAR":
+            return local
+        # Texte : le fuseau ne s'applique qu'aux valeurs sans décalage
+        return (
+            f"CASE WHEN regexp_matches(trim({col}), {_quote(OFFSET_PATTERN)}) "
+            f"THEN timezone('UTC', CAST({col} AS TIMESTAMPTZ)) ELSE {local} END"
+        )
+
+    def _describe(self, files: List[Path]) -> Dict[str, str]:
+        """Colonnes des fichiers et leur type DuckDB"""
+        return dict(
+            (name, column_type)
+            for name, column_type, *_ in self.db.conn.execute(f"DESCRIBE SELECT * FROM {self._source(files)}").fetchall()
+        )
+
+    def _mapping(self, available: Dict[str, str]) -> tuple[Dict[str, str], str]:
+        """Correspondance des colonnes d'un schéma et type détecté"""
+        bars = self._resolve(available, BAR_ALIASES)
+        trades = self._resolve(available, TRADE_ALIASES)
+        kind = self.kind
+        if kind == "auto":
+            kind = "bars" if {"timestamp", "open", "high", "low", "close"} <= bars.keys() else "trades"
+        required = {"timestamp", "open", "high", "low", "close"} if kind == "bars" else {"timestamp", "price", "size"}
+        mapping = bars if kind == "bars" else trades
+        missing = required - mapping.keys()
+        if missing:
+            raise ValueError(
+                f"Colonnes introuvables ({kind}) : {sorted(missing)} ; colonnes disponibles : {list(available)}"
+            )
+        return mapping, kind
+
+    def _select(self, groups: List[List[Path]]) -> tuple[str, str]:
+        """
+        Requête des bougies minute de groupes de fichiers et type détecté
+
+        Chaque groupe partage un même schéma : la correspondance des colonnes
+        est résolue par groupe, les groupes étant réunis après normalisation
+        (un alias présent dans un seul fichier ne masque pas la colonne d'un autre).
+        """
+        parts, kinds = [], set()
+        for files in groups:
+            available = self._describe(files)
+            mapping, kind = self._mapping(available)
+            kinds.add(kind)
+            column_type = available[mapping["timestamp"]]
+            text = None
+            if (
+                self.timezone.upper() != "UTC" and _format(files[0]) == "csv"
+                and not column_type.startswith(NUMERIC_TYPES) and column_type != "TIMESTAMP WITH TIME ZONE"
+            ):
+                # Le détecteur CSV convertit les décalages en UTC avant toute
+                # expression : la colonne est relue en texte pour les distinguer
+                text, column_type = mapping["timestamp"], "VARCHAR"
+            ts = self._timestamp(mapping["timestamp"], column_type)
+            source = self._source(files, text)
+            if kind == "bars":
+                value = lambda target: f"CAST({_identifier(mapping[target])} AS DOUBLE)" if target in mapping else "NULL"
+                trades_count = f"CAST({_identifier(mapping['trades'])} AS INTEGER)" if "trades" in mapping else "NULL"
+                parts.append(f"""
+                    SELECT
+                        date_trunc('minute', {ts}) AS timestamp,
+                        {value('open')} AS open,
+                        {value('high')} AS high,
+                        {value('low')} AS low,
+                        {value('close')} AS close,
+                        coalesce({value('volume')}, 0) AS volume,
+                        {trades_count} AS trades
+                    FROM {source}
+                """)
+            else:
+                parts.append(f"""
+                    SELECT
+                        {ts} AS ts,
+                        CAST({_identifier(mapping['price'])} AS DOUBLE) AS price,
+                        CAST({_identifier(mapping['size'])} AS DOUBLE) AS size
+                    FROM {source}
+                """)
+        if len(kinds) > 1:
+            raise ValueError("Fichiers de bougies et de transactions mélangés : préciser --kind")
+
+        kind = kinds.pop()
+        rows = " UNION ALL ".join(parts)
+        if kind == "bars":
+            query = f"""
+                SELECT DISTINCT ON (timestamp) *
+                FROM ({rows})
+                WHERE timestamp IS NOT NULL AND close > 0 AND high >= low
+            """
+        else:
+            query = f"""
+                SELECT
+                    date_trunc('minute', ts) AS timestamp,
+                    arg_min(price, ts) AS open,
+                    max(price) AS high,
+                    min(price) AS low,
+                    arg_max(price, ts) AS close,
+                    sum(size) AS volume,
+                    CAST(count(*) AS INTEGER) AS trades
+                FROM ({rows})
+                WHERE ts IS NOT NULL AND price > 0
+                GROUP BY 1
+            """
+        return query, kind
+
+    def _groups(self, files: List[Path]) -> List[List[Path]]:
+        """
+        Fichiers regroupés par format et schéma (noms et types des colonnes)
+
+        Une lecture union_by_name de fichiers de schémas différents associerait
+        une seule colonne source à chaque colonne cible pour tous les fichiers.
+        """
+        groups: Dict[tuple, List[Path]] = {}
+        for path in files:
+            key = (_format(path), tuple(self._describe([path]).items()))
+            groups.setdefault(key, []).append(path)
+        return list(groups.values())
+
+    def _batches(self, groups: List[List[Path]]) -> List[List[List[Path]]]:
+        """Lots d'un seul groupe de fichiers de même schéma, d'environ BATCH_BYTES chacun"""
+        batches = []
+        for group in groups:
+            current, size = [], 0
+            for path in group:
+                if current and size >= BATCH_BYTES:
+                    batches.append([current])
+                    current, size = [], 0
+                current.append(path)
+                size += path.stat().st_size
+            if current:
+                batches.append([current])
+        return batches
+
+    def _import_batch(self, groups: List[List[Path]]) -> tuple[int, int, Optional[datetime], Optional[datetime]]:
+        """Charge un lot de groupes de fichiers : (bougies valides, bougies écrites, première, dernière)"""
+        query, kind = self._select(groups)
+        conn = self.db.conn
+        with (
+            tracer.span("db.bulk_import", files=sum(map(len, groups)), kind=kind) as span,
+            QUERY_SECONDS.labels("bulk_import").time()
+        ):
+            conn.execute(f"CREATE OR REPLACE TEMP TABLE import_batch AS {query}")
+            valid, first, last = conn.execute(
+                "SELECT count(*), min(timestamp), max(timestamp) FROM import_batch"
+            ).fetchone()
+
+            before = conn.execute("SELECT count(*) FROM bitcoin_prices").fetchone()[0]
+            if self.on_conflict == "replace":
+                conn.execute("INSERT OR REPLACE INTO bitcoin_prices SELECT * FROM import_batch")
+                inserted = valid
+            else:
+                conn.execute("INSERT INTO bitcoin_prices SELECT * FROM import_batch ON CONFLICT DO NOTHING")
+                inserted = conn.execute("SELECT count(*) FROM bitcoin_prices").fetchone()[0] - before
+            conn.execute("DROP TABLE import_batch")
+            span.set("rows", inserted)
+        QUERY_ROWS.labels("bulk_import").observe(inserted)
+        return valid, inserted, first, last
+
+    def run(
+        self,
+        paths: Iterable[Path],
+        refresh_sketches: bool = True,
+        on_progress: Optional[Callable[[int, int, int], None]] = None
+    ) -> ImportResult:
+        """
+        Importe des fichiers ou des répertoires
+
+        Args:
+            paths: Fichiers CSV, CSV.gz, Parquet ou répertoires
+            refresh_sketches: Reconstruire les sketches de quantiles et profils de volume des jours importés
+            on_progress: Rappel (fichiers traités, fichiers au total, bougies écrites)
+
+        Returns:
+            Bilan de l'import
+        """
+        files = discover_files(paths)
+        if not files:
+            raise ValueError("Aucun fichier à importer")
+
+        # Transactions (précisées ou détectées) : une seule requête, les
+        # minutes ne doivent pas être coupées entre deux lots
+        groups = self._groups(files)
+        kinds = {self._mapping(self._describe(group))[1] for group in groups}
+        batches = [groups] if "trades" in kinds else self._batches(groups)
+        begin = time.perf_counter()
+        result = ImportResult(files=len(files), rows_valid=0, rows_inserted=0, seconds=0.0)
+        done = 0
+
+        try:
+            for batch in batches:
+                valid, inserted, first, last = self._import_batch(batch)
+                result.rows_valid += valid
+                result.rows_inserted += inserted
+                if first is not None:
+                    result.first = min(result.first or first, first)
+                    result.last = max(result.last or last, last)
+                done += sum(map(len, batch))
+                elapsed = time.perf_counter() - begin
+                logger.info(
+                    f"Import : {done}/{len(files)} fichiers, {result.rows_valid:,} bougies lues, "
+                    f"{result.rows_inserted:,} écrites ({result.rows_valid / elapsed:,.0f}/s)"
+                )
+                if on_progress:
+                    on_progress(done, len(files), result.rows_inserted)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'import de {batch[0][0]} : {e}")
+            raise
+        finally:
+            if result.rows_inserted:
+                self.db._bump_watermark()
+
+        result.seconds = time.perf_counter() - begin
+        if refresh_sketches and result.rows_inserted:
+            with QUERY_SECONDS.labels("refresh_sketches").time():
+                self.db.sketches.rebuild(start=result.first.date(), end=result.last.date())
+            with QUERY_SECONDS.labels("refresh_profiles").time():
+                self.db.profiles.rebuild(start=result.first.date(), end=result.last.date())
+
+        logger.info(
+            f"Import terminé : {result.rows_inserted:,} bougies écrites sur {result.rows_valid:,} "
+            f"en {result.seconds:.1f}s ({result.rows_per_second:,.0f}/s)"
+        )
+        return result
+
+
+def _parse_columns(values: List[str]) -> Dict[str, str]:
+    columns = {}
+    for value in values:
+        target, sep, source = value.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Correspondance attendue sous la forme cible=source : {value}")
+        columns[target.strip()] = source.strip()
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import massif d'historiques OHLCV ou de transactions")
+    parser.add_argument("paths", nargs="+", type=Path, help="Fichiers CSV, CSV.gz, Parquet ou répertoires")
+    parser.add_argument("--db", type=Path, help="Base DuckDB (par défaut celle de la configuration)")
+    parser.add_argument("--map", nargs="*", default=[], metavar="CIBLE=SOURCE", help="Correspondance de colonnes, ex. timestamp=Unix")
+    parser.add_argument("--timezone", default="UTC", help="Fuseau des timestamps sans fuseau")
+    parser.add_argument("--on-conflict", choices=["ignore", "replace"], default="ignore", help="Bougies déjà en base")
+    parser.add_argument("--kind", choices=["auto", "bars", "trades"], default="auto", help="Bougies ou transactions")
+    parser.add_argument("--skip", type=int, default=0, help="Lignes à sauter en tête des CSV")
+    parser.add_argument("--no-sketches", action="store_true", help="Ne pas reconstruire les sketches de quantiles ni les profils de volume")
+    args = parser.parse_args()
+    setup_logging()
+
+    try:
+        importer = BulkImporter(
+            DatabaseManager(args.db),
+            columns=_parse_columns(args.map),
+            timezone=args.timezone,
+            on_conflict=args.on_conflict,
+            kind=args.kind,
+            skip=args.skip
+        )
+        result = importer.run(args.paths, refresh_sketches=not args.no_sketches)
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+    print(
+        f"{result.files} fichiers, {result.rows_inserted:,} bougies écrites sur {result.rows_valid:,} "
+        f"({result.first} -> {result.last}) en {result.seconds:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,61 @@
 # src/database/operations.py
 import duckdb
 import polars as pl
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import List, Optional
 import logging
 from ..config import config
+from ..monitoring.metrics import SIZE_BUCKETS, metrics
+from ..monitoring.tracing import tracer
 from .models import BitcoinPrice
+from .profiles import VolumeProfileStore
+from .sketches import SketchStore
 
 logger = logging.getLogger(__name__)
 
+QUERY_SECONDS = metrics.histogram(
+    "db_query_seconds",
+    "Durée des opérations DuckDB",
+    labels=("operation",)
+)
+QUERY_ROWS = metrics.histogram(
+    "db_query_rows",
+    "Lignes lues ou écrites par opération DuckDB",
+    buckets=SIZE_BUCKETS,
+    labels=("operation",)
+)
+
+# Encodage entier des transactions : prix en cents, quantités en satoshis
+PRICE_SCALE = 100
+SIZE_SCALE = 100_000_000
+
+# Empreinte des bougies (validation d'un état sauvegardé) : sommes entières
+# exactes, en cents pour les prix et en satoshis pour les volumes
+FINGERPRINT_UNITS = {
+    "open": PRICE_SCALE,
+    "high": PRICE_SCALE,
+    "low": PRICE_SCALE,
+    "close": PRICE_SCALE,
+    "volume": SIZE_SCALE
+}
+
+# Microsecondes par jour (horodatage des transactions relatif au jour)
+DAY_MICROSECONDS = 86_400_000_000
+
 class DatabaseManager:
     """Gestionnaire des opérations de base de données"""
     
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = str(db_path or config.DATABASE_PATH)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         # On maintient une connexion persistante
         self.conn = duckdb.connect(self.db_path)
         self._init_database()
+        # Sketches de quantiles journaliers, mis à jour à chaque insertion
+        self.sketches = SketchStore(self.conn)
+        # Profils de volume journaliers (niveaux de prix), mis à jour de même
+        self.profiles = VolumeProfileStore(self.conn)
         logger.info(f"Base de données connectée: {self.db_path}")
     
     def _init_database(self):
@@ -35,12 +74,79 @@ class DatabaseManager:
                 
                 CREATE INDEX IF NOT EXISTS idx_timestamp 
                 ON bitcoin_prices(timestamp);
+                
+                CREATE TABLE IF NOT EXISTS data_watermark (
+                    id INTEGER PRIMARY KEY,
+                    version BIGINT,
+                    updated_at TIMESTAMP
+                );
+                
+                INSERT OR IGNORE INTO data_watermark (id, version, updated_at) VALUES (1, 0, current_timestamp);
+                
+                -- Identité de la base, tirée une fois : le filigrane n'est
+                -- qu'un compteur propre à chaque fichier
+                ALTER TABLE data_watermark ADD COLUMN IF NOT EXISTS database_id VARCHAR;
+                UPDATE data_watermark SET database_id = uuid()::VARCHAR
+                WHERE id = 1 AND database_id IS NULL;
+                
+                -- Transactions, partitionnées par jour et insérées dans l'ordre :
+                -- les colonnes entières relatives au jour sont compressées par
+                -- DuckDB en deltas bit-packés (quelques octets par transaction),
+                -- et les zone maps des row groups éliminent les jours non lus
+                CREATE TABLE IF NOT EXISTS trades (
+                    day DATE NOT NULL,           -- partition (jour UTC)
+                    us BIGINT NOT NULL,          -- microsecondes depuis le début du jour
+                    trade_id BIGINT NOT NULL,
+                    price INTEGER NOT NULL,      -- cents
+                    size BIGINT NOT NULL,        -- satoshis
+                    buy BOOLEAN                  -- achat à l'initiative du preneur
+                );
+                
+                -- Catalogue des partitions : volume et bornes des identifiants par jour
+                CREATE TABLE IF NOT EXISTS trade_days (
+                    day DATE PRIMARY KEY,
+                    rows BIGINT,
+                    first_trade_id BIGINT,
+                    last_trade_id BIGINT
+                );
+                
+                -- Trous de la collecte : identifiants manquants dans
+                -- ]low_id, cursor_id[, rattrapés page par page depuis cursor_id
+                CREATE TABLE IF NOT EXISTS trade_gaps (
+                    low_id BIGINT PRIMARY KEY,
+                    cursor_id BIGINT NOT NULL
+                );
             """)
             logger.debug("Structure de la base de données vérifiée")
         except Exception as e:
             logger.error(f"Erreur lors de l'initialisation de la base de données: {e}")
             raise
     
+    def get_watermark(self) -> int:
+        """
+        Retourne la version courante des données
+        
+        Le filigrane est incrémenté à chaque écriture dans bitcoin_prices,
+        y compris la révision d'une bougie existante.
+        """
+        return self.conn.execute(
+            "SELECT version FROM data_watermark WHERE id = 1"
+        ).fetchone()[0]
+    
+    def get_database_id(self) -> str:
+        """Identifiant aléatoire de la base, fixé à sa création"""
+        return self.conn.execute(
+            "SELECT database_id FROM data_watermark WHERE id = 1"
+        ).fetchone()[0]
+    
+    def _bump_watermark(self):
+        """Incrémente la version des données après une écriture"""
+        self.conn.execute("""
+            UPDATE data_watermark
+            SET version = version + 1, updated_at = current_timestamp
+            WHERE id = 1
+        """)
+    
     async def get_prices_async(
         self,
         start_time: Optional[datetime] = None,
@@ -69,9 +175,15 @@ class DatabaseManager:
                 query.append(f"LIMIT {limit}")
             
             # Exécution directe de la requête
-            result = pl.from_arrow(
-                self.conn.execute(" ".join(query), params).arrow()
-            )
+            with (
+                tracer.span("db.select_prices") as span,
+                QUERY_SECONDS.labels("select_prices").time()
+            ):
+                result = pl.from_arrow(
+                    self.conn.execute(" ".join(query), params).arrow()
+                )
+                span.set("rows", len(result))
+            QUERY_ROWS.labels("select_prices").observe(len(result))
             
             if result.is_empty():
                 logger.warning("Aucune donnée en base")
@@ -84,6 +196,26 @@ class DatabaseManager:
             logger.error(f"Erreur lors de la récupération des données : {e}")
             raise
     
+    def get_fingerprint(self, start_time: datetime, end_time: datetime) -> tuple[int, ...]:
+        """
+        Empreinte exacte des bougies de [start_time, end_time[ (voir FINGERPRINT_UNITS)
+
+        Returns:
+            (nombre de bougies, somme des minutes epoch, sommes entières de
+            chaque colonne en plus petite unité)
+        """
+        sums = ", ".join(
+            f"sum(CAST({column} * {unit} AS BIGINT))"
+            for column, unit in FINGERPRINT_UNITS.items()
+        )
+        with QUERY_SECONDS.labels("fingerprint").time():
+            row = self.conn.execute(f"""
+                SELECT count(*), sum(epoch(timestamp)::BIGINT // 60), {sums}
+                FROM bitcoin_prices
+                WHERE timestamp >= ? AND timestamp < ?
+            """, [start_time, end_time]).fetchone()
+        return tuple(int(value or 0) for value in row)
+    
     async def insert_prices_async(self, prices: List[BitcoinPrice]):
         """Insère ou met à jour les données de prix"""
         if not prices:
@@ -105,10 +237,34 @@ class DatabaseManager:
             ])
             
             # Insertion avec UPSERT
-            self.conn.execute("""
-                INSERT OR REPLACE INTO bitcoin_prices 
-                SELECT * FROM df
-            """)
+            with (
+                tracer.span("db.insert_prices", rows=len(df)),
+                QUERY_SECONDS.labels("insert_prices").time()
+            ):
+                self.conn.execute("""
+                    INSERT OR REPLACE INTO bitcoin_prices 
+                    SELECT * FROM df
+                """)
+                self._bump_watermark()
+            QUERY_ROWS.labels("insert_prices").observe(len(df))
+            
+            try:
+                with (
+                    tracer.span("db.refresh_sketches"),
+                    QUERY_SECONDS.labels("refresh_sketches").time()
+                ):
+                    self.sketches.refresh_days(df["timestamp"].dt.date().unique().to_list())
+            except Exception as e:
+                logger.warning(f"Sketches de quantiles non mis à jour : {e}")
+            
+            try:
+                with (
+                    tracer.span("db.refresh_profiles"),
+                    QUERY_SECONDS.labels("refresh_profiles").time()
+                ):
+                    self.profiles.refresh_days(df["timestamp"].dt.date().unique().to_list())
+            except Exception as e:
+                logger.warning(f"Profils de volume non mis à jour : {e}")
             
             logger.info(f"Données insérées : {len(prices)} points")
             
@@ -119,18 +275,251 @@ class DatabaseManager:
     async def clean_old_data_async(self, older_than: datetime):
         """Supprime les données plus anciennes qu'une date donnée"""
         try:
-            deleted = self.conn.execute("""
-                DELETE FROM bitcoin_prices 
-                WHERE timestamp < ?;
-            """, [older_than]).fetchone()[0]
+            with (
+                tracer.span("db.delete_prices"),
+                QUERY_SECONDS.labels("delete_prices").time()
+            ):
+                deleted = self.conn.execute("""
+                    DELETE FROM bitcoin_prices 
+                    WHERE timestamp < ?;
+                """, [older_than]).fetchone()[0]
+            QUERY_ROWS.labels("delete_prices").observe(deleted)
             
             if deleted > 0:
+                self._bump_watermark()
                 logger.info(f"Données nettoyées : {deleted} points supprimés")
                 
         except Exception as e:
             logger.error(f"Erreur lors du nettoyage des données : {e}")
             raise
     
+    def get_last_trade_id(self) -> Optional[int]:
+        """Identifiant de la dernière transaction stockée (None si aucune)"""
+        return self.conn.execute("SELECT max(last_trade_id) FROM trade_days").fetchone()[0]
+    
+    def get_trade_gaps(self) -> List[tuple[int, int]]:
+        """Trous ouverts de la collecte (low_id, cursor_id), du plus récent au plus ancien"""
+        return self.conn.execute(
+            "SELECT low_id, cursor_id FROM trade_gaps ORDER BY low_id DESC"
+        ).fetchall()
+    
+    def save_trade_gap(self, low_id: int, cursor_id: int):
+        """Ouvre ou avance un trou : il reste à collecter ]low_id, cursor_id["""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO trade_gaps VALUES (?, ?)", [low_id, cursor_id]
+        )
+    
+    def close_trade_gap(self, low_id: int):
+        """Ferme un trou entièrement rattrapé"""
+        self.conn.execute("DELETE FROM trade_gaps WHERE low_id = ?", [low_id])
+    
+    async def insert_trades_async(self, trades: pl.DataFrame, after_id: Optional[int] = None) -> int:
+        """
+        Ajoute des transactions (timestamp, trade_id, price, size, side)
+        
+        Les transactions déjà stockées (identifiant inférieur ou égal au
+        dernier connu, ou à `after_id` pour le rattrapage d'un trou) sont
+        ignorées : l'API renvoie des pages qui se chevauchent. Les lignes
+        sont encodées (jour, microsecondes, cents, satoshis) puis ajoutées
+        dans l'ordre des identifiants.
+        
+        Returns:
+            Nombre de transactions ajoutées
+        """
+        if trades.is_empty():
+            return 0
+        
+        try:
+            last_id = self.get_last_trade_id() if after_id is None else after_id
+            # Tri puis suppression des doublons voisins (pages qui se chevauchent),
+            # bien moins coûteux qu'un unique() par hachage
+            epoch = pl.col("timestamp").dt.cast_time_unit("us").cast(pl.Int64)
+            batch = (
+                trades
+                .filter(pl.col("trade_id") > (last_id if last_id is not None else -1))
+                .sort("trade_id")
+                .filter(pl.col("trade_id").diff().fill_null(1) != 0)
+                .select(
+                    (epoch // DAY_MICROSECONDS).cast(pl.Int32).cast(pl.Date).alias("day"),
+                    (epoch % DAY_MICROSECONDS).alias("us"),
+                    pl.col("trade_id").cast(pl.Int64),
+                    (pl.col("price") * PRICE_SCALE).round().cast(pl.Int32).alias("price"),
+                    (pl.col("size") * SIZE_SCALE).round().cast(pl.Int64).alias("size"),
+                    (pl.col("side") == "buy").alias("buy")
+                )
+            )
+            if batch.is_empty():
+                return 0
+            
+            with (
+                tracer.span("db.insert_trades", rows=len(batch)),
+                QUERY_SECONDS.labels("insert_trades").time()
+            ):
+                self.conn.execute("BEGIN TRANSACTION")
+                try:
+                    self.conn.execute("INSERT INTO trades SELECT * FROM batch")
+                    self.conn.execute("""
+                        INSERT INTO trade_days
+                        SELECT day, count(*), min(trade_id), max(trade_id) FROM batch GROUP BY day
+                        ON CONFLICT (day) DO UPDATE SET
+                            rows = trade_days.rows + excluded.rows,
+                            first_trade_id = least(trade_days.first_trade_id, excluded.first_trade_id),
+                            last_trade_id = greatest(trade_days.last_trade_id, excluded.last_trade_id)
+                    """)
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+            QUERY_ROWS.labels("insert_trades").observe(len(batch))
+            
+            logger.info(f"Transactions insérées : {len(batch)}")
+            return len(batch)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de l'insertion des transactions : {e}")
+            raise
+    
+    @staticmethod
+    def _trade_source(start_time: Optional[datetime], end_time: Optional[datetime]) -> tuple[str, list]:
+        """
+        Sous-requête des transactions de [start_time, end_time[
+        
+        La plage est découpée par partition (premier jour partiel, jours
+        complets, dernier jour partiel) : chaque morceau est un filtre
+        simple sur (day, us) que DuckDB applique aux zone maps des row
+        groups, sans calculer d'horodatage pour chaque ligne.
+        """
+        def micros(value: datetime) -> int:
+            return (value - datetime.combine(value.date(), datetime.min.time())) // timedelta(microseconds=1)
+        
+        pieces = []
+        if start_time and end_time and start_time.date() == end_time.date():
+            pieces.append(("day = ? AND us >= ? AND us < ?", [start_time.date(), micros(start_time), micros(end_time)]))
+        else:
+            middle, params = [], []
+            if start_time:
+                pieces.append(("day = ? AND us >= ?", [start_time.date(), micros(start_time)]))
+                middle.append("day > ?")
+                params.append(start_time.date())
+            if end_time:
+                middle.append("day < ?")
+                params.append(end_time.date())
+            pieces.append((" AND ".join(middle) or "TRUE", params))
+            if end_time:
+                pieces.append(("day = ? AND us < ?", [end_time.date(), micros(end_time)]))
+        
+        sql = " UNION ALL ".join(f"SELECT * FROM trades WHERE {where}" for where, _ in pieces)
+        return f"({sql})", [param for _, params in pieces for param in params]
+    
+    async def get_trades_async(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> pl.DataFrame:
+        """Transactions décodées de [start_time, end_time[, dans l'ordre des identifiants"""
+        try:
+            source, params = self._trade_source(start_time, end_time)
+            query = f"""
+                SELECT
+                    day::TIMESTAMP + to_microseconds(us) AS timestamp,
+                    trade_id,
+                    price / {PRICE_SCALE} AS price,
+                    size / {SIZE_SCALE} AS size,
+                    CASE WHEN buy THEN 'buy' ELSE 'sell' END AS side
+                FROM {source}
+                ORDER BY trade_id
+                {f"LIMIT {int(limit)}" if limit else ""}
+            """
+            with (
+                tracer.span("db.select_trades") as span,
+                QUERY_SECONDS.labels("select_trades").time()
+            ):
+                result = pl.from_arrow(self.conn.execute(query, params).arrow())
+                span.set("rows", len(result))
+            QUERY_ROWS.labels("select_trades").observe(len(result))
+            return result
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des transactions : {e}")
+            raise
+    
+    async def get_trade_bars_async(
+        self,
+        interval: timedelta,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> pl.DataFrame:
+        """
+        Bougies OHLCV d'une durée quelconque (15s, 3m...) calculées dans DuckDB
+        à partir des transactions
+        
+        Les intervalles sont alignés sur l'epoch, comme dt.truncate de Polars ;
+        ouverture et clôture suivent l'ordre des identifiants de transaction.
+        Mêmes colonnes que bitcoin_prices.
+        """
+        width = int(interval / timedelta(microseconds=1))
+        if width <= 0:
+            raise ValueError(f"Intervalle invalide : {interval}")
+        
+        try:
+            source, params = self._trade_source(start_time, end_time)
+            query = f"""
+                SELECT
+                    make_timestamp(bucket * {width}) AS timestamp,
+                    arg_min(price, trade_id) / {PRICE_SCALE} AS open,
+                    max(price) / {PRICE_SCALE} AS high,
+                    min(price) / {PRICE_SCALE} AS low,
+                    arg_max(price, trade_id) / {PRICE_SCALE} AS close,
+                    sum(size) / {SIZE_SCALE} AS volume,
+                    count(*)::INTEGER AS trades
+                FROM (
+                    SELECT
+                        (datediff('day', DATE '1970-01-01', day) * {DAY_MICROSECONDS}::BIGINT + us) // {width} AS bucket,
+                        trade_id, price, size
+                    FROM {source}
+                )
+                GROUP BY bucket
+                ORDER BY bucket
+            """
+            with (
+                tracer.span("db.trade_bars", interval=str(interval)) as span,
+                QUERY_SECONDS.labels("trade_bars").time()
+            ):
+                result = pl.from_arrow(self.conn.execute(query, params).arrow())
+                span.set("rows", len(result))
+            QUERY_ROWS.labels("trade_bars").observe(len(result))
+            return result
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de l'agrégation des transactions : {e}")
+            raise
+    
+    async def clean_old_trades_async(self, older_than: datetime):
+        """Supprime les partitions (jours entiers) antérieures à une date"""
+        try:
+            with (
+                tracer.span("db.delete_trades"),
+                QUERY_SECONDS.labels("delete_trades").time()
+            ):
+                deleted = self.conn.execute(
+                    "DELETE FROM trades WHERE day < ?", [older_than.date()]
+                ).fetchone()[0]
+                self.conn.execute("DELETE FROM trade_days WHERE day < ?", [older_than.date()])
+                # Trous entièrement antérieurs aux partitions conservées : abandonnés
+                self.conn.execute("""
+                    DELETE FROM trade_gaps
+                    WHERE cursor_id <= (SELECT min(first_trade_id) FROM trade_days)
+                """)
+            QUERY_ROWS.labels("delete_trades").observe(deleted)
+            
+            if deleted > 0:
+                logger.info(f"Transactions nettoyées : {deleted} supprimées")
+                
+        except Exception as e:
+            logger.error(f"Erreur lors du nettoyage des transactions : {e}")
+            raise
+    
     def __del__(self):
         """Ferme la connexion à la destruction de l'objet"""
         if self.conn:
@@ -0,0 +1,164 @@
+# src/database/profiles.py
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+import duckdb
+import logging
+from ..analysis.profiles import VolumeProfile
+
+logger = logging.getLogger(__name__)
+
+# Pas des niveaux de prix persistés (USD) ; l'affichage les regroupe
+PRICE_TICK = 10.0
+
+# Volume de chaque bougie réparti uniformément sur les niveaux de [low, high],
+# avec le prix typique comme prix des échanges (VWAP exact après fusion)
+_BINNED = """
+    SELECT day, bin,
+           sum(volume / levels) AS volume,
+           sum(typical * volume / levels) AS pv
+    FROM (
+        SELECT day, volume, typical, hi - lo + 1 AS levels, unnest(range(lo, hi + 1)) AS bin
+        FROM (
+            SELECT timestamp::DATE AS day,
+                   volume::DOUBLE AS volume,
+                   (high + low + close)::DOUBLE / 3 AS typical,
+                   floor(least(low, high)::DOUBLE / $tick)::BIGINT AS lo,
+                   floor(greatest(low, high)::DOUBLE / $tick)::BIGINT AS hi
+            FROM bitcoin_prices
+            WHERE timestamp >= $start AND timestamp < $end AND volume > 0
+        )
+    )
+    GROUP BY day, bin
+"""
+
+
+class VolumeProfileStore:
+    """
+    Profils de volume persistés par jour à côté de bitcoin_prices
+
+    Chaque jour possède son histogramme (niveau de prix, volume, prix ×
+    volume) ; le profil d'une plage quelconque s'obtient en additionnant
+    les jours complets et en répartissant à la volée les bougies des jours
+    partiels aux bornes, en une seule requête.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, tick: float = PRICE_TICK):
+        self.conn = conn
+        self.tick = tick
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS volume_profiles (
+                day DATE,
+                bin BIGINT,       -- niveau : prix dans [bin * tick, (bin + 1) * tick[
+                volume DOUBLE,
+                pv DOUBLE,        -- somme prix × volume
+                PRIMARY KEY (day, bin)
+            );
+        """)
+
+    def refresh_days(self, days: Iterable[date]) -> int:
+        """
+        Reconstruit les histogrammes des jours donnés à partir de la base
+
+        Appelé après chaque insertion : un jour se reconstruit en une requête
+        bornée (1440 bougies) et les révisions de bougies sont prises en compte.
+
+        Returns:
+            Nombre de niveaux écrits
+        """
+        days = sorted(set(days))
+        if not days:
+            return 0
+
+        params = {
+            "tick": self.tick,
+            "start": datetime.combine(days[0], time()),
+            "end": datetime.combine(days[-1], time()) + timedelta(days=1),
+            "days": days
+        }
+        binned = self.conn.execute(
+            f"SELECT * FROM ({_BINNED}) WHERE list_contains($days, day)", params
+        ).arrow()
+        # Remplacement puis suppression des niveaux disparus (DuckDB refuse de
+        # réinsérer dans une transaction une clé qu'elle vient de supprimer)
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO volume_profiles SELECT * FROM binned")
+            self.conn.execute("""
+                DELETE FROM volume_profiles
+                WHERE list_contains($days, day)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM binned
+                      WHERE binned.day = volume_profiles.day AND binned.bin = volume_profiles.bin
+                  )
+            """, {"days": days})
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        logger.debug(f"Profils de volume mis à jour : {len(days)} jours, {binned.num_rows} niveaux")
+        return binned.num_rows
+
+    def rebuild(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_days: int = 30
+    ) -> int:
+        """Reconstruit tous les histogrammes (par lots de jours) entre deux dates incluses"""
+        first, last = self.conn.execute(
+            "SELECT min(timestamp)::DATE, max(timestamp)::DATE FROM bitcoin_prices"
+        ).fetchone()
+        if first is None:
+            return 0
+
+        day = max(start or first, first)
+        last = min(end or last, last)
+        written = 0
+        while day <= last:
+            batch = [day + timedelta(days=k) for k in range(batch_days) if day + timedelta(days=k) <= last]
+            written += self.refresh_days(batch)
+            day = batch[-1] + timedelta(days=1)
+
+        logger.info(f"Profils de volume reconstruits : {written} niveaux")
+        return written
+
+    def merged(self, start: datetime, end: datetime) -> VolumeProfile:
+        """
+        Profil de volume sur [start, end[
+
+        Les jours complets viennent des histogrammes persistés ; les jours
+        partiels aux bornes sont répartis depuis bitcoin_prices.
+        """
+        first_full = start.date() if start.time() == time() else start.date() + timedelta(days=1)
+        last_full = end.date() - timedelta(days=1)
+
+        parts, params = [], {}
+        if first_full <= last_full:
+            parts.append("SELECT bin, volume, pv FROM volume_profiles WHERE day BETWEEN $first_full AND $last_full")
+            params.update(first_full=first_full, last_full=last_full)
+            edges = [
+                (start, datetime.combine(first_full, time())),
+                (datetime.combine(last_full + timedelta(days=1), time()), end)
+            ]
+        else:
+            edges = [(start, end)]
+
+        for k, (edge_start, edge_end) in enumerate(edges):
+            if edge_start >= edge_end:
+                continue
+            parts.append(
+                "SELECT bin, volume, pv FROM ("
+                + _BINNED.replace("$start", f"$start{k}").replace("$end", f"$end{k}")
+                + ")"
+            )
+            params.update({"tick": self.tick, f"start{k}": edge_start, f"end{k}": edge_end})
+
+        if not parts:
+            return VolumeProfile.empty(self.tick)
+        bins, volume, pv = self.conn.execute(f"""
+            SELECT bin, sum(volume) AS volume, sum(pv) AS pv
+            FROM ({" UNION ALL ".join(parts)})
+            GROUP BY bin
+            ORDER BY bin
+        """, params).fetchnumpy().values()
+        return VolumeProfile(self.tick, bins.astype("int64"), volume, pv)
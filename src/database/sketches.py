@@ -0,0 +1,193 @@
+# src/database/sketches.py
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional
+import duckdb
+import polars as pl
+import logging
+from ..analysis.sketches import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+# Timeframes dont les rendements sont suivis (au plus une journée par barre,
+# pour qu'une partition se reconstruise à partir de la veille)
+RETURN_TIMEFRAMES = {
+    "1m": "1m",
+    "5m": "5m",
+    "1H": "1h",
+    "6H": "6h",
+    "1D": "1d"
+}
+
+RELATIVE_ACCURACY = 0.01
+
+
+def return_metric(timeframe: str) -> str:
+    """Nom de la métrique des rendements logarithmiques d'un timeframe"""
+    return f"return_{timeframe}"
+
+
+METRICS = [return_metric(tf) for tf in RETURN_TIMEFRAMES] + ["spread", "volume"]
+
+
+class SketchStore:
+    """
+    Sketches de quantiles persistés par jour à côté de bitcoin_prices
+
+    Chaque (métrique, jour) possède son sketch sérialisé ; une plage de dates
+    quelconque s'obtient en fusionnant les jours complets et en calculant
+    à la volée les jours partiels aux bornes.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection):
+        self.conn = conn
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS quantile_sketches (
+                metric VARCHAR,
+                day DATE,
+                sketch BLOB,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (metric, day)
+            );
+        """)
+
+    def _load_minutes(self, start: datetime, end: datetime) -> pl.DataFrame:
+        """Bougies minute sur [start, end[ avec une journée d'historique en amont"""
+        return pl.from_arrow(self.conn.execute("""
+            SELECT timestamp, high, low, close, volume
+            FROM bitcoin_prices
+            WHERE timestamp >= ? AND timestamp < ?
+            ORDER BY timestamp
+        """, [start - timedelta(days=1), end]).arrow())
+
+    @staticmethod
+    def _build(minutes: pl.DataFrame, start: datetime, end: datetime) -> Dict[str, Dict[date, QuantileSketch]]:
+        """
+        Construit les sketches par métrique et par jour des barres de [start, end[
+
+        Les barres antérieures à `start` servent uniquement de base aux
+        rendements.
+        """
+        sketches: Dict[str, Dict[date, QuantileSketch]] = {metric: {} for metric in METRICS}
+        if minutes.is_empty():
+            return sketches
+
+        minutes = minutes.with_columns([
+            pl.col(c).cast(pl.Float64) for c in ("high", "low", "close", "volume")
+        ])
+        in_range = (pl.col("timestamp") >= start) & (pl.col("timestamp") < end)
+
+        frames = {}
+        for timeframe, every in RETURN_TIMEFRAMES.items():
+            bars = minutes if timeframe == "1m" else (
+                minutes.group_by_dynamic("timestamp", every=every)
+                .agg(pl.col("close").last())
+            )
+            frames[return_metric(timeframe)] = bars.with_columns(
+                (pl.col("close") / pl.col("close").shift(1)).log().alias("value")
+            ).filter(in_range)
+
+        frames["spread"] = minutes.filter(in_range).with_columns(
+            ((pl.col("high") - pl.col("low")) / pl.col("close")).alias("value")
+        )
+        frames["volume"] = minutes.filter(in_range).with_columns(
+            pl.col("volume").alias("value")
+        )
+
+        for metric, frame in frames.items():
+            frame = frame.select([pl.col("timestamp").dt.date().alias("day"), "value"])
+            for (day,), group in frame.group_by("day"):
+                sketches[metric][day] = QuantileSketch(RELATIVE_ACCURACY).update(
+                    group["value"].to_numpy()
+                )
+        return sketches
+
+    def refresh_days(self, days: Iterable[date]) -> int:
+        """
+        Reconstruit les partitions des jours donnés à partir de la base
+
+        Appelé après chaque insertion : la reconstruction d'un jour complet
+        reste bornée (1440 bougies) et supporte les révisions de bougies.
+
+        Returns:
+            Nombre de partitions écrites
+        """
+        days = sorted(set(days))
+        if not days:
+            return 0
+
+        start = datetime.combine(days[0], time())
+        end = datetime.combine(days[-1], time()) + timedelta(days=1)
+        built = self._build(self._load_minutes(start, end), start, end)
+
+        rows = [
+            (metric, day, sketch.to_bytes(), datetime.utcnow())
+            for metric, by_day in built.items()
+            for day, sketch in by_day.items()
+            if day in days
+        ]
+        if rows:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO quantile_sketches VALUES (?, ?, ?, ?)",
+                rows
+            )
+        logger.debug(f"Sketches mis à jour : {len(rows)} partitions")
+        return len(rows)
+
+    def rebuild(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_days: int = 30
+    ) -> int:
+        """Reconstruit toutes les partitions (par lots de jours) entre deux dates incluses"""
+        first, last = self.conn.execute(
+            "SELECT min(timestamp)::DATE, max(timestamp)::DATE FROM bitcoin_prices"
+        ).fetchone()
+        if first is None:
+            return 0
+
+        day = max(start or first, first)
+        last = min(end or last, last)
+        written = 0
+        while day <= last:
+            batch = [day + timedelta(days=k) for k in range(batch_days) if day + timedelta(days=k) <= last]
+            written += self.refresh_days(batch)
+            day = batch[-1] + timedelta(days=1)
+
+        logger.info(f"Sketches reconstruits : {written} partitions")
+        return written
+
+    def merged(self, metric: str, start: datetime, end: datetime) -> QuantileSketch:
+        """
+        Sketch fusionné d'une métrique sur [start, end[
+
+        Les jours complets viennent des partitions persistées ; les jours
+        partiels aux bornes sont calculés depuis bitcoin_prices.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Métrique inconnue : {metric}")
+
+        first_full = start.date() if start.time() == time() else start.date() + timedelta(days=1)
+        last_full = end.date() - timedelta(days=1)
+        merged = QuantileSketch(RELATIVE_ACCURACY)
+
+        if first_full <= last_full:
+            for (blob,) in self.conn.execute("""
+                SELECT sketch FROM quantile_sketches
+                WHERE metric = ? AND day BETWEEN ? AND ?
+            """, [metric, first_full, last_full]).fetchall():
+                merged.merge(QuantileSketch.from_bytes(blob))
+            edges = [
+                (start, datetime.combine(first_full, time())),
+                (datetime.combine(last_full + timedelta(days=1), time()), end)
+            ]
+        else:
+            edges = [(start, end)]
+
+        for edge_start, edge_end in edges:
+            if edge_start >= edge_end:
+                continue
+            partial = self._build(self._load_minutes(edge_start, edge_end), edge_start, edge_end)
+            for sketch in partial[metric].values():
+                merged.merge(sketch)
+        return merged
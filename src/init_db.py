@@ -26,6 +26,14 @@ def init_project():
         db = DatabaseManager()
         db._init_database()
         
+        # Sketches de quantiles pour l'historique déjà présent
+        logger.info("Construction des sketches de quantiles...")
+        db.sketches.rebuild()
+        
+        # Profils de volume journaliers pour ce même historique
+        logger.info("Construction des profils de volume...")
+        db.profiles.rebuild()
+        
         # Collecte des données historiques
         logger.info("Collecte des données historiques...")
         collector = DataProcessor()
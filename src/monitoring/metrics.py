@@ -0,0 +1,313 @@
+# src/monitoring/metrics.py
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Sequence, Union
+import math
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Type de contenu du format texte Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes des histogrammes de durée (secondes) : de 0,5ms à 10s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bornes des histogrammes de volumes (lignes, points)
+SIZE_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+class _Cells:
+    """
+    Compteurs répartis par thread, sans verrou
+
+    Chaque thread écrit uniquement dans sa propre cellule (threading.local) :
+    aucune incrémentation ne se perd entre la boucle asyncio et les threads
+    du pool de précalcul. La lecture additionne les cellules de tous les
+    threads, au moment de l'exposition seulement.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._all: list = []
+
+    def cell(self) -> list:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0] * self._size
+            self._all.append(cell)  # Atomique sous le GIL
+            return cell
+
+    def totals(self) -> list:
+        cells = list(self._all)
+        if not cells:
+            return [0] * self._size
+        return [sum(values) for values in zip(*cells)]
+
+
+class Counter:
+    """Compteur monotone"""
+
+    def __init__(self):
+        self._cells = _Cells(1)
+
+    def inc(self, amount: float = 1):
+        self._cells.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class Gauge:
+    """Valeur instantanée, fixée par set ou lue par une fonction à l'exposition"""
+
+    def __init__(self, function: Optional[Callable[[], float]] = None):
+        self._function = function
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function is not None else self._value
+
+
+class _Timer:
+    """Chronomètre (context manager) alimentant un histogramme"""
+
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: "Histogram"):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class Histogram:
+    """
+    Histogramme à intervalles fixés à la déclaration
+
+    Une observation coûte une recherche dichotomique dans les bornes et deux
+    additions dans la cellule du thread : pas d'allocation ni de verrou.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # Un compteur par borne, un pour +Inf, puis la somme des valeurs
+        self._cells = _Cells(len(self.buckets) + 2)
+
+    def observe(self, value: float):
+        cell = self._cells.cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def time(self) -> _Timer:
+        """Mesure la durée d'un bloc `with`"""
+        return _Timer(self)
+
+    def snapshot(self) -> tuple[list, int, float]:
+        """Comptes cumulés par borne (+Inf inclus), nombre total et somme"""
+        totals = self._cells.totals()
+        counts = totals[:-1]
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class Metric:
+    """
+    Famille de métriques : nom, aide, type et séries par valeurs d'étiquettes
+
+    Sans étiquettes, les méthodes inc/observe/time/set s'appliquent à
+    l'unique série ; avec étiquettes, `labels(...)` retourne la série
+    correspondante, créée au premier usage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        kind: str,
+        factory: Callable,
+        labels: Sequence[str] = ()
+    ):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = tuple(labels)
+        self._factory = factory
+        self._children: Dict[tuple, Union[Counter, Gauge, Histogram]] = {}
+        if not self.label_names:
+            self._children[()] = factory()
+
+    def labels(self, *values: str) -> Union[Counter, Gauge, Histogram]:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} attend les étiquettes {self.label_names}")
+            # setdefault est atomique : deux threads obtiennent la même série
+            child = self._children.setdefault(values, self._factory())
+        return child
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def render(self, extra_labels: Dict[str, str]) -> list:
+        """Lignes du format texte Prometheus (vide si aucune série)"""
+        children = list(self._children.items())
+        if not children:
+            return []
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in children:
+            labels = {**dict(zip(self.label_names, values)), **extra_labels}
+            if isinstance(child, Histogram):
+                cumulative, count, total = child.snapshot()
+                for bound, value in zip((*child.buckets, math.inf), cumulative):
+                    bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                    lines.append(f"{self.name}_bucket{bucket_labels} {value}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+            else:
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(child.value)}")
+        return lines
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """
+    Registre des métriques du processus
+
+    Les modules déclarent leurs métriques à l'import ; l'exposition
+    (endpoint /metrics) lit les compteurs sans bloquer les écritures.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrique déjà déclarée : {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Metric:
+        return self._register(Metric(name, help, "counter", Counter, labels))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        function: Optional[Callable[[], float]] = None,
+        labels: Sequence[str] = ()
+    ) -> Metric:
+        """Jauge ; avec `function`, la valeur est lue à l'exposition (aucun coût ailleurs)"""
+        return self._register(Metric(name, help, "gauge", lambda: Gauge(function), labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        labels: Sequence[str] = ()
+    ) -> Metric:
+        return self._register(Metric(name, help, "histogram", lambda: Histogram(buckets), labels))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self, extra_labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Exposition au format texte Prometheus
+
+        Args:
+            extra_labels: Étiquettes ajoutées à toutes les séries (processus)
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.render(extra_labels or {}))
+            except Exception as e:
+                logger.error(f"Erreur lors de l'exposition de {metric.name} : {e}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+# Registre partagé par tous les modules du processus
+metrics = MetricsRegistry()
+
+
+# Script de test : coût d'une observation sur le chemin critique
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requêtes", labels=("endpoint",))
+    latency = registry.histogram("demo_latency_seconds", "Latence")
+
+    n = 1_000_000
+    child = requests.labels("/candles")
+    begin = time.perf_counter()
+    for _ in range(n):
+        child.inc()
+    print(f"Counter.inc : {(time.perf_counter() - begin) / n * 1e9:.0f}ns")
+
+    begin = time.perf_counter()
+    for k in range(n):
+        latency.observe(k * 1e-8)
+    print(f"Histogram.observe : {(time.perf_counter() - begin) / n * 1e9:.0f}ns")
+
+    begin = time.perf_counter()
+    for _ in range(n // 10):
+        with latency.time():
+            pass
+    print(f"Histogram.time : {(time.perf_counter() - begin) / (n // 10) * 1e9:.0f}ns")
+
+    # Aucune perte entre threads concurrents
+    def work(_):
+        for _ in range(100_000):
+            child.inc()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(8)))
+    assert child.value == n + 800_000, child.value
+    print(registry.render({"process": "demo"}))
@@ -0,0 +1,402 @@
+# src/monitoring/tracing.py
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import random
+import sys
+import threading
+import time
+import logging
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+# Décalage entre l'horloge monotone des spans et l'heure epoch (exports)
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+# Fichiers de traces conservés dans le répertoire d'export
+MAX_TRACE_FILES = 500
+
+# Échantillons de pile conservés au plus par trace lente
+MAX_SAMPLES = 20_000
+
+
+class Span:
+    """Étape chronométrée d'une trace"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "thread_id", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent_id
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+        self.end: Optional[int] = None
+        self.start = time.perf_counter_ns()
+
+    def set(self, key: str, value: Any):
+        """Ajoute un attribut (nombre de lignes, statut...) en cours d'étape"""
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter_ns()) - self.start) / 1e6
+
+
+class Trace:
+    """Arbre de spans d'une opération racine (rafraîchissement, rendu d'une sortie)"""
+
+    __slots__ = ("trace_id", "root", "spans", "sampled", "samples")
+
+    def __init__(self, root: Span, sampled: bool):
+        self.trace_id = os.urandom(16).hex()
+        self.root = root
+        self.spans: List[Span] = [root]  # list.append est atomique entre threads
+        self.sampled = sampled
+        self.samples: List[Tuple[int, Tuple[str, ...]]] = []
+
+
+class _NoopSpan:
+    """Span inactif : tracing désactivé ou hors d'une trace échantillonnée"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key: str, value: Any):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+# Trace et span courants (propagés aux tâches asyncio, et aux threads via copy_context)
+_current: ContextVar[Optional[Tuple[Trace, Span]]] = ContextVar("trace", default=None)
+
+
+class _SpanContext:
+    __slots__ = ("_tracer", "_trace", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", trace: Trace, span: Span):
+        self._tracer = tracer
+        self._trace = trace
+        self._span = span
+
+    def __enter__(self) -> Span:
+        self._token = _current.set((self._trace, self._span))
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        self._span.end = time.perf_counter_ns()
+        if exc_type is not None:
+            self._span.attributes["error"] = exc_type.__name__
+        _current.reset(self._token)
+        if self._span is self._trace.root:
+            self._tracer._finish(self._trace)
+        return False
+
+
+def _stack(frame) -> Tuple[str, ...]:
+    """Pile d'appels (de l'extérieur vers l'intérieur), par fonction"""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class SlowRequestProfiler:
+    """
+    Profileur par échantillonnage des opérations lentes
+
+    Un thread relève périodiquement la pile du thread de chaque trace racine
+    en cours dont la durée dépasse le seuil. Rien n'est échantillonné tant
+    qu'aucune opération n'est lente. Sur la boucle asyncio, les échantillons
+    peuvent inclure d'autres tâches exécutées entre deux `await`.
+    """
+
+    def __init__(self, threshold_ns: int, interval: float = 0.005):
+        self.threshold_ns = threshold_ns
+        self.interval = interval
+        self._active: Dict[str, Tuple[Trace, int]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, trace: Trace):
+        self._active[trace.trace_id] = (trace, trace.root.thread_id)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+
+    def unregister(self, trace: Trace):
+        self._active.pop(trace.trace_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter_ns()
+            frames = None
+            for trace, thread_id in list(self._active.values()):
+                if now - trace.root.start < self.threshold_ns or len(trace.samples) >= MAX_SAMPLES:
+                    continue
+                if frames is None:
+                    frames = sys._current_frames()
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    trace.samples.append((now, _stack(frame)))
+
+
+class Tracer:
+    """
+    Traces des rafraîchissements et des rendus du dashboard
+
+    `trace(name)` ouvre une trace racine, conservée avec la probabilité
+    `sample_rate` ; `span(name)` chronomètre une étape de la trace courante.
+    Désactivé, le tracing se réduit à un test et à la lecture d'une
+    ContextVar par étape.
+
+    Avec un seuil `slow_ms`, toutes les traces racines sont enregistrées et
+    échantillonnées par le profileur au-delà du seuil ; les traces lentes
+    sont exportées avec leurs piles, quel que soit l'échantillonnage.
+
+    Exports : un fichier par trace dans `directory`, au format Chrome
+    (chrome://tracing, Perfetto) ou OTLP-JSON, plus un fichier `.folded`
+    (flame graph) pour les traces profilées.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        directory: Optional[Path] = None,
+        export_format: str = "chrome"
+    ):
+        if export_format not in ("chrome", "otlp"):
+            raise ValueError(f"Format de trace inconnu : {export_format}")
+        self.sample_rate = sample_rate
+        self.slow_ns = int(slow_ms * 1e6)
+        self.directory = Path(directory or config.DATA_DIR / "traces")
+        self.export_format = export_format
+        self.enabled = sample_rate > 0 or self.slow_ns > 0
+        self.profiler = SlowRequestProfiler(self.slow_ns) if self.slow_ns > 0 else None
+        # Traces conservées récemment (inspection sans passer par les fichiers)
+        self.recent: deque = deque(maxlen=100)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def trace(self, name: str, **attributes):
+        """Ouvre une trace racine (ou une étape si une trace est déjà en cours)"""
+        if not self.enabled:
+            return _NOOP
+        current = _current.get()
+        if current is not None:
+            trace, parent = current
+            span = Span(name, parent.span_id, attributes)
+            trace.spans.append(span)
+            return _SpanContext(self, trace, span)
+
+        sampled = random.random() < self.sample_rate
+        if not sampled and self.profiler is None:
+            return _NOOP
+        trace = Trace(Span(name, None, attributes), sampled)
+        if self.profiler is not None:
+            self.profiler.register(trace)
+        return _SpanContext(self, trace, trace.root)
+
+    def span(self, name: str, **attributes):
+        """Chronomètre une étape de la trace courante (sans effet hors trace)"""
+        current = _current.get()
+        if current is None:
+            return _NOOP
+        trace, parent = current
+        span = Span(name, parent.span_id, attributes)
+        trace.spans.append(span)
+        return _SpanContext(self, trace, span)
+
+    def _finish(self, trace: Trace):
+        if self.profiler is not None:
+            self.profiler.unregister(trace)
+        slow = self.slow_ns > 0 and trace.root.end - trace.root.start >= self.slow_ns
+        if not (trace.sampled or slow):
+            return
+        if slow:
+            logger.warning(f"Opération lente : {trace.root.name} ({trace.root.duration_ms:.0f}ms)")
+
+        self.recent.append(trace)
+        # Écriture hors de la boucle asyncio
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+        self._executor.submit(self._export, trace)
+
+    def _export(self, trace: Trace):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            started = datetime.fromtimestamp((trace.root.start + _EPOCH_OFFSET_NS) / 1e9)
+            stem = f"{started:%Y%m%d-%H%M%S}-{trace.root.name}-{trace.trace_id[:8]}"
+            if self.export_format == "chrome":
+                document = to_chrome_trace(trace)
+            else:
+                document = to_otlp_json(trace)
+            (self.directory / f"{stem}.json").write_text(json.dumps(document, default=str))
+            if trace.samples:
+                (self.directory / f"{stem}.folded").write_text(to_folded(trace))
+            self._cleanup()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export de la trace {trace.root.name} : {e}")
+
+    def _cleanup(self):
+        """Supprime les traces les plus anciennes au-delà de MAX_TRACE_FILES"""
+        files = sorted(self.directory.glob("*.json"))
+        for path in files[:-MAX_TRACE_FILES]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def to_chrome_trace(trace: Trace) -> dict:
+    """
+    Trace au format Chrome (événements complets « X », en microsecondes)
+
+    Les piles échantillonnées sont reconstituées en flame chart sur un
+    processus séparé : les échantillons consécutifs partageant un préfixe
+    de pile forment un même bloc.
+    """
+    pid = os.getpid()
+    events = [{
+        "name": "process_name", "ph": "M", "pid": pid,
+        "args": {"name": f"{trace.root.name} ({trace.trace_id[:8]})"}
+    }]
+    for span in trace.spans:
+        if span.end is None:
+            continue
+        events.append({
+            "name": span.name,
+            "cat": span.name.split(".")[0],
+            "ph": "X",
+            "ts": (span.start + _EPOCH_OFFSET_NS) / 1e3,
+            "dur": (span.end - span.start) / 1e3,
+            "pid": pid,
+            "tid": span.thread_id,
+            "args": span.attributes
+        })
+
+    if trace.samples:
+        profile_pid = pid + 1_000_000
+        events.append({
+            "name": "process_name", "ph": "M", "pid": profile_pid,
+            "args": {"name": "Profil échantillonné"}
+        })
+        opened: List[Tuple[str, int]] = []
+
+        def close(depth: int, at: int):
+            while len(opened) > depth:
+                frame, start = opened.pop()
+                events.append({
+                    "name": frame, "cat": "sample", "ph": "X",
+                    "ts": (start + _EPOCH_OFFSET_NS) / 1e3, "dur": (at - start) / 1e3,
+                    "pid": profile_pid, "tid": trace.root.thread_id
+                })
+
+        for at, stack in trace.samples:
+            common = 0
+            while common < min(len(opened), len(stack)) and opened[common][0] == stack[common]:
+                common += 1
+            close(common, at)
+            opened.extend((frame, at) for frame in stack[common:])
+        # Le dernier échantillon vaut jusqu'à la fin de l'opération
+        close(0, max(trace.root.end or 0, trace.samples[-1][0]))
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def to_otlp_json(trace: Trace) -> dict:
+    """Trace au format OTLP-JSON (ExportTraceServiceRequest)"""
+    def attributes(values: Dict[str, Any]) -> list:
+        converted = []
+        for key, value in values.items():
+            if isinstance(value, bool):
+                converted.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                converted.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                converted.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                converted.append({"key": key, "value": {"stringValue": str(value)}})
+        return converted
+
+    spans = [{
+        "traceId": trace.trace_id,
+        "spanId": f"{span.span_id:016x}",
+        **({"parentSpanId": f"{span.parent_id:016x}"} if span.parent_id is not None else {}),
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start + _EPOCH_OFFSET_NS),
+        "endTimeUnixNano": str(span.end + _EPOCH_OFFSET_NS),
+        "attributes": attributes({**span.attributes, "thread.id": span.thread_id}),
+        "status": {"code": 2} if "error" in span.attributes else {}
+    } for span in trace.spans if span.end is not None]
+
+    return {"resourceSpans": [{
+        "resource": {"attributes": attributes({"service.name": "bitcoin-dashboard", "process.pid": os.getpid()})},
+        "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}]
+    }]}
+
+
+def to_folded(trace: Trace) -> str:
+    """Piles échantillonnées au format « folded » (flamegraph.pl, speedscope)"""
+    counts = Counter(stack for _, stack in trace.samples)
+    return "\n".join(f"{';'.join(stack)} {count}" for stack, count in counts.most_common()) + "\n"
+
+
+# Traceur partagé par tous les modules du processus
+tracer = Tracer(
+    sample_rate=config.TRACE_SAMPLE_RATE,
+    slow_ms=config.TRACE_SLOW_MS,
+    directory=config.DATA_DIR / "traces",
+    export_format=config.TRACE_FORMAT
+)
+
+
+# Script de test : coût désactivé / activé et export d'une trace profilée
+if __name__ == "__main__":
+    import tempfile
+
+    n = 1_000_000
+    disabled = Tracer()
+    begin = time.perf_counter()
+    for _ in range(n):
+        with disabled.span("noop"):
+            pass
+    print(f"Span désactivé : {(time.perf_counter() - begin) / n * 1e9:.0f}ns")
+
+    with tempfile.TemporaryDirectory() as directory:
+        enabled = Tracer(sample_rate=1.0, slow_ms=20, directory=Path(directory))
+        begin = time.perf_counter()
+        with enabled.trace("bench"):
+            for _ in range(n // 100):
+                with enabled.span("step"):
+                    pass
+        print(f"Span enregistré : {(time.perf_counter() - begin) / (n // 100) * 1e9:.0f}ns")
+
+        def busy(ms: float):
+            end = time.perf_counter() + ms / 1e3
+            while time.perf_counter() < end:
+                pass
+
+        with enabled.trace("refresh", timeframe="1m"):
+            with enabled.span("coinbase.request"):
+                busy(15)
+            with enabled.span("indicators"):
+                busy(40)
+        enabled._executor.shutdown(wait=True)
+
+        for path in sorted(Path(directory).iterdir()):
+            print(f"{path.name} : {path.stat().st_size} octets")
+        print(Path(directory).glob("*refresh*.folded").__next__().read_text().splitlines()[0])